@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*- # Языковая кодировка UTF-8
+"""
+Пакетный запуск анализатора из командной строки, без диалога с пользователем.
+
+Примеры:
+    python batch_analysis.py ingest --db auth --subject-area "Биология" auth_ready/biology
+    python batch_analysis.py ingest --db mt "mt_ready/*/*.txt" --subject-area "Медицина" --workers 4
+    python batch_analysis.py ingest --db ht ht_ready/physics --subject-area "Физика" --contexts sample
+    python batch_analysis.py aggregate --db auth --db mt --output averages.json
+    python batch_analysis.py compare --db auth --db mt --db ht --group simplification
+    python batch_analysis.py export --db ht --output ht_texts.csv --pmi-output ht_pmi.parquet
+    python batch_analysis.py verify --db ht --repair
+
+Прерванный анализ (ingest) продолжается повторным запуском той же команды: сохраненные файлы
+отмечаются в журнале задания и пропускаются.
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+
+from colorama import Fore, Style, init
+
+from tools.core.constants import NON_TRANSLATED_DB_NAME, MACHINE_TRANSLATED_DB_NAME, HUMAN_TRANSLATED_DB_NAME
+from tools.core.context_store import (CONTEXT_RETENTION_MODES, DEFAULT_CONTEXT_RETENTION, DEFAULT_CONTEXT_SAMPLE_SIZE,
+                                      set_context_retention)
+from tools.core.job_manifest import JobManifest
+from tools.core.utils import set_interactive, check_db_exists
+from tools.normalisation.pmi import PMI_MEASURES, export_pmi_table
+from tools.work_with_db import SaveToDatabase, CORPUS_COMPARISON_GROUPS, DEFAULT_BATCH_SIZE
+
+init(autoreset=True)
+
+# Короткие имена баз данных корпусов
+DB_ALIASES = {
+    'auth': NON_TRANSLATED_DB_NAME,
+    'mt': MACHINE_TRANSLATED_DB_NAME,
+    'ht': HUMAN_TRANSLATED_DB_NAME,
+}
+
+
+def resolve_db(name):
+    """Возвращает путь к базе данных по короткому имени (auth, mt, ht) или сам переданный путь."""
+    return DB_ALIASES.get(name, name)
+
+
+def default_manifest_path(db):
+    """Путь к журналу задания по умолчанию: рядом с базой данных корпуса."""
+    return os.path.splitext(db)[0] + '.manifest.jsonl'
+
+
+def expand_inputs(inputs):
+    """
+    Находит txt-файлы по директориям, шаблонам (glob) и путям к файлам.
+
+    :param inputs: Директории, шаблоны или пути к файлам.
+    :return: Кортеж: список абсолютных путей к файлам (без повторов, в порядке сортировки внутри каждого
+        входа) и список входов, по которым файлы не найдены.
+    """
+    files = []
+    not_found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths = sorted(os.path.join(item, name) for name in os.listdir(item) if name.endswith('.txt'))
+        elif glob.has_magic(item):
+            paths = sorted(path for path in glob.glob(item, recursive=True)
+                           if os.path.isfile(path) and path.endswith('.txt'))
+        elif os.path.isfile(item):
+            paths = [item]
+        else:
+            paths = []
+        if not paths:
+            not_found.append(item)
+        files.extend(os.path.abspath(path) for path in paths)
+    return list(dict.fromkeys(files)), not_found
+
+
+def check_corpus_db(db):
+    """Проверяет, что база данных существует и содержит тексты; иначе выводит ошибку."""
+    if not check_db_exists(db):
+        print(Fore.LIGHTRED_EX + f"База данных {db} не найдена." + Fore.RESET, file=sys.stderr)
+        return False
+    with SaveToDatabase(db) as db_saver:
+        db_saver.cursor.execute("SELECT COUNT(*) FROM Text_Passport")
+        if not db_saver.cursor.fetchone()[0]:
+            print(Fore.LIGHTRED_EX + f"В базе данных {db} нет текстов." + Fore.RESET, file=sys.stderr)
+            return False
+    return True
+
+
+def run_ingest(args):
+    """Анализирует файлы и сохраняет результаты в базу данных корпуса, отмечая прогресс в журнале задания."""
+    # Модели и модули индикаторов загружаются только для анализа, остальным командам они не нужны
+    from start_analysis import analyze_files_in_parallel
+
+    try:
+        set_context_retention(args.contexts, args.context_sample_size)
+    except ValueError as e:
+        print(Fore.LIGHTRED_EX + str(e) + Fore.RESET, file=sys.stderr)
+        return 2
+
+    db = resolve_db(args.db)
+    manifest_path = args.manifest or default_manifest_path(db)
+    files, not_found = expand_inputs(args.inputs)
+    if not_found:
+        print(Fore.LIGHTRED_EX + f"Не найдены txt-файлы: {', '.join(not_found)}." + Fore.RESET, file=sys.stderr)
+        return 2
+    if args.restart and os.path.isfile(manifest_path):
+        os.remove(manifest_path)
+
+    with JobManifest(manifest_path, db) as manifest:
+        manifest.load()
+        reset = manifest.reconcile()
+        if reset:
+            print(Fore.LIGHTRED_EX + f"Не найдено в базе данных текстов, отмеченных как сохраненные: {reset}. "
+                                     f"Они будут проанализированы заново." + Fore.RESET)
+
+        new_files = [path for path in files if path not in manifest.entries]
+        if new_files and not args.subject_area:
+            print(Fore.LIGHTRED_EX + "Для новых файлов задания укажите предметную область (--subject-area)."
+                  + Fore.RESET, file=sys.stderr)
+            return 2
+        for path in new_files:
+            manifest.add_file(path, args.subject_area, args.name_prefix or os.path.basename(os.path.dirname(path)))
+
+        # Без входов продолжаются все незавершенные файлы журнала
+        selected = [manifest.entries[path] for path in files] if files else list(manifest.entries.values())
+        if not selected:
+            print(Fore.LIGHTRED_EX + "Нет файлов для анализа: укажите директории, шаблоны или файлы." + Fore.RESET,
+                  file=sys.stderr)
+            return 2
+        pending = sorted((entry for entry in selected if entry.status != 'saved'),
+                         key=lambda entry: (entry.name_prefix, entry.index))
+        print(Fore.LIGHTGREEN_EX + Style.BRIGHT + f"Файлов в задании: {len(selected)}, уже сохранено: "
+                                                  f"{len(selected) - len(pending)}, к анализу: {len(pending)}."
+              + Fore.RESET)
+
+        # Файлы с одинаковыми метаданными анализируются одним пулом процессов
+        groups = {}
+        for entry in pending:
+            groups.setdefault((entry.subject_area, entry.name_prefix), []).append(entry)
+        errors = []
+        for (subject_area, name_prefix), entries in groups.items():
+            _, group_errors = analyze_files_in_parallel(
+                [entry.path for entry in entries], db, subject_area, name_prefix, workers=args.workers,
+                ordered=not args.unordered, batch_size=args.batch_size,
+                file_indexes=[entry.index for entry in entries], on_result=manifest.record_result)
+            errors.extend(group_errors)
+
+        counts = manifest.counts()
+        selected_counts = manifest.counts([entry.path for entry in selected])
+    print(Fore.LIGHTGREEN_EX + Style.BRIGHT + f"Журнал задания {manifest_path}: сохранено {counts['saved']}, "
+                                              f"с ошибками {counts['failed']}, не обработано {counts['pending']}."
+          + Fore.RESET)
+    # Задание успешно, только если все выбранные файлы сохранены (в том числе при аварийном завершении пула)
+    return 1 if errors or selected_counts['failed'] or selected_counts['pending'] else 0
+
+
+def run_aggregate(args):
+    """Выводит средние показатели корпусов в формате JSON."""
+    dbs = [resolve_db(db) for db in args.db]
+    groups = args.group or list(CORPUS_COMPARISON_GROUPS)
+    # Сообщения о ходе подсчета не смешиваются с JSON, если он выводится в консоль
+    progress = sys.stderr if args.output == '-' else sys.stdout
+    aggregates = {}
+    with contextlib.redirect_stdout(progress):
+        for db in dbs:
+            if not check_corpus_db(db):
+                return 2
+            with SaveToDatabase(db) as db_saver:
+                aggregates[db] = {group: db_saver.collect_comparison_results([db], group).get(db, {})
+                                  for group in groups}
+    if args.output == '-':
+        json.dump(aggregates, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(aggregates, file, ensure_ascii=False, indent=2)
+        print(Fore.LIGHTGREEN_EX + Style.BRIGHT + f"Средние показатели сохранены в {args.output}." + Fore.RESET)
+    return 0
+
+
+def run_compare(args):
+    """Выводит сравнительные таблицы средних показателей нескольких корпусов."""
+    dbs = [resolve_db(db) for db in args.db]
+    if len(dbs) < 2:
+        print(Fore.LIGHTRED_EX + "Для сравнения необходимо указать хотя бы два корпуса." + Fore.RESET,
+              file=sys.stderr)
+        return 2
+    if not all(check_corpus_db(db) for db in dbs):
+        return 2
+    with SaveToDatabase() as db_corpora_comparison:
+        for group in args.group or list(CORPUS_COMPARISON_GROUPS):
+            comparison_results = db_corpora_comparison.collect_comparison_results(dbs, group)
+            getattr(db_corpora_comparison, CORPUS_COMPARISON_GROUPS[group][1])(comparison_results)
+    return 0
+
+
+def run_export(args):
+    """Выгружает индикаторы текстов корпуса в CSV и (или) PMI биграммов корпуса в CSV или Parquet."""
+    if not args.output and not args.pmi_output:
+        print(Fore.LIGHTRED_EX + "Укажите файл для выгрузки (--output и/или --pmi-output)." + Fore.RESET,
+              file=sys.stderr)
+        return 2
+    db = resolve_db(args.db)
+    if not check_corpus_db(db):
+        return 2
+    with SaveToDatabase(db) as db_saver:
+        if args.output:
+            rows_count = db_saver.export_text_features(args.output)
+            print(Fore.LIGHTGREEN_EX + Style.BRIGHT + f"Индикаторы {rows_count} текстов сохранены в {args.output}."
+                  + Fore.RESET)
+        if args.pmi_output:
+            written = export_pmi_table(db_saver.corpus_pmi_table(), args.pmi_output, args.pmi_threshold,
+                                       args.pmi_measure)
+            print(Fore.LIGHTGREEN_EX + Style.BRIGHT + f"Сохранено {written} биграммов в {args.pmi_output}."
+                  + Fore.RESET)
+    return 0
+
+
+def run_verify(args):
+    """
+    Проверяет, что счетчики Feature_counts совпадают с JSON-столбцами текстов, и при --repair
+    выводит расходящиеся строки заново из JSON-столбцов.
+    """
+    db = resolve_db(args.db)
+    if not check_corpus_db(db):
+        return 2
+    with SaveToDatabase(db) as db_saver:
+        drifted = db_saver.find_feature_count_drift()
+        if not drifted:
+            print(Fore.LIGHTGREEN_EX + Style.BRIGHT + "Счетчики Feature_counts совпадают с JSON-столбцами текстов."
+                  + Fore.RESET)
+            return 0
+        print(Fore.LIGHTYELLOW_EX + f"Счетчики Feature_counts расходятся с JSON-столбцами у текстов: "
+                                    f"{', '.join(map(str, drifted))}." + Fore.RESET)
+        if not args.repair:
+            return 1
+        rebuilt = db_saver.rebuild_feature_counts(drifted)
+    print(Fore.LIGHTGREEN_EX + Style.BRIGHT + f"Счетчики {rebuilt} текстов выведены заново из JSON-столбцов."
+          + Fore.RESET)
+    return 0
+
+
+def build_parser():
+    """Создает парсер аргументов командной строки."""
+    db_help = "База данных корпуса: auth, mt, ht или путь к файлу SQLite."
+    parser = argparse.ArgumentParser(
+        description="Пакетный анализ индикаторов Translationese без диалога с пользователем.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest = subparsers.add_parser('ingest', help="Проанализировать txt-файлы и сохранить результаты в корпус.")
+    ingest.add_argument('inputs', nargs='*',
+                        help="Директории, шаблоны (glob) или txt-файлы. Без них продолжается прерванное задание.")
+    ingest.add_argument('--db', required=True, help=db_help)
+    ingest.add_argument('--subject-area', help="Предметная область, общая для новых файлов задания.")
+    ingest.add_argument('--name-prefix',
+                        help="Префикс названий текстов (по умолчанию - название директории файла).")
+    ingest.add_argument('--workers', type=int, default=None,
+                        help="Количество процессов (по умолчанию - количество ядер процессора).")
+    ingest.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Количество текстов, записываемых в базу данных одной транзакцией.")
+    ingest.add_argument('--unordered', action='store_true',
+                        help="Сохранять тексты по мере готовности, а не в порядке файлов.")
+    ingest.add_argument('--manifest', help="Путь к журналу задания (по умолчанию - рядом с базой данных).")
+    ingest.add_argument('--restart', action='store_true',
+                        help="Начать задание заново, удалив журнал (тексты в базе данных не удаляются).")
+    ingest.add_argument('--contexts', choices=CONTEXT_RETENTION_MODES, default=DEFAULT_CONTEXT_RETENTION,
+                        help="Хранение контекстов триграммов с функциональными словами и позиционных контекстов "
+                             "предложений: full - все, sample - случайная выборка, off - не хранить.")
+    ingest.add_argument('--context-sample-size', type=int, default=DEFAULT_CONTEXT_SAMPLE_SIZE,
+                        help=f"Количество контекстов одной категории при --contexts sample "
+                             f"(по умолчанию {DEFAULT_CONTEXT_SAMPLE_SIZE}).")
+    ingest.set_defaults(func=run_ingest)
+
+    aggregate = subparsers.add_parser('aggregate', help="Вывести средние показатели корпусов в формате JSON.")
+    aggregate.add_argument('--db', required=True, action='append', help=db_help + " Можно указать несколько раз.")
+    aggregate.add_argument('--group', action='append', choices=list(CORPUS_COMPARISON_GROUPS),
+                           help="Группа индикаторов (по умолчанию - все). Можно указать несколько раз.")
+    aggregate.add_argument('--output', default='-', help="Путь к JSON-файлу (по умолчанию - вывод в консоль).")
+    aggregate.set_defaults(func=run_aggregate)
+
+    compare = subparsers.add_parser('compare', help="Вывести сравнительные таблицы нескольких корпусов.")
+    compare.add_argument('--db', required=True, action='append', help=db_help + " Указывается не менее двух раз.")
+    compare.add_argument('--group', action='append', choices=list(CORPUS_COMPARISON_GROUPS),
+                         help="Группа индикаторов (по умолчанию - все). Можно указать несколько раз.")
+    compare.set_defaults(func=run_compare)
+
+    export = subparsers.add_parser('export', help="Выгрузить индикаторы текстов и PMI биграммов корпуса.")
+    export.add_argument('--db', required=True, help=db_help)
+    export.add_argument('--output', help="CSV-файл с паспортами и числовыми индикаторами текстов.")
+    export.add_argument('--pmi-output', help="Файл .csv или .parquet с PMI биграммов корпуса.")
+    export.add_argument('--pmi-threshold', type=float, default=0.0,
+                        help="Выгружаются биграммы со значением меры больше порога (по умолчанию 0).")
+    export.add_argument('--pmi-measure', choices=PMI_MEASURES, default='pmi', help="Мера ассоциации биграммов.")
+    export.set_defaults(func=run_export)
+
+    verify = subparsers.add_parser('verify', help="Проверить счетчики Feature_counts по JSON-столбцам текстов.")
+    verify.add_argument('--db', required=True, help=db_help)
+    verify.add_argument('--repair', action='store_true',
+                        help="Вывести расходящиеся счетчики заново из JSON-столбцов.")
+    verify.set_defaults(func=run_verify)
+    return parser
+
+
+def main(argv=None):
+    """
+    Точка входа пакетного запуска.
+
+    :param argv: Аргументы командной строки (по умолчанию - sys.argv[1:]).
+    :return: Код завершения: 0 - успешно, 1 - часть файлов не обработана, 2 - ошибка в аргументах или данных.
+    """
+    args = build_parser().parse_args(argv)
+    # Пакетный запуск не ждет нажатия Enter между таблицами
+    set_interactive(False)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
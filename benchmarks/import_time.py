@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*- # Языковая кодировка UTF-8
+"""
+Профиль времени импорта start_analysis.py (по отчету python -X importtime).
+
+Запуск из корня проекта:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 5 --top 30 --output benchmarks/import_time_report.txt
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Модуль, время импорта которого измеряется (то, что загружается до появления меню)
+TARGET_MODULE = 'start_analysis'
+
+# Тяжелые библиотеки, которые не должны загружаться при запуске программы
+HEAVY_MODULES = ('nltk', 'numpy', 'natasha', 'pymorphy2', 'pymorphy3')
+
+
+def profile_import(module=TARGET_MODULE):
+    """
+    Импортирует модуль в отдельном процессе с флагом -X importtime.
+
+    :param module: Имя модуля.
+    :return: Кортеж (словарь {модуль: (собственное время, суммарное время) в мкс}, загруженные тяжелые модули).
+    """
+    code = (f"import sys, {module}; "
+            f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Не удалось импортировать {module}: {result.stderr.strip().splitlines()[-1]}")
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_time), int(cumulative))
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return timings, loaded
+
+
+def build_report(runs, top):
+    """
+    Строит текстовый отчет: медианное время импорта целевого модуля и самые долгие импорты
+    (по суммарному времени в самом быстром запуске).
+
+    :param runs: Количество запусков.
+    :param top: Количество модулей в отчете.
+    :return: Текст отчета.
+    """
+    profiles = [profile_import() for _ in range(runs)]
+    totals = sorted(timings[TARGET_MODULE][1] for timings, _ in profiles)
+    fastest_timings, loaded = min(profiles, key=lambda profile: profile[0][TARGET_MODULE][1])
+
+    lines = [f"Python {sys.version.split()[0]}, запусков: {runs}",
+             f"Импорт {TARGET_MODULE}: медиана {totals[len(totals) // 2] / 1000:.1f} мс, "
+             f"минимум {totals[0] / 1000:.1f} мс, максимум {totals[-1] / 1000:.1f} мс",
+             f"Тяжелые модули, загруженные при импорте: {', '.join(loaded) if loaded else 'нет'}",
+             "",
+             f"{'суммарно, мс':>13} | {'собственное, мс':>15} | модуль"]
+    slowest = sorted(fastest_timings.items(), key=lambda item: item[1][1], reverse=True)[:top]
+    for name, (self_time, cumulative) in slowest:
+        lines.append(f"{cumulative / 1000:>13.1f} | {self_time / 1000:>15.1f} | {name}")
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Профиль времени импорта start_analysis.py.")
+    parser.add_argument('--runs', type=int, default=5, help="Количество запусков (по умолчанию 5).")
+    parser.add_argument('--top', type=int, default=25, help="Количество модулей в отчете (по умолчанию 25).")
+    parser.add_argument('--output', help="Файл, в который записывается отчет.")
+    args = parser.parse_args(argv)
+
+    report = build_report(args.runs, args.top)
+    print(report, end='')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,24 +2,8 @@
 import json
 import os
 import re
+import time
 
-import nltk
-
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-
-try:
-    nltk.data.find('tokenizers/punkt_tab/russian')
-except LookupError:
-    nltk.download('punkt_tab')
-
-from natasha import (
-    Segmenter, MorphVocab, NewsEmbedding,
-    NewsMorphTagger, NewsSyntaxParser, Doc
-)
-import pymorphy2
 from colorama import Fore, Style, init
 from rich.console import Console
 from rich.table import Table
@@ -27,11 +11,16 @@ from rich.table import Table
 from tools.core import preprocess_text
 from tools.core.constants import (
     NON_TRANSLATED_DB_NAME, MACHINE_TRANSLATED_DB_NAME,
-    HUMAN_TRANSLATED_DB_NAME, RETURN_TO_MENU
+    HUMAN_TRANSLATED_DB_NAME, RETURN_TO_MENU, PARSE_CACHE_PATH
 )
+from tools.core.context_store import context_retention, set_context_retention
+from tools.core.models import models
+from tools.core.parse_cache import parse_cache, parse_word
+from tools.core.parsed_document import ParsedDocument
+from tools.core.result_cache import FEATURE_GROUPS, result_cache, text_content_hash
 from tools.core.tokens_counter import count_tokens
 from tools.core.custom_punkt_tokenizer import sent_tokenize_with_abbr
-from tools.work_with_db import SaveToDatabase
+from tools.work_with_db import SaveToDatabase, DEFAULT_BATCH_SIZE
 from tools.core.utils import (
     wait_for_enter_to_analyze, display_morphological_annotation,
     format_morphological_features, wait_for_enter_to_choose_opt,
@@ -39,12 +28,7 @@ from tools.core.utils import (
 )
 from tools.core.validators import validate_gender, validate_years
 
-from tools.core.data.pronouns import (
-    pers_possessive_pronouns_analysis_list,
-    reflexive_pronoun_list, demonstrative_pronouns_list,
-    defining_pronouns_list, relative_pronouns_list,
-    indefinite_pronouns_list, negative_pronouns_list
-)
+from tools.core.lexicon import lexicon
 
 # Импорты для "Simplification_features"
 from tools.simplification.lexical_density import calculate_lexical_density
@@ -61,6 +45,7 @@ from tools.simplification.most_frequent_words import (
 )
 # Импорты для "Normalisation_features"
 from tools.normalisation.repetition import calculate_repetition
+from tools.normalisation.pmi import count_pmi_ngrams
 
 # Импорты для "Explicitation_features"
 from tools.explicitation.explicit_naming import calculate_explicit_naming_ratio
@@ -99,16 +84,39 @@ class CorpusText:
         self.authors = ""
         self.author_gender = ""
         self.author_birth_year = ""
+        # Идентификатор текста в БД, выдается при сохранении паспорта текста
+        self.text_id = None
 
-        self.morph = pymorphy2.MorphAnalyzer()
-        self.segmenter = Segmenter()
-        self.morph_vocab = MorphVocab()
-        self.embedding = NewsEmbedding()
-        self.morph_tagger = NewsMorphTagger(self.embedding)
-        self.syntax_parser = NewsSyntaxParser(self.embedding)
         self.morphological_analysis_result = None
         self.syntactic_analysis_result = None
 
+    # Модели pymorphy2 и Natasha не создаются для каждого текста, а берутся из общего реестра
+    # и загружаются лениво только при первом обращении
+
+    @property
+    def morph(self):
+        return models.morph
+
+    @property
+    def segmenter(self):
+        return models.segmenter
+
+    @property
+    def morph_vocab(self):
+        return models.morph_vocab
+
+    @property
+    def embedding(self):
+        return models.embedding
+
+    @property
+    def morph_tagger(self):
+        return models.morph_tagger
+
+    @property
+    def syntax_parser(self):
+        return models.syntax_parser
+
     def show_texts(self):
         """Отображает все тексты с их порядковыми номерами и
          позволяет выбрать один для отображения подробной информации."""
@@ -116,7 +124,42 @@ class CorpusText:
             db_fetch.display_texts()
 
     def analyze_and_save(self, show_analysis=False):
-        # Анализ Simplification_features
+        """Вычисляет индикаторы для текста и сохраняет их в базу данных вместе с паспортом текста."""
+        return self.save_analysis(self.compute_features(show_analysis, result_cache))
+
+    def compute_features(self, show_analysis=False, result_cache=None):
+        """
+        Вычисляет все индикаторы для текста, не обращаясь к базе данных.
+
+        Если передан кэш результатов, группы индикаторов, уже вычисленные для текста с тем же содержимым
+        текущей версией кода и списков слов, берутся из кэша, а вычисляются только остальные. При выводе
+        анализа в консоль все группы вычисляются заново (результаты при этом сохраняются в кэш).
+
+        :param show_analysis: Флаг для отображения анализа в консоли.
+        :param result_cache: Кэш результатов анализа (ResultCache) или None.
+        :return: Словарь {название таблицы: кортеж аргументов для соответствующего метода insert_*}.
+        """
+        features = {}
+        content_hash = None
+        if result_cache is not None:
+            content_hash = text_content_hash(self.text)
+            if not show_analysis:
+                features = result_cache.get(content_hash)
+
+        missing_groups = [group for group in FEATURE_GROUPS if group not in features]
+        if missing_groups:
+            # Текст разбирается один раз (предложения, токены, морфологические разборы) и передается всем индикаторам
+            document = ParsedDocument(self.text)
+            computed = {group: getattr(self, f'_compute_{group}')(document, show_analysis)
+                        for group in missing_groups}
+            if result_cache is not None:
+                result_cache.put(content_hash, computed)
+            features.update(computed)
+
+        return {group: features[group] for group in FEATURE_GROUPS}
+
+    def _compute_simplification(self, document, show_analysis):
+        """Вычисляет индикаторы Simplification_features."""
         if show_analysis:
             print("\n" + Fore.LIGHTWHITE_EX + "*" * 100)
             print(
@@ -125,23 +168,31 @@ class CorpusText:
                 + Fore.LIGHTGREEN_EX + Style.BRIGHT + " SIMPLIFICATION")
             print(Fore.LIGHTWHITE_EX + "*" * 100)
             wait_for_enter_to_analyze()
-        lexical_density = calculate_lexical_density(self.text, show_analysis)  # OK
-
-        ttr_lex_variety, log_ttr_lex_variety, modified_lex_variety = lexical_variety(self.text, show_analysis)  # OK
-
-        mean_word_length = mean_word_length_char(self.text, show_analysis)  # OK
-
-        syllable_ratio, total_syllables_count = calculate_syllable_ratio(self.text, show_analysis)  # OK
-
-        tokens_mean_sent_length = mean_sentence_length_in_tokens(self.text, show_analysis)  # OK
-        chars_mean_sent_length = mean_sentence_length_in_chars(self.text, show_analysis)  # OK
-        mean_word_rank_1, mean_word_rank_2, = calculate_mean_word_rank(self.text, show_analysis)  # OK
-        most_freq_words = find_n_most_frequent_words(self.text, show_analysis=show_analysis)  # OK
-        types_counts = count_types_in_text(self.text)
-        all_tokens_count, alpha_tokens_count, all_punct_tokens_count = count_tokens(self.text)
-
+        lexical_density = calculate_lexical_density(document, show_analysis)  # OK
+
+        ttr_lex_variety, log_ttr_lex_variety, modified_lex_variety = lexical_variety(document, show_analysis)  # OK
+
+        mean_word_length = mean_word_length_char(document, show_analysis)  # OK
+
+        syllable_ratio, total_syllables_count = calculate_syllable_ratio(document, show_analysis)  # OK
+
+        tokens_mean_sent_length = mean_sentence_length_in_tokens(document, show_analysis)  # OK
+        chars_mean_sent_length = mean_sentence_length_in_chars(document, show_analysis)  # OK
+        mean_word_rank_1, mean_word_rank_2, = calculate_mean_word_rank(document, show_analysis)  # OK
+        most_freq_words = find_n_most_frequent_words(document, show_analysis=show_analysis)  # OK
+        types_counts = count_types_in_text(document)
+        all_tokens_count, alpha_tokens_count, all_punct_tokens_count = count_tokens(document)
+        return (
+            lexical_density, ttr_lex_variety,
+            log_ttr_lex_variety, modified_lex_variety, mean_word_length,
+            syllable_ratio, total_syllables_count, tokens_mean_sent_length,
+            chars_mean_sent_length, mean_word_rank_1, mean_word_rank_2,
+            most_freq_words, types_counts, all_tokens_count, alpha_tokens_count, all_punct_tokens_count,
+        )
+
+    def _compute_normalisation(self, document, show_analysis):
+        """Вычисляет индикаторы Normalisation_features."""
         if show_analysis:
-            # Анализ Normalisation_features
             print("\n" + Fore.LIGHTWHITE_EX + "*" * 100)
             print(
                 Fore.GREEN + Style.BRIGHT +
@@ -150,10 +201,17 @@ class CorpusText:
             print(Fore.LIGHTWHITE_EX + "*" * 100)
             wait_for_enter_to_analyze()
         repetition, repeated_content_words_count, repeated_content_words, total_word_tokens = calculate_repetition(
-            self.text, show_analysis)  # OK
+            document, show_analysis)  # OK
+        return repetition, repeated_content_words_count, repeated_content_words, total_word_tokens
 
+    def _compute_pmi(self, document, show_analysis):
+        """Подсчитывает количества лемм и биграммов для PMI корпуса."""
+        pmi_word_counts, pmi_bigram_counts = count_pmi_ngrams(document)
+        return pmi_word_counts, pmi_bigram_counts
+
+    def _compute_explicitation(self, document, show_analysis):
+        """Вычисляет индикаторы Explicitation_features."""
         if show_analysis:
-            # Анализ Explicitation_features
             print("\n" + Fore.LIGHTWHITE_EX + "*" * 100)
             print(
                 Fore.GREEN + Style.BRIGHT +
@@ -161,38 +219,22 @@ class CorpusText:
                 Fore.LIGHTGREEN_EX + Style.BRIGHT + " EXPLICITATION")
             print(Fore.LIGHTWHITE_EX + "*" * 100)
             wait_for_enter_to_analyze()
-        explicit_naming_ratio = calculate_explicit_naming_ratio(self.text, show_analysis)  # OK
-        single_naming = single_naming_frequency(self.text, show_analysis)  # OK
+        explicit_naming_ratio = calculate_explicit_naming_ratio(document, show_analysis)  # OK
+        single_naming = single_naming_frequency(document, show_analysis)  # OK
         mean_multiple_naming, single_entities, single_entities_count, multiple_entities, multiple_entities_count = calculate_mean_multiple_naming(
-            self.text, show_analysis)  # OK
-        named_entities, named_entities_count = extract_entities(self.text, show_analysis)  # OK
-
-        (total_tokens_with_dms, sci_markers_total_count, found_sci_dms, markers_counts,
-         topic_intro_dm_count, topic_intro_dm_in_ord, topic_intro_dm_freq,
-         info_sequence_count, info_sequence_in_ord, info_sequence_freq,
-         illustration_dm_count, illustration_dm_in_ord, illustration_dm_freq,
-         material_sequence_count, material_sequence_in_ord, material_sequence_freq,
-         conclusion_dm_count, conclusion_dm_in_ord, conclusion_dm_freq,
-         intro_new_addit_info_count, intro_new_addit_info_in_ord, intro_new_addit_info_freq,
-         info_explanation_or_repetition_count, info_explanation_or_repetition_in_ord,
-         info_explanation_or_repetition_freq, contrast_dm_count, contrast_dm_in_ord,
-         contrast_dm_freq, examples_introduction_dm_count, examples_introduction_dm_in_ord,
-         examples_introduction_dm_freq,
-         author_opinion_count, author_opinion_in_ord, author_opinion_freq,
-         author_attitude_count, author_attitude_in_ord, author_attitude_freq,
-         high_certainty_modal_words_count, high_certainty_modal_words_in_ord,
-         high_certainty_modal_words_freq,
-         moderate_certainty_modal_words_count, moderate_certainty_modal_words_in_ord,
-         moderate_certainty_modal_words_freq,
-         uncertainty_modal_words_count, uncertainty_modal_words_in_ord, uncertainty_modal_words_freq,
-         call_to_action_dm_count, call_to_action_dm_in_ord, call_to_action_dm_freq,
-         joint_action_count, joint_action_in_ord, joint_action_freq, putting_emphasis_dm_count,
-         putting_emphasis_dm_in_ord, putting_emphasis_dm_freq, refer_to_background_knowledge_count,
-         refer_to_background_knowledge_in_ord, refer_to_background_knowledge_freq
-         ) = sci_dm_search(self.text, show_analysis)  # OK
-
+            document, show_analysis)  # OK
+        named_entities, named_entities_count = extract_entities(document, show_analysis)  # OK
+
+        dm_result = sci_dm_search(document, show_analysis)  # OK
+        return (
+            explicit_naming_ratio, single_naming, mean_multiple_naming, single_entities, single_entities_count,
+            multiple_entities, multiple_entities_count,
+            named_entities, named_entities_count, dm_result,
+        )
+
+    def _compute_interference(self, document, show_analysis):
+        """Вычисляет индикаторы Interference_features."""
         if show_analysis:
-            # Анализ Interference_features
             print("\n" + Fore.LIGHTWHITE_EX + "*" * 100)
             print(
                 Fore.GREEN + Style.BRIGHT +
@@ -202,17 +244,17 @@ class CorpusText:
             wait_for_enter_to_analyze()
 
         (pos_unigrams_counts, pos_unigrams_freq, pos_bigrams_counts,
-         pos_bigrams_freq, pos_trigrams_counts, pos_trigrams_freq) = pos_ngrams(self.text,
+         pos_bigrams_freq, pos_trigrams_counts, pos_trigrams_freq) = pos_ngrams(document,
                                                                                 show_analysis=show_analysis)  # OK
 
         (char_unigram_counts, char_unigram_freq, char_bigram_counts,
-         char_bigram_freq, char_trigram_counts, char_trigram_freq) = character_ngrams(self.text,
+         char_bigram_freq, char_trigram_counts, char_trigram_freq) = character_ngrams(document,
                                                                                       show_analysis=show_analysis)  # OK
 
-        token_positions_normalized_frequencies, token_positions_counts = calculate_position_frequencies(self.text,
+        token_positions_normalized_frequencies, token_positions_counts = calculate_position_frequencies(document,
                                                                                                         show_analysis)  # OK
 
-        token_positions_in_sent = extract_positions(self.text, show_analysis=False)  # OK
+        token_positions_in_sent = extract_positions(document, show_analysis=False)  # OK
         if show_analysis:
             print(
                 Fore.GREEN + Style.BRIGHT +
@@ -225,10 +267,20 @@ class CorpusText:
             print_positions(token_positions_in_sent)
 
         func_w_trigrams_freqs, func_w_trigram_with_pos_counts, func_w_full_contexts = contextual_function_words_in_trigrams(
-            self.text, show_analysis)
-
+            document, show_analysis)
+        return (
+            pos_unigrams_counts, pos_unigrams_freq, pos_bigrams_counts,
+            pos_bigrams_freq, pos_trigrams_counts, pos_trigrams_freq,
+            char_unigram_counts, char_unigram_freq, char_bigram_counts,
+            char_bigram_freq, char_trigram_counts, char_trigram_freq,
+            token_positions_normalized_frequencies, token_positions_counts,
+            token_positions_in_sent, func_w_trigrams_freqs,
+            func_w_trigram_with_pos_counts, func_w_full_contexts,
+        )
+
+    def _compute_miscellaneous(self, document, show_analysis):
+        """Вычисляет остальные индикаторы (Miscellaneous_features)."""
         if show_analysis:
-            # Анализ Miscellaneous_features
             print("\n" + Fore.LIGHTWHITE_EX + "*" * 100)
 
             print(
@@ -238,114 +290,85 @@ class CorpusText:
             print(Fore.LIGHTWHITE_EX + "*" * 100)
             wait_for_enter_to_analyze()
 
-        func_words_freq, func_words_counts = compute_function_word_frequencies(self.text, show_analysis)  # OK
-        pers_possessive_pronouns_frequencies, pers_possessive_pronouns_counts = compute_pronoun_frequencies(self.text,
-                                                                                                            pers_possessive_pronouns_analysis_list,
+        func_words_freq, func_words_counts = compute_function_word_frequencies(document, show_analysis)  # OK
+        pronoun_lists = lexicon.pronoun_lists
+        pers_possessive_pronouns_frequencies, pers_possessive_pronouns_counts = compute_pronoun_frequencies(document,
+                                                                                                            pronoun_lists['pers_possessive'],
                                                                                                             show_analysis)
-        reflexive_pronoun_frequencies, reflexive_pronoun_counts = compute_pronoun_frequencies(self.text,
-                                                                                              reflexive_pronoun_list,
+        reflexive_pronoun_frequencies, reflexive_pronoun_counts = compute_pronoun_frequencies(document,
+                                                                                              pronoun_lists['reflexive_pronoun'],
                                                                                               show_analysis)
-        demonstrative_pronouns_frequencies, demonstrative_pronouns_counts = compute_pronoun_frequencies(self.text,
-                                                                                                        demonstrative_pronouns_list,
+        demonstrative_pronouns_frequencies, demonstrative_pronouns_counts = compute_pronoun_frequencies(document,
+                                                                                                        pronoun_lists['demonstrative_pronouns'],
                                                                                                         show_analysis)
-        defining_pronouns_frequencies, defining_pronouns_counts = compute_pronoun_frequencies(self.text,
-                                                                                              defining_pronouns_list,
+        defining_pronouns_frequencies, defining_pronouns_counts = compute_pronoun_frequencies(document,
+                                                                                              pronoun_lists['defining_pronouns'],
                                                                                               show_analysis)
-        relative_pronouns_frequencies, relative_pronouns_counts = compute_pronoun_frequencies(self.text,
-                                                                                              relative_pronouns_list,
+        relative_pronouns_frequencies, relative_pronouns_counts = compute_pronoun_frequencies(document,
+                                                                                              pronoun_lists['relative_pronouns'],
                                                                                               show_analysis)
-        indefinite_pronouns_frequencies, indefinite_pronouns_counts = compute_pronoun_frequencies(self.text,
-                                                                                                  indefinite_pronouns_list,
+        indefinite_pronouns_frequencies, indefinite_pronouns_counts = compute_pronoun_frequencies(document,
+                                                                                                  pronoun_lists['indefinite_pronouns'],
                                                                                                   show_analysis)
-        negative_pronouns_frequencies, negative_pronouns_counts = compute_pronoun_frequencies(self.text,
-                                                                                              negative_pronouns_list,
+        negative_pronouns_frequencies, negative_pronouns_counts = compute_pronoun_frequencies(document,
+                                                                                              pronoun_lists['negative_pronouns'],
                                                                                               show_analysis)
 
         punct_marks_normalized_frequency, punct_marks_to_all_punct_frequency, punctuation_counts = analyze_punctuation(
-            self.text,
+            document,
             show_analysis)
 
         passive_to_all_v_ratio, passive_verbs, passive_verbs_count, all_verbs, all_verbs_count = calculate_passive_verbs_ratio(
-            self.text, show_analysis)
-
-        readability_index = flesh_readability_index_for_rus(self.text, show_analysis)
-
-        # Использование контекстного менеджера для работы с базой данных
-        with SaveToDatabase(self.db) as db_saver:
-            db_saver.insert_simplification_features(
-                lexical_density, ttr_lex_variety,
-                log_ttr_lex_variety, modified_lex_variety, mean_word_length,
-                syllable_ratio, total_syllables_count, tokens_mean_sent_length,
-                chars_mean_sent_length, mean_word_rank_1, mean_word_rank_2,
-                most_freq_words, types_counts, all_tokens_count, alpha_tokens_count, all_punct_tokens_count
-            )
-
-            db_saver.insert_normalisation_features(
-                repetition, repeated_content_words_count,
-                repeated_content_words, total_word_tokens
-            )
-
-            db_saver.insert_explicitation_features(
-                explicit_naming_ratio, single_naming, mean_multiple_naming, single_entities, single_entities_count,
-                multiple_entities, multiple_entities_count,
-                named_entities, named_entities_count,
-                total_tokens_with_dms, sci_markers_total_count, found_sci_dms, markers_counts,
-                topic_intro_dm_count, topic_intro_dm_in_ord, topic_intro_dm_freq,
-                info_sequence_count, info_sequence_in_ord, info_sequence_freq,
-                illustration_dm_count, illustration_dm_in_ord, illustration_dm_freq,
-                material_sequence_count, material_sequence_in_ord, material_sequence_freq,
-                conclusion_dm_count, conclusion_dm_in_ord, conclusion_dm_freq,
-                intro_new_addit_info_count, intro_new_addit_info_in_ord, intro_new_addit_info_freq,
-                info_explanation_or_repetition_count, info_explanation_or_repetition_in_ord,
-                info_explanation_or_repetition_freq, contrast_dm_count, contrast_dm_in_ord,
-                contrast_dm_freq, examples_introduction_dm_count, examples_introduction_dm_in_ord,
-                examples_introduction_dm_freq, author_opinion_count, author_opinion_in_ord,
-                author_opinion_freq,
-                author_attitude_count, author_attitude_in_ord, author_attitude_freq,
-                high_certainty_modal_words_count, high_certainty_modal_words_in_ord,
-                high_certainty_modal_words_freq,
-                moderate_certainty_modal_words_count, moderate_certainty_modal_words_in_ord,
-                moderate_certainty_modal_words_freq,
-                uncertainty_modal_words_count, uncertainty_modal_words_in_ord, uncertainty_modal_words_freq,
-                call_to_action_dm_count, call_to_action_dm_in_ord, call_to_action_dm_freq,
-                joint_action_count, joint_action_in_ord, joint_action_freq, putting_emphasis_dm_count,
-                putting_emphasis_dm_in_ord, putting_emphasis_dm_freq, refer_to_background_knowledge_count,
-                refer_to_background_knowledge_in_ord, refer_to_background_knowledge_freq,
-            )
+            document, show_analysis)
+
+        readability_index = flesh_readability_index_for_rus(document, show_analysis)
+        return (
+            func_words_freq, func_words_counts,
+            pers_possessive_pronouns_frequencies, pers_possessive_pronouns_counts,
+            reflexive_pronoun_frequencies, reflexive_pronoun_counts,
+            demonstrative_pronouns_frequencies, demonstrative_pronouns_counts,
+            defining_pronouns_frequencies, defining_pronouns_counts,
+            relative_pronouns_frequencies, relative_pronouns_counts,
+            indefinite_pronouns_frequencies, indefinite_pronouns_counts,
+            negative_pronouns_frequencies, negative_pronouns_counts,
+            punct_marks_normalized_frequency,
+            punct_marks_to_all_punct_frequency, punctuation_counts,
+            passive_to_all_v_ratio, passive_verbs, passive_verbs_count,
+            all_verbs, all_verbs_count, readability_index,
+        )
+
+    def save_analysis(self, features, db_saver=None, on_done=None):
+        """
+        Сохраняет паспорт текста и вычисленные индикаторы в базу данных одной транзакцией.
 
-            db_saver.insert_interference_features(
-                pos_unigrams_counts, pos_unigrams_freq, pos_bigrams_counts,
-                pos_bigrams_freq, pos_trigrams_counts, pos_trigrams_freq,
-                char_unigram_counts, char_unigram_freq, char_bigram_counts,
-                char_bigram_freq, char_trigram_counts, char_trigram_freq,
-                token_positions_normalized_frequencies, token_positions_counts,
-                token_positions_in_sent, func_w_trigrams_freqs,
-                func_w_trigram_with_pos_counts, func_w_full_contexts
-            )
-            db_saver.insert_miscellaneous_features(
-                func_words_freq, func_words_counts,
-                pers_possessive_pronouns_frequencies, pers_possessive_pronouns_counts,
-                reflexive_pronoun_frequencies, reflexive_pronoun_counts,
-                demonstrative_pronouns_frequencies, demonstrative_pronouns_counts,
-                defining_pronouns_frequencies, defining_pronouns_counts,
-                relative_pronouns_frequencies, relative_pronouns_counts,
-                indefinite_pronouns_frequencies, indefinite_pronouns_counts,
-                negative_pronouns_frequencies, negative_pronouns_counts,
-                punct_marks_normalized_frequency,
-                punct_marks_to_all_punct_frequency, punctuation_counts,
-                passive_to_all_v_ratio, passive_verbs, passive_verbs_count,
-                all_verbs, all_verbs_count, readability_index
-            )
+        Паспорт текста сохраняется первым и выдает text_id, на который ссылаются строки остальных таблиц.
 
-    def save_text_passport(self, text, title, subject_area, keywords,
-                           publication_year, published_in,
-                           authors, author_gender, author_birth_year):
-        # Использование контекстного менеджера для работы с базой данных
-        with SaveToDatabase(self.db) as db_saver:
-            db_saver.insert_text_passport(
-                text, title, subject_area, keywords, publication_year, published_in,
-                authors, author_gender, author_birth_year
+        :param features: Словарь, возвращаемый compute_features.
+        :param db_saver: Открытый SaveToDatabase (например, в пакетном режиме). Если None, открывается новое
+            соединение.
+        :param on_done: Функция (text_id, error), вызываемая после фиксации транзакции с текстом (error=None)
+            или после ее отката (error - исключение). В пакетном режиме текст записывается вместе с пакетом,
+            то есть, возможно, позже возврата из метода.
+        :return: text_id текста (в пакетном режиме - зарезервированный, текст может быть еще не записан).
+        """
+        if db_saver is None:
+            # Использование контекстного менеджера для работы с базой данных
+            with SaveToDatabase(self.db) as db_saver:
+                return self.save_analysis(features, db_saver, on_done)
+        text_id = None
+        with db_saver.transaction(None if on_done is None else lambda error: on_done(text_id, error)):
+            text_id = db_saver.insert_text_passport(
+                self.text, self.title, self.subject_area, self.keywords, self.publication_year,
+                self.published_in, self.authors, self.author_gender, self.author_birth_year
             )
+            db_saver.insert_simplification_features(text_id, *features['simplification'])
+            db_saver.insert_normalisation_features(text_id, *features['normalisation'])
+            db_saver.insert_pmi_counts(text_id, *features['pmi'])
+            db_saver.insert_explicitation_features(text_id, *features['explicitation'])
+            db_saver.insert_interference_features(text_id, *features['interference'])
+            db_saver.insert_miscellaneous_features(text_id, *features['miscellaneous'])
+        self.text_id = text_id
+        return text_id
 
     def create_text_passport(self):
         """Метод для ввода информации о паспорте текста и установки соответствующих атрибутов."""
@@ -455,7 +478,7 @@ class CorpusText:
                     lemma = token.lower()
                     morph_features = 'N/A'
                 else:
-                    parsed_token = self.morph.parse(token)[0]  # Берем наиболее вероятный разбор
+                    parsed_token = parse_word(token)  # Берем наиболее вероятный разбор (через общий кэш)
                     pos = parsed_token.tag.POS if parsed_token.tag.POS else 'UNKNOWN'
                     lemma = parsed_token.normal_form
                     morph_features = format_morphological_features(parsed_token.tag)
@@ -476,12 +499,14 @@ class CorpusText:
 
         with SaveToDatabase(self.db) as db_saver:
             db_saver.insert_morphological_annotation(
-                morph_analysis_str
+                self.text_id, morph_analysis_str
             )
         return all_sentences_info
 
     def get_syntactic_annotation(self, save=True):
         """Метод для выполнения синтаксической разметки текста с использованием Natasha."""
+        from natasha import Doc
+
         self.syntactic_analysis_result = []
 
         doc = Doc(self.text)
@@ -517,7 +542,7 @@ class CorpusText:
         if save:
             with SaveToDatabase(self.db) as db_saver:
                 db_saver.insert_syntactic_annotation(
-                    synt_analysis_string
+                    self.text_id, synt_analysis_string
                 )
         return synt_analysis_string
 
@@ -587,15 +612,13 @@ class CorpusText:
                     Fore.LIGHTRED_EX + "Неверный ввод. Пожалуйста, выберите один из возможных вариантов (y/n)." + Fore.RESET)
                 continue
 
+        # Паспорт текста и индикаторы сохраняются вместе, паспорт выдает text_id для разметки
         self.analyze_and_save(show_analysis)
         print(
             Fore.GREEN + Style.BRIGHT + "\nАНАЛИЗ ИНДИКАТОРОВ ФЕНОМЕНА" + Fore.LIGHTGREEN_EX + Style.BRIGHT +
             " TRANSLATIONESE " + Fore.GREEN + Style.BRIGHT + "УСПЕШНО ЗАВЕРШЕН!")
         print(Fore.LIGHTGREEN_EX + Style.BRIGHT + "РЕЗУЛЬТАТЫ АНАЛИЗА СОХРАНЕНЫ В БАЗУ ДАННЫХ.\n" + Fore.RESET)
         wait_for_enter_to_analyze()
-        self.save_text_passport(
-            self.text, self.title, self.subject_area, self.keywords, self.publication_year,
-            self.published_in, self.authors, self.author_gender, self.author_birth_year)
 
         morph_ann = self.get_morphological_annotation()
         print(
@@ -810,6 +833,194 @@ def text_input_for_analysis():
             return input_text
 
 
+def ask_workers_count():
+    """
+    Запрашивает у пользователя количество процессов для анализа текстов.
+
+    :return: Количество процессов (по умолчанию - количество ядер процессора).
+    """
+    default_workers = os.cpu_count() or 1
+    while True:
+        workers = input(Fore.GREEN + Style.BRIGHT + f"Введите количество процессов для анализа "
+                                                    f"(Enter - {default_workers}): " + Fore.RESET).strip()
+        if not workers:
+            return default_workers
+        if workers.isdigit() and int(workers) > 0:
+            return int(workers)
+        print(Fore.LIGHTRED_EX + "Количество процессов должно быть целым положительным числом." + Fore.RESET)
+
+
+def init_analysis_worker(retention=None, track_parses=False):
+    """
+    Инициализирует процесс-обработчик: загружает модели и кэш разборов один раз на процесс.
+
+    :param retention: Кортеж (политика, размер выборки) хранения контекстов, заданный в основном процессе.
+    :param track_parses: Если True, новые разборы процесса передаются в основной процесс (analyze_file_in_pool).
+    """
+    if retention is not None:
+        set_context_retention(*retention)
+    models.morph
+    models.ner_tagger
+    parse_cache.load(PARSE_CACHE_PATH)
+    if track_parses:
+        parse_cache.start_tracking()
+
+
+def analyze_file(task):
+    """
+    Вычисляет индикаторы для одного файла. Выполняется в процессе-обработчике и не обращается к БД.
+
+    Ошибка при обработке файла не прерывает анализ остальных файлов, а возвращается вместе с результатом.
+
+    :param task: Кортеж (номер файла, путь к файлу).
+    :return: Кортеж (номер файла, путь к файлу, текст, словарь индикаторов, текст ошибки или None).
+    """
+    idx, file_path = task
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            text = file.read()
+        features = CorpusText(text=text).compute_features(show_analysis=False, result_cache=result_cache)
+        return idx, file_path, text, features, None
+    except Exception as e:
+        return idx, file_path, None, None, f"{type(e).__name__}: {e}"
+
+
+def analyze_file_in_pool(task):
+    """
+    Вариант analyze_file для пула процессов: вместе с результатом возвращает снимок новых разборов кэша
+    процесса-обработчика, чтобы основной процесс сохранил их для теплого старта и учел в статистике.
+
+    :param task: Кортеж (номер файла, путь к файлу).
+    :return: Кортеж (результат analyze_file, снимок ParseCache.take_snapshot).
+    """
+    return analyze_file(task), parse_cache.take_snapshot()
+
+
+def analyze_files_in_parallel(text_files, db, subject_area, dir_name, workers=None, ordered=True,
+                              batch_size=DEFAULT_BATCH_SIZE, file_indexes=None, on_result=None):
+    """
+    Анализирует файлы в пуле процессов и сохраняет результаты в базу данных.
+
+    Каждый процесс загружает модели один раз и только вычисляет индикаторы; запись в SQLite
+    выполняет единственный писатель - текущий процесс. При workers=1 анализ идет в текущем процессе.
+
+    :param text_files: Список путей к txt-файлам.
+    :param db: Имя базы данных.
+    :param subject_area: Предметная область, общая для всех текстов.
+    :param dir_name: Название директории (используется в названиях текстов).
+    :param workers: Количество процессов (по умолчанию - количество ядер процессора).
+    :param ordered: Если True, результаты сохраняются в порядке файлов, иначе - по мере готовности.
+    :param batch_size: Количество текстов, записываемых в базу данных одной транзакцией.
+    :param file_indexes: Номера файлов в названиях текстов (по умолчанию - 1, 2, ... по порядку файлов).
+    :param on_result: Функция, вызываемая после обработки каждого файла с аргументами (номер файла, путь к файлу,
+        текст, text_id, ошибка); text_id равен None, если текст не сохранен.
+    :return: Кортеж (количество сохраненных текстов, список (путь к файлу, ошибка)). Если пул процессов
+        аварийно завершился, все необработанные файлы попадают в список ошибок.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(text_files)))
+    tasks = list(zip(file_indexes or range(1, len(text_files) + 1), text_files))
+    total = len(tasks)
+    saved = 0
+    errors = []
+    start = time.perf_counter()
+    db_saver = SaveToDatabase(db)
+
+    processed = set()
+    reported = 0
+
+    def report(idx, file_path, text, text_name, text_id, error):
+        nonlocal saved, reported
+        reported += 1
+        elapsed = time.perf_counter() - start
+        throughput = reported / elapsed * 60 if elapsed else 0
+        if error is None:
+            saved += 1
+            print(Fore.LIGHTGREEN_EX + f"[{reported}/{total}] Текст \"{text_name}\" успешно проанализирован и сохранён. "
+                                       f"({throughput:.1f} текстов/мин)" + Fore.RESET)
+        else:
+            errors.append((file_path, error))
+            print(Fore.LIGHTRED_EX + f"[{reported}/{total}] Ошибка при обработке файла {file_path}: {error}"
+                  + Fore.RESET)
+        if on_result is not None:
+            on_result(idx, file_path, text, text_id, error)
+
+    def save_result(result):
+        idx, file_path, text, features, error = result
+        processed.add(idx)
+        if error is not None:
+            report(idx, file_path, text, None, None, error)
+            return
+        text_name = f"{dir_name.capitalize()}_{idx}"  # Формируем название статьи
+        done = []
+
+        def on_done(text_id, write_error):
+            # Результат сообщается только после фиксации (или отката) транзакции, в которую попал текст
+            done.append(True)
+            if write_error is None:
+                report(idx, file_path, text, text_name, text_id, None)
+            else:
+                report(idx, file_path, text, text_name, None, f"{type(write_error).__name__}: {write_error}")
+
+        try:
+            corpus = CorpusText(db=db, text=text)
+            corpus.title = text_name
+            corpus.subject_area = subject_area  # Введённая пользователем предметная область
+            # Паспорт текста и индикаторы записываются одной транзакцией
+            corpus.save_analysis(features, db_saver, on_done=on_done)
+        except Exception as e:
+            # Ошибка записи пакета уже сообщена для всех его текстов через on_done
+            if not done:
+                report(idx, file_path, text, text_name, None, f"{type(e).__name__}: {e}")
+
+    # Соединение остается открытым, строки нескольких текстов записываются одной транзакцией
+    with db_saver, db_saver.batch(batch_size):
+        if workers == 1:
+            init_analysis_worker()
+            for task in tasks:
+                save_result(analyze_file(task))
+            models.display_stats()
+            result_cache.display_stats()
+        else:
+            print(Fore.LIGHTGREEN_EX + f"Анализ запущен в {workers} процессах." + Fore.RESET)
+            # Политика хранения контекстов передается процессам явно (она могла быть задана после запуска программы)
+            retention = (context_retention.mode, context_retention.sample_size)
+            try:
+                # Новые разборы процессов объединяются с сохраненным кэшем в основном процессе
+                parse_cache.load(PARSE_CACHE_PATH)
+                with ProcessPoolExecutor(max_workers=workers, initializer=init_analysis_worker,
+                                         initargs=(retention, True)) as executor:
+                    if ordered:
+                        results = executor.map(analyze_file_in_pool, tasks)
+                    else:
+                        results = (future.result() for future in
+                                   as_completed([executor.submit(analyze_file_in_pool, task) for task in tasks]))
+                    for result, parses in results:
+                        parse_cache.merge_snapshot(parses)
+                        save_result(result)
+            except BrokenProcessPool as e:
+                print(Fore.LIGHTRED_EX + f"Пул процессов аварийно завершился: {e}." + Fore.RESET)
+                # Необработанные файлы считаются ошибками, чтобы вызывающий код отличал их от обработанных
+                for idx, file_path in [task for task in tasks if task[0] not in processed]:
+                    save_result((idx, file_path, None, None,
+                                 f"{type(e).__name__}: пул процессов аварийно завершился"))
+        try:
+            # Оставшиеся тексты последнего пакета
+            db_saver.flush()
+        except Exception:
+            pass  # Тексты пакета уже отмечены как несохраненные через on_done
+        parse_cache.save(PARSE_CACHE_PATH)
+        parse_cache.display_stats()
+
+    elapsed = time.perf_counter() - start
+    print(Fore.LIGHTGREEN_EX + Style.BRIGHT + f"Сохранено текстов: {saved} из {total} за {elapsed:.1f} с"
+                                              f" ({saved / elapsed * 60 if elapsed else 0:.1f} текстов/мин)."
+          + Fore.RESET)
+    return saved, errors
+
+
 def analyze_texts_from_directory(base_dir, db):
     """
     Анализирует все текстовые файлы из указанной директории.
@@ -859,34 +1070,8 @@ def analyze_texts_from_directory(base_dir, db):
                                                   f" Пожалуйста, "
                                                   f"будьте готовы подождать "
                                                   f" несколько минут.")
-        for idx, file_path in enumerate(text_files, start=1):
-            try:
-                text_name = f"{dir_name.capitalize()}_{idx}"  # Формируем название статьи
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    text = file.read()
-
-                # Вызываем анализ текста
-                corpus = CorpusText(db=db, text=text)
-                corpus.analyze_and_save(show_analysis=False)
-
-                # Сохраняем паспорт текста напрямую
-                corpus.save_text_passport(
-                    text=text,
-                    title=text_name,
-                    subject_area=subject_area,  # Введённая пользователем предметная область
-                    keywords="",
-                    publication_year="",
-                    published_in="",
-                    authors="",
-                    author_gender="",
-                    author_birth_year=""
-                )
-                print(Fore.LIGHTGREEN_EX + f"Текст \"{text_name}\" успешно "
-                                           f"проанализирован и сохранён."
-                      + Fore.RESET)
-
-            except Exception as e:
-                print(Fore.LIGHTRED_EX + f"Ошибка при обработке файла {file_path}: {e}")
+        workers = ask_workers_count()
+        analyze_files_in_parallel(text_files, db, subject_area, dir_name, workers=workers)
         # Выходим из цикла после успешного завершения анализа всех файлов
         print(Fore.LIGHTGREEN_EX + Style.BRIGHT +
               "Анализ всех текстов завершён."
@@ -895,4 +1080,5 @@ def analyze_texts_from_directory(base_dir, db):
         break
 
 
-start_analysis()
+if __name__ == "__main__":
+    start_analysis()
@@ -23,6 +23,10 @@ GRAMMEMES_NGRAMS = {
 
 }
 
+# Словарь частеречных n-граммов: части речи pymorphy2 и маркеры COMMA, S_END, S_START.
+# Номер метки (индекс в кортеже) используется в упакованных ключах n-граммов (n_grams_analyzer)
+POS_NGRAM_TAGS = tuple(GRAMMEMES_NGRAMS)
+
 GRAMMEMES_MORPH_ANNOTATION = {
     "NOUN": ("имя существительное", "измерение"),
     "ADJF": ("имя прилагательное (полное)", "хороший"),
@@ -101,6 +105,12 @@ NON_TRANSLATED_DB_NAME = 'auth_texts_corpus.db'
 HUMAN_TRANSLATED_DB_NAME = 'ht_texts_corpus.db'
 MACHINE_TRANSLATED_DB_NAME = 'mt_texts_corpus.db'
 
+# Файл для теплого старта кэша морфологических разборов pymorphy2
+PARSE_CACHE_PATH = 'parse_cache.json'
+
+# Кэш результатов анализа по хэшу содержимого текста (общий для всех корпусов)
+ANALYSIS_CACHE_PATH = 'analysis_cache.db'
+
 AUTH_CORPUS_NAME = 'КОРПУС НЕПЕРЕВОДНЫХ ТЕКСТОВ'
 HT_CORPUS_NAME = 'КОРПУС РУЧНЫХ ПЕРЕВОДОВ'
 MT_CORPUS_NAME = 'КОРПУС МАШИННЫХ ПЕРЕВОДОВ'
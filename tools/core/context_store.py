@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*- # Языковая кодировка UTF-8
+import random
+import struct
+import sys
+import zlib
+from array import array
+
+# Политики хранения контекстов: все контексты, случайная выборка не более sample_size на категорию, без контекстов
+CONTEXT_RETENTION_MODES = ('full', 'sample', 'off')
+
+# Политика по умолчанию и размер выборки по умолчанию
+DEFAULT_CONTEXT_RETENTION = 'full'
+DEFAULT_CONTEXT_SAMPLE_SIZE = 50
+
+# Двоичная форма контекстов: сигнатура и версия формата, далее сжатые zlib данные
+CONTEXTS_MAGIC = b'TRCTX'
+CONTEXTS_FORMAT_VERSION = 1
+CONTEXTS_HEADER = struct.Struct('<5sB')
+
+# Номер строки, обозначающий отсутствующую метку (например, часть речи, которую pymorphy2 не определил)
+NO_LABEL = 0xFFFFFFFF
+
+# Разделитель строк словаря (не встречается в токенах и метках)
+STRINGS_SEPARATOR = '\x00'
+
+
+class ContextRetention:
+    """
+    Политика хранения контекстов (вхождений триграммов с функциональными словами, позиционных контекстов
+    предложений), которые сохраняются вместе с индикаторами текста.
+
+    Для длинных текстов полные контексты занимают в базе данных больше места, чем сам текст, поэтому их
+    можно хранить случайной выборкой (reservoir sampling) не более sample_size на категорию или не хранить.
+    """
+
+    def __init__(self, mode=DEFAULT_CONTEXT_RETENTION, sample_size=DEFAULT_CONTEXT_SAMPLE_SIZE):
+        """
+        :param mode: Политика: 'full', 'sample' или 'off'.
+        :param sample_size: Максимальное количество контекстов одной категории при политике 'sample'.
+        """
+        self.mode = None
+        self.sample_size = None
+        self.configure(mode, sample_size)
+
+    def configure(self, mode, sample_size=DEFAULT_CONTEXT_SAMPLE_SIZE):
+        """
+        Меняет политику хранения контекстов.
+
+        :param mode: Политика: 'full', 'sample' или 'off'.
+        :param sample_size: Максимальное количество контекстов одной категории при политике 'sample'.
+        """
+        if mode not in CONTEXT_RETENTION_MODES:
+            raise ValueError(f"Неизвестная политика хранения контекстов: {mode}. "
+                             f"Допустимые значения: {', '.join(CONTEXT_RETENTION_MODES)}.")
+        if not isinstance(sample_size, int) or sample_size < 1:
+            raise ValueError("Размер выборки контекстов должен быть целым положительным числом.")
+        self.mode = mode
+        self.sample_size = sample_size
+
+    @property
+    def key(self):
+        """Строка, однозначно описывающая политику (используется в версии кэша результатов)."""
+        return f"sample{self.sample_size}" if self.mode == 'sample' else self.mode
+
+
+class ContextStore:
+    """
+    Контексты одного текста по категориям с учетом политики хранения.
+
+    Контекст - номер (например, номер предложения) и фиксированное количество токенов с метками (часть речи
+    или функциональное слово). В двоичной форме пары (токен, метка) записываются номерами в словаре текста,
+    а контексты - строками этих номеров, поэтому повторяющиеся токены хранятся один раз.
+    """
+
+    def __init__(self, width, retention=None):
+        """
+        :param width: Количество токенов в контексте.
+        :param retention: Политика хранения (ContextRetention), по умолчанию - общая context_retention.
+        """
+        retention = retention or context_retention
+        self.width = width
+        self.mode = retention.mode
+        self.sample_size = retention.sample_size
+        # Категория -> [количество найденных контекстов, сохраненные (порядковый номер, номер, токены, метки)]
+        self.groups = {}
+        # Выборка воспроизводима: один и тот же текст дает одни и те же контексты
+        self._random = random.Random(0)
+
+    @property
+    def enabled(self):
+        """Сохраняются ли контексты (политика не 'off')."""
+        return self.mode != 'off'
+
+    def add(self, category, tokens, labels, number=0):
+        """
+        Добавляет контекст.
+
+        :param category: Категория контекста.
+        :param tokens: Токены контекста (width строк).
+        :param labels: Метки токенов (строки или None).
+        :param number: Номер контекста (например, номер предложения).
+        """
+        group = self.groups.get(category)
+        if group is None:
+            group = self.groups[category] = [0, []]
+        index = group[0]
+        group[0] += 1
+        rows = group[1]
+        if self.mode == 'full':
+            rows.append((index, number, tuple(tokens), tuple(labels)))
+        elif self.mode == 'sample':
+            if len(rows) < self.sample_size:
+                rows.append((index, number, tuple(tokens), tuple(labels)))
+            else:
+                position = self._random.randrange(index + 1)
+                if position < self.sample_size:
+                    rows[position] = (index, number, tuple(tokens), tuple(labels))
+
+    def rows(self, category):
+        """
+        Сохраненные контексты категории в порядке их появления в тексте.
+
+        :return: Список кортежей (номер, токены, метки).
+        """
+        group = self.groups.get(category)
+        if group is None:
+            return []
+        return [(number, tokens, labels) for _, number, tokens, labels in sorted(group[1])]
+
+    def categories(self):
+        """Категории в порядке появления первого контекста."""
+        return list(self.groups)
+
+    def retention_note(self, category=None):
+        """
+        Пояснение для вывода, если сохранены не все контексты.
+
+        :param category: Категория (по умолчанию - все категории вместе).
+        :return: Строка или None, если сохранены все контексты.
+        """
+        groups = [self.groups[category]] if category in self.groups else list(self.groups.values())
+        found = sum(seen for seen, _ in groups)
+        kept = sum(len(rows) for _, rows in groups)
+        if self.mode == 'off':
+            return f"Контексты не сохранялись (найдено {found})."
+        if kept < found:
+            return f"Сохранена случайная выборка контекстов: {kept} из {found}."
+        return None
+
+    def to_bytes(self):
+        """
+        Компактная двоичная форма: словарь строк, пары (токен, метка) номерами строк и контексты
+        номерами пар; данные сжимаются zlib.
+
+        :return: bytes.
+        """
+        strings = {}
+        pairs = {}
+        pair_ids = array('I')
+        numbers = array('I')
+        for _, rows in self.groups.values():
+            for _, number, tokens, labels in sorted(rows):
+                numbers.append(number)
+                for pair in zip(tokens, labels):
+                    pair_id = pairs.get(pair)
+                    if pair_id is None:
+                        pair_id = pairs[pair] = len(pairs)
+                    pair_ids.append(pair_id)
+        pair_strings = array('I')
+        for token, label in pairs:
+            pair_strings.append(strings.setdefault(token, len(strings)))
+            pair_strings.append(NO_LABEL if label is None else strings.setdefault(label, len(strings)))
+
+        strings_data = STRINGS_SEPARATOR.join(strings).encode('utf-8')
+        parts = [struct.pack('<BIIII', CONTEXT_RETENTION_MODES.index(self.mode), self.sample_size, self.width,
+                             len(strings), len(pairs)),
+                 struct.pack('<I', len(strings_data)), strings_data, _array_bytes(pair_strings),
+                 struct.pack('<I', len(self.groups))]
+        for category, (seen, rows) in self.groups.items():
+            name = str(category).encode('utf-8')
+            parts.append(struct.pack('<HII', len(name), seen, len(rows)))
+            parts.append(name)
+        parts.append(_array_bytes(numbers))
+        parts.append(_array_bytes(pair_ids))
+        return CONTEXTS_HEADER.pack(CONTEXTS_MAGIC, CONTEXTS_FORMAT_VERSION) + zlib.compress(b''.join(parts))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Восстанавливает контексты из двоичной формы to_bytes.
+
+        :param data: bytes (или memoryview).
+        :return: ContextStore.
+        """
+        data = bytes(data)
+        if len(data) < CONTEXTS_HEADER.size:
+            raise ValueError("Двоичные данные контекстов повреждены: нет заголовка.")
+        magic, version = CONTEXTS_HEADER.unpack_from(data)
+        if magic != CONTEXTS_MAGIC or version != CONTEXTS_FORMAT_VERSION:
+            raise ValueError("Неизвестный формат двоичных данных контекстов.")
+        body = zlib.decompress(data[CONTEXTS_HEADER.size:])
+
+        mode_index, sample_size, width, strings_count, pairs_count = struct.unpack_from('<BIIII', body)
+        offset = struct.calcsize('<BIIII')
+        (strings_size,) = struct.unpack_from('<I', body, offset)
+        offset += 4
+        strings = body[offset:offset + strings_size].decode('utf-8').split(STRINGS_SEPARATOR) if strings_count else []
+        offset += strings_size
+        pair_strings, offset = _read_array(body, offset, 2 * pairs_count)
+        pairs = [(strings[pair_strings[2 * index]],
+                  None if pair_strings[2 * index + 1] == NO_LABEL else strings[pair_strings[2 * index + 1]])
+                 for index in range(pairs_count)]
+
+        (groups_count,) = struct.unpack_from('<I', body, offset)
+        offset += 4
+        groups = []
+        for _ in range(groups_count):
+            name_size, seen, kept = struct.unpack_from('<HII', body, offset)
+            offset += struct.calcsize('<HII')
+            groups.append((body[offset:offset + name_size].decode('utf-8'), seen, kept))
+            offset += name_size
+        rows_count = sum(kept for _, _, kept in groups)
+        numbers, offset = _read_array(body, offset, rows_count)
+        pair_ids, offset = _read_array(body, offset, rows_count * width)
+
+        store = cls(width, ContextRetention(CONTEXT_RETENTION_MODES[mode_index], sample_size))
+        row = 0
+        for category, seen, kept in groups:
+            rows = []
+            for index in range(kept):
+                row_pairs = [pairs[pair_id] for pair_id in pair_ids[row * width:(row + 1) * width]]
+                rows.append((index, numbers[row], tuple(token for token, _ in row_pairs),
+                             tuple(label for _, label in row_pairs)))
+                row += 1
+            store.groups[category] = [seen, rows]
+        return store
+
+
+def _array_bytes(values):
+    """Байты массива array('I') в порядке little-endian."""
+    if sys.byteorder != 'little':
+        values = array('I', values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_array(data, offset, count):
+    """Читает count чисел uint32 (little-endian) начиная с offset; возвращает (список чисел, новое смещение)."""
+    values = array('I')
+    values.frombytes(data[offset:offset + 4 * count])
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tolist(), offset + 4 * count
+
+
+def is_encoded_contexts(value):
+    """Проверяет, что значение - двоичная форма контекстов (а не JSON-строка из старых записей БД)."""
+    return isinstance(value, (bytes, bytearray, memoryview))
+
+
+def set_context_retention(mode, sample_size=DEFAULT_CONTEXT_SAMPLE_SIZE):
+    """
+    Задает политику хранения контекстов для текущего процесса.
+
+    :param mode: Политика: 'full', 'sample' или 'off'.
+    :param sample_size: Максимальное количество контекстов одной категории при политике 'sample'.
+    """
+    context_retention.configure(mode, sample_size)
+
+
+# Единственная политика хранения контекстов на процесс
+context_retention = ContextRetention()
+
+
+if __name__ == "__main__":
+    # Пример использования
+    store = ContextStore(3, ContextRetention('sample', 2))
+    for number in range(5):
+        store.add('one_function_word', ['и', 'в', f'доме{number}'], ['и', 'в', 'NOUN'], number)
+    data = store.to_bytes()
+    print(len(data), "байт")
+    restored = ContextStore.from_bytes(data)
+    print(restored.rows('one_function_word'))
+    print(restored.retention_note())
@@ -1,23 +1,83 @@
 # -*- coding: utf-8 -*- # Языковая кодировка UTF-8
-from nltk.tokenize.punkt import PunktSentenceTokenizer, PunktParameters
+from functools import cached_property
 
-from tools.core.data.abbreviations import sorted_abbrev
+from tools.core.lazy_imports import nltk
+from tools.core.lexicon import lexicon
+
+
+class SentenceSplitter:
+    """
+    Разбиение текста на предложения токенизатором Punkt с учетом сокращений (точка после сокращения
+    не считается концом предложения).
+
+    Параметры и токенизатор создаются один раз, при первом разбиении (вместе с загрузкой NLTK),
+    и переиспользуются для всех текстов. Символы новой строки перед разбиением удаляются, поэтому
+    смещения предложений относятся к тексту без них (prepare).
+    """
+
+    def __init__(self, abbreviations=None):
+        """
+        :param abbreviations: Сокращения без точки. По умолчанию - сокращения из снимка списков слов
+            (lexicon.sorted_abbrev).
+        """
+        self._abbreviations = abbreviations
+
+    @cached_property
+    def tokenizer(self):
+        # PunktParameters хранит настройки; сокращения добавляются в abbrev_types, чтобы токенизатор
+        # не считал точку после них концом предложения
+        punct_param = nltk.tokenize.punkt.PunktParameters()
+        punct_param.abbrev_types = set(self._abbreviations if self._abbreviations is not None
+                                       else lexicon.sorted_abbrev)
+        return nltk.tokenize.punkt.PunktSentenceTokenizer(punct_param)
+
+    @staticmethod
+    def prepare(text):
+        """Текст, который разбивается на предложения (без символов новой строки)."""
+        return text.replace('\n', '')
+
+    def span_tokenize(self, text):
+        """
+        Находит границы предложений.
+
+        :param text: Исходный текст.
+        :return: Список кортежей (start, end) - смещений предложений в prepare(text).
+        """
+        return list(self.tokenizer.span_tokenize(self.prepare(text)))
+
+    def tokenize(self, text):
+        """
+        Разбивает текст на предложения.
+
+        :param text: Исходный текст.
+        :return: Список предложений.
+        """
+        prepared = self.prepare(text)
+        return [prepared[start:end] for start, end in self.tokenizer.span_tokenize(prepared)]
+
+    def tokenize_many(self, texts):
+        """
+        Разбивает на предложения несколько текстов одним токенизатором.
+
+        :param texts: Итерируемый набор текстов.
+        :return: Генератор списков предложений (по одному списку на текст, в том же порядке).
+        """
+        for text in texts:
+            yield self.tokenize(text)
+
+
+# Единственный экземпляр токенизатора предложений на процесс
+sentence_splitter = SentenceSplitter()
 
 
 def sent_tokenize_with_abbr(text):
-    text = text.replace('\n', '')
-    # Шаг 1:Cоздаём объект PunktParameters, который будет хранить наши настройки.
-    punct_param = PunktParameters()
-    # Шаг 2: Добавление сокращений в параметр токенизатора abbrev_types.
-    # Это позволяет токенизатору учитывать их и не считать точку после этих сокращений как конец предложения.
-    punct_param.abbrev_types = sorted_abbrev
-    # Шаг 3: Создание кастомного токенизатора с учётом настроек
-    sentence_splitter_with_abbr = PunktSentenceTokenizer(punct_param)
-
-    # Шаг 5: Токенизация текста на предложения
-    # Используем наш кастомный токенизатор для разбиения текста на предложения.
-    sentences = list(sentence_splitter_with_abbr.tokenize(text))
-    return sentences
+    """
+    Разбивает текст на предложения с учетом сокращений (общим токенизатором sentence_splitter).
+
+    :param text: Исходный текст.
+    :return: Список предложений.
+    """
+    return sentence_splitter.tokenize(text)
 
 
 if __name__ == "__main__":
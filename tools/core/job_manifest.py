@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*- # Языковая кодировка UTF-8
+import json
+import os
+import sqlite3 as sq
+import time
+
+from tools.core.result_cache import text_content_hash
+
+# Количество text_id в одном запросе при сверке журнала с базой данных
+RECONCILE_CHUNK_SIZE = 500
+
+
+class ManifestEntry:
+    """
+    Файл задания пакетного анализа: номер в названии текста, метаданные и состояние обработки
+    ('pending' - не обработан, 'saved' - сохранен в базу данных, 'failed' - ошибка при обработке).
+    """
+
+    def __init__(self, path, index, subject_area, name_prefix):
+        self.path = path
+        self.index = index
+        self.subject_area = subject_area
+        self.name_prefix = name_prefix
+        self.status = 'pending'
+        self.text_id = None
+        self.content_hash = None
+        self.error = None
+
+
+class JobManifest:
+    """
+    Журнал пакетного анализа в формате JSON Lines: файлы задания и результат обработки каждого из них.
+
+    Записи только дописываются в конец файла и сразу сбрасываются на диск, поэтому после прерывания
+    анализа журнал остается целым (неполная последняя строка пропускается). При повторном запуске
+    сохраненные файлы пропускаются, а остальные анализируются с теми же номерами и метаданными.
+    Тексты записываются в базу данных пакетами, поэтому отметка о сохранении может опережать фиксацию
+    транзакции: перед продолжением отметки сверяются с базой данных (reconcile).
+    """
+
+    def __init__(self, path, db):
+        """
+        :param path: Путь к файлу журнала.
+        :param db: Путь к базе данных корпуса, в которую сохраняются тексты задания.
+        """
+        self.path = path
+        self.db = db
+        self.entries = {}
+        self._file = None
+
+    def load(self):
+        """
+        Читает журнал, если он существует.
+
+        :return: Количество файлов в журнале.
+        """
+        if not os.path.isfile(self.path):
+            return 0
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Строка, запись которой прервалась
+                    continue
+                self._apply(record)
+        return len(self.entries)
+
+    def _apply(self, record):
+        event = record.get('event')
+        if event == 'job':
+            if os.path.abspath(record['db']) != os.path.abspath(self.db):
+                raise ValueError(f"Журнал {self.path} относится к базе данных {record['db']}, а не к {self.db}.")
+        elif event == 'file':
+            self.entries[record['path']] = ManifestEntry(record['path'], record['index'], record['subject_area'],
+                                                         record['name_prefix'])
+        elif event in ('saved', 'failed'):
+            entry = self.entries.get(record['path'])
+            if entry is not None:
+                entry.status = event
+                entry.text_id = record.get('text_id')
+                entry.content_hash = record.get('content_hash')
+                entry.error = record.get('error')
+
+    def _append(self, record):
+        if self._file is None:
+            new_file = not os.path.isfile(self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if new_file:
+                self._append({'event': 'job', 'db': self.db, 'created': time.strftime('%Y-%m-%d %H:%M:%S')})
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._apply(record)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_file(self, path, subject_area, name_prefix):
+        """
+        Добавляет файл в задание. Номер файла в названии текста следует за номерами уже добавленных
+        файлов с тем же префиксом названия.
+
+        :param path: Абсолютный путь к файлу.
+        :param subject_area: Предметная область текста.
+        :param name_prefix: Префикс названия текста (название текста - "{Префикс}_{номер}").
+        :return: ManifestEntry.
+        """
+        if path in self.entries:
+            return self.entries[path]
+        index = 1 + max((entry.index for entry in self.entries.values() if entry.name_prefix == name_prefix),
+                        default=0)
+        self._append({'event': 'file', 'path': path, 'index': index, 'subject_area': subject_area,
+                      'name_prefix': name_prefix})
+        return self.entries[path]
+
+    def record_result(self, index, path, text, text_id, error):
+        """
+        Отмечает результат обработки файла (совместима с параметром on_result функции analyze_files_in_parallel).
+        """
+        if text_id is not None:
+            self._append({'event': 'saved', 'path': path, 'text_id': text_id,
+                          'content_hash': text_content_hash(text)})
+        else:
+            self._append({'event': 'failed', 'path': path, 'error': error})
+
+    def reconcile(self):
+        """
+        Сверяет отметки о сохранении с базой данных: файл считается сохраненным, только если в Text_Passport
+        есть текст с записанным text_id и тем же содержимым. Остальные файлы снова становятся необработанными
+        (например, если анализ прервался до фиксации последнего пакета).
+
+        :return: Количество файлов, отметки которых не подтвердились.
+        """
+        saved = [entry for entry in self.entries.values() if entry.status == 'saved']
+        confirmed = set()
+        if saved and os.path.isfile(self.db):
+            connection = sq.connect(self.db)
+            try:
+                hashes = {}
+                text_ids = [entry.text_id for entry in saved]
+                for start in range(0, len(text_ids), RECONCILE_CHUNK_SIZE):
+                    chunk = text_ids[start:start + RECONCILE_CHUNK_SIZE]
+                    rows = connection.execute(
+                        f"SELECT text_id, text FROM Text_Passport WHERE text_id IN ({', '.join('?' * len(chunk))})",
+                        chunk)
+                    hashes.update((text_id, text_content_hash(text)) for text_id, text in rows)
+            finally:
+                connection.close()
+            confirmed = {entry.path for entry in saved if hashes.get(entry.text_id) == entry.content_hash}
+        reset = 0
+        for entry in saved:
+            if entry.path not in confirmed:
+                entry.status = 'pending'
+                entry.text_id = None
+                reset += 1
+        return reset
+
+    def counts(self, paths=None):
+        """
+        Возвращает количество файлов задания по состояниям.
+
+        :param paths: Пути к файлам, которые учитываются (по умолчанию - все файлы задания).
+        :return: Словарь {состояние: количество}.
+        """
+        counts = {'pending': 0, 'saved': 0, 'failed': 0}
+        entries = self.entries.values() if paths is None else (self.entries[path] for path in paths)
+        for entry in entries:
+            counts[entry.status] += 1
+        return counts
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*- # Языковая кодировка UTF-8
+import importlib
+import threading
+
+# Данные NLTK, необходимые анализатору: (путь для nltk.data.find, пакет для nltk.download)
+NLTK_RESOURCES = (
+    ('corpora/stopwords', 'stopwords'),
+    ('tokenizers/punkt_tab/russian', 'punkt_tab'),
+)
+
+
+class LazyModule:
+    """
+    Модуль, который импортируется при первом обращении к любому его атрибуту.
+
+    Тяжелые библиотеки (NLTK, numpy) не загружаются при запуске программы, а только когда они
+    действительно нужны анализу, поэтому меню и просмотр сохраненных корпусов открываются сразу.
+    """
+
+    def __init__(self, name, on_load=None):
+        """
+        :param name: Имя модуля.
+        :param on_load: Функция, вызываемая один раз с загруженным модулем (например, для проверки данных).
+        """
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                module = importlib.import_module(self._name)
+                if self._on_load is not None:
+                    self._on_load(module)
+                self._module = module
+        return self._module
+
+    def __getattr__(self, name):
+        module = self._module if self._module is not None else self._load()
+        return getattr(module, name)
+
+    @property
+    def is_loaded(self):
+        """Проверяет, импортирован ли модуль."""
+        return self._module is not None
+
+
+def ensure_nltk_data(nltk_module):
+    """
+    Проверяет наличие данных NLTK (стоп-слова и модели Punkt) и загружает недостающие.
+
+    :param nltk_module: Модуль nltk.
+    """
+    for resource, package in NLTK_RESOURCES:
+        try:
+            nltk_module.data.find(resource)
+        except LookupError:
+            nltk_module.download(package)
+
+
+# NLTK импортируется и проверяет свои данные при первом использовании
+nltk = LazyModule('nltk', on_load=ensure_nltk_data)
+
+
+def word_tokenize(text, language='english', preserve_line=False):
+    """Токенизация nltk.word_tokenize (NLTK загружается при первом вызове)."""
+    return nltk.word_tokenize(text, language, preserve_line)
+
+
+def ngrams(sequence, n, **kwargs):
+    """N-граммы nltk.ngrams (NLTK загружается при первом вызове)."""
+    return nltk.ngrams(sequence, n, **kwargs)
+
+
+def nltk_stopwords(language='russian'):
+    """
+    Возвращает список стоп-слов NLTK для языка.
+
+    :param language: Язык стоп-слов.
+    :return: Список стоп-слов.
+    """
+    return nltk.corpus.stopwords.words(language)
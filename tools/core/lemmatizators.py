@@ -1,23 +1,11 @@
 # -*- coding: utf-8 -*- # Языковая кодировка UTF-8
 import re
 
-from nltk import word_tokenize
-from nltk.corpus import stopwords
-from pymorphy2 import MorphAnalyzer
-
 from tools.core.custom_punkt_tokenizer import sent_tokenize_with_abbr
-from tools.core.data import pronouns, prepositions, particles, conjunctions
-from tools.core.text_preparation import TextPreProcessor
-
-nltk_stopwords_ru = stopwords.words("russian")
-
-# 1. Объединение всех списков в один
-all_stopwords = set(conjunctions.conjunctions_list + prepositions.prepositions_list
-                    + particles.particles_list + pronouns.pronouns_list + nltk_stopwords_ru)
-
-# 2. Сортировка по длине по убыванию
-all_stopwords_sorted = sorted(list(all_stopwords), key=len, reverse=True)
-
+from tools.core.lazy_imports import word_tokenize
+from tools.core.lexicon import lexicon
+from tools.core.parse_cache import parse_word
+from tools.core.text_preparation import text_preprocessor
 
 def remove_custom_stopwords(text):
     """
@@ -26,10 +14,8 @@ def remove_custom_stopwords(text):
     :param text: Входной текст, из которого необходимо удалить стоп-слова.
     :return: Текст без стоп-слов.
     """
-    # Проходим по каждому стоп-слову и заменяем его в тексте, проверяя на границы слова
-    for stopword in all_stopwords_sorted:
-        # Используем re.sub для замены стоп-слов на пустую строку
-        text = re.sub(r'(?<!-)\b' + re.escape(stopword) + r'\b(?!-)', '', text.lower())
+    # Все стоп-слова находятся за один проход с проверкой границ слова и заменяются на пустую строку
+    text = lexicon.stopwords_hyphen_matcher.remove(text.lower())
 
     # Убираем лишние пробелы после удаления стоп-слов
     text = re.sub(r'\s+', ' ', text).strip()
@@ -40,9 +26,6 @@ def remove_custom_stopwords(text):
 # patterns = "[A-Za-z0-9!#$%&'()*+,./:;<=>?@[\]^_`{|}~—\"”“]
 patterns = r"[^А-Яа-яёЁ\-]+"  # Оставляем только кириллицу и дефис
 
-morph = MorphAnalyzer()
-
-
 def lemmatize_words_without_stopwords(text, patterns):
     """
     Лемматизирует слова в тексте после удаления кастомных стоп-слов.
@@ -56,7 +39,7 @@ def lemmatize_words_without_stopwords(text, patterns):
     tokens_full_info = []
     for token in text.split():
         token = token.strip()
-        token = morph.parse(token)[0]
+        token = parse_word(token)
         tokens_full_info.append(token)
     return tokens_full_info
 
@@ -70,14 +53,13 @@ def lemmatize_words(text):
     """
     text = re.sub(patterns, ' ', text)
     # Предобработка текста: замена аббревиатур и исправление пробелов
-    text_processor = TextPreProcessor()
-    text = text_processor.fix_spacing(text)
+    text = text_preprocessor.fix_spacing(text)
 
     tokens_full_info = []
     for token in text.split():
         token = token.strip()
         # print(token)
-        token = morph.parse(token)[0]
+        token = parse_word(token)
         tokens_full_info.append(token)
     return tokens_full_info
 
@@ -97,7 +79,7 @@ def lemmatize_words_into_sents_for_pmi(text):
     lemmatized_sentences = []
     for sentence in sentences:
         tokens = word_tokenize(sentence, language="russian")  # Токенизируем предложение на слова
-        lemmatized_tokens = [morph.parse(token)[0].normal_form for token in tokens if
+        lemmatized_tokens = [parse_word(token).normal_form for token in tokens if
                              token not in ['.', '?', '!']]  # Лемматизируем токены и фильтруем знаки препинания
         lemmatized_sentences.append(lemmatized_tokens)
 
@@ -123,7 +105,7 @@ def lemmatize_words_into_sents_for_n_grams(text):
     previous_token = None
     for token in text.split():
         token = token.strip()
-        parsed_token = morph.parse(token)[0]
+        parsed_token = parse_word(token)
         # Обработка конца предложения
         if previous_token and previous_token in '!?.]' and token[0].isupper():
             tokens_pos.append('S_START')
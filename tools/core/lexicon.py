@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*- # Языковая кодировка UTF-8
+import copy
+import glob
+import hashlib
+import os
+import pickle
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from functools import cached_property
+
+from colorama import Fore, Style
+
+# Версия формата снимка. Увеличивается вручную, если меняется состав или структура сохраняемых данных;
+# изменения списков слов tools/core/data, матчера фраз и стоп-слов NLTK учитываются сами (по хэшу)
+LEXICON_VERSION = 2
+
+# Ключи данных снимка (build_payload) и те из них, значения которых - экземпляры PhraseMatcher
+LEXICON_PAYLOAD_KEYS = frozenset((
+    'strings', 'freq_words', 'freq_ranks', 'abbreviations_with_point', 'sorted_abbrev', 'pronoun_lists',
+    'all_stopwords', 'all_stopwords_sorted', 'dm_groups', 'sci_dms_sorted', 'dm_marker_categories',
+    'stopwords_matcher', 'stopwords_hyphen_matcher', 'multiword_stopwords_matcher', 'dm_matcher',
+))
+LEXICON_MATCHER_KEYS = ('stopwords_matcher', 'stopwords_hyphen_matcher', 'multiword_stopwords_matcher', 'dm_matcher')
+
+LEXICON_MAGIC = b'TRLEX'
+
+# Заголовок снимка: сигнатура, версия формата, хэш исходных файлов, длина данных
+LEXICON_HEADER = struct.Struct('<5sH32sQ')
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Снимок списков слов - кэш в формате pickle (создается автоматически при первом запуске или командой
+# python -m tools.core.lexicon)
+LEXICON_SNAPSHOT_PATH = os.path.join(DATA_DIR, 'lexicon.snapshot')
+
+# Группы местоимений для анализа частот: (название группы, список в tools/core/data/pronouns.py)
+PRONOUN_GROUPS = (
+    ('pers_possessive', 'pers_possessive_pronouns_analysis_list'),
+    ('reflexive_pronoun', 'reflexive_pronoun_list'),
+    ('demonstrative_pronouns', 'demonstrative_pronouns_list'),
+    ('defining_pronouns', 'defining_pronouns_list'),
+    ('relative_pronouns', 'relative_pronouns_list'),
+    ('indefinite_pronouns', 'indefinite_pronouns_list'),
+    ('negative_pronouns', 'negative_pronouns_list'),
+)
+
+# Категории дискурсивных маркеров (множества в tools/core/data/discource_markers.py) в порядке анализа
+DM_GROUPS = ('topic_intro_dm', 'info_sequence', 'illustration_dm', 'material_sequence', 'conclusion_dm',
+             'intro_new_addit_info', 'info_explanation_or_repetition', 'contrast_dm', 'examples_introduction_dm',
+             'author_opinion', 'author_attitude', 'high_certainty_modal_words', 'moderate_certainty_modal_words',
+             'uncertainty_modal_words', 'call_to_action_dm', 'joint_action', 'putting_emphasis_dm',
+             'refer_to_background_knowledge')
+
+
+def source_files():
+    """Исходные файлы снимка: списки слов tools/core/data и матчер фраз, который сохраняется в снимке."""
+    return sorted(glob.glob(os.path.join(DATA_DIR, '*.py'))) + [
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'phrase_matcher.py')]
+
+
+def source_digest():
+    """
+    Возвращает хэш версии формата, исходных файлов снимка и стоп-слов NLTK (они входят в all_stopwords и матчеры
+    и меняются при обновлении nltk_data). Снимок с другим хэшем считается устаревшим.
+
+    :return: 32 байта SHA-256.
+    """
+    from tools.core.lazy_imports import nltk_stopwords
+
+    digest = hashlib.sha256(str(LEXICON_VERSION).encode())
+    for path in source_files():
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as file:
+            digest.update(file.read())
+    digest.update(b'nltk_stopwords')
+    digest.update('\n'.join(nltk_stopwords("russian")).encode('utf-8'))
+    return digest.digest()
+
+
+def by_length(words):
+    """Слова, отсортированные по длине по убыванию (слова одной длины - по алфавиту)."""
+    return tuple(sorted(sorted(words), key=len, reverse=True))
+
+
+def build_payload():
+    """
+    Собирает все списки слов из модулей tools/core/data в одну структуру для снимка.
+
+    Одинаковые строки во всех списках - один и тот же объект, поэтому в снимке каждая строка хранится один раз.
+
+    :return: Словарь с данными снимка.
+    """
+    from tools.core.data import abbreviations, conjunctions, discource_markers, lang_word_frequencies, particles
+    from tools.core.data import prepositions, pronouns
+    from tools.core.lazy_imports import nltk_stopwords
+    from tools.core.phrase_matcher import PhraseMatcher
+
+    strings = {}
+
+    def canonical(words):
+        return [strings.setdefault(word, sys.intern(word)) for word in words]
+
+    freq_words = canonical(lang_word_frequencies.words_by_freq)
+    freq_ranks = array('I', lang_word_frequencies.words_by_freq.values())
+
+    all_stopwords = frozenset(canonical(
+        conjunctions.conjunctions_list + prepositions.prepositions_list + particles.particles_list
+        + pronouns.pronouns_list + nltk_stopwords("russian")))
+    all_stopwords_sorted = by_length(all_stopwords)
+
+    stopwords_matcher = PhraseMatcher(all_stopwords_sorted)
+    # Матчер, не учитывающий стоп-слова рядом с дефисом, использует то же префиксное дерево
+    stopwords_hyphen_matcher = copy.copy(stopwords_matcher)
+    stopwords_hyphen_matcher.exclude_hyphen_neighbours = True
+    # Многословные стоп-слова (в том же порядке приоритета), которые склеиваются в один токен
+    multiword_stopwords_matcher = PhraseMatcher([word for word in all_stopwords_sorted if len(word.split()) > 1])
+
+    dm_groups = {name: frozenset(canonical(getattr(discource_markers, name))) for name in DM_GROUPS}
+    sci_dms_sorted = by_length(canonical(discource_markers.final_sci_dm_list))
+    # Индекс маркер -> категории, к которым он относится
+    dm_marker_categories = {}
+    for name in DM_GROUPS:
+        for marker in sorted(dm_groups[name]):
+            dm_marker_categories.setdefault(marker, []).append(name)
+
+    return {
+        'strings': tuple(sorted(strings)),
+        'freq_words': tuple(freq_words),
+        'freq_ranks': freq_ranks,
+        'abbreviations_with_point': dict(zip(canonical(abbreviations.abbreviations_with_point),
+                                             canonical(abbreviations.abbreviations_with_point.values()))),
+        'sorted_abbrev': by_length(canonical(abbreviations.keys_without_point)),
+        'pronoun_lists': {group: tuple(sorted(canonical(getattr(pronouns, name)))) for group, name in PRONOUN_GROUPS},
+        'all_stopwords': all_stopwords,
+        'all_stopwords_sorted': all_stopwords_sorted,
+        'dm_groups': dm_groups,
+        'sci_dms_sorted': sci_dms_sorted,
+        'dm_marker_categories': {marker: tuple(names) for marker, names in dm_marker_categories.items()},
+        'stopwords_matcher': stopwords_matcher,
+        'stopwords_hyphen_matcher': stopwords_hyphen_matcher,
+        'multiword_stopwords_matcher': multiword_stopwords_matcher,
+        'dm_matcher': PhraseMatcher(sci_dms_sorted),
+    }
+
+
+def write_snapshot(path, digest, payload):
+    """
+    Записывает снимок: заголовок и данные в формате pickle. Файл заменяется атомарно, поэтому параллельно
+    запущенные процессы не прочитают недописанный снимок.
+
+    Снимок - обычный кэш pickle, а не плоский формат для отображения в память: при загрузке данные
+    восстанавливаются целиком, в том числе экземпляры PhraseMatcher. Поэтому снимок зависит от устройства
+    этого класса (phrase_matcher.py входит в хэш источников, а read_snapshot дополнительно проверяет атрибуты
+    матчеров) и пересобирается, если оно изменилось.
+
+    :return: Размер снимка в байтах.
+    """
+    data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(LEXICON_HEADER.pack(LEXICON_MAGIC, LEXICON_VERSION, digest, len(data)))
+        file.write(data)
+    os.replace(temp_path, path)
+    return LEXICON_HEADER.size + len(data)
+
+
+def read_snapshot(path, digest):
+    """
+    Читает снимок: проверяет заголовок, восстанавливает данные из pickle и проверяет, что их состав и атрибуты
+    матчеров совпадают с текущим кодом.
+
+    :return: Словарь с данными снимка или None, если снимка нет, он поврежден или устарел.
+    """
+    try:
+        with open(path, 'rb') as file:
+            header = file.read(LEXICON_HEADER.size)
+            if len(header) < LEXICON_HEADER.size:
+                return None
+            magic, version, snapshot_digest, length = LEXICON_HEADER.unpack(header)
+            if magic != LEXICON_MAGIC or version != LEXICON_VERSION or snapshot_digest != digest:
+                return None
+            data = file.read(length)
+        if len(data) < length:
+            return None
+        payload = pickle.loads(data)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    return payload if is_current_payload(payload) else None
+
+
+def is_current_payload(payload):
+    """
+    Проверяет, что данные снимка содержат те же ключи, что и build_payload, а матчеры - те же атрибуты,
+    что и новый экземпляр PhraseMatcher (снимок, сохраненный другой версией класса, не используется).
+    """
+    from tools.core.phrase_matcher import PhraseMatcher
+
+    if not isinstance(payload, dict) or set(payload) != LEXICON_PAYLOAD_KEYS:
+        return False
+    attributes = set(vars(PhraseMatcher(())))
+    return all(type(payload[key]) is PhraseMatcher and set(vars(payload[key])) == attributes
+               for key in LEXICON_MATCHER_KEYS)
+
+
+class Lexicon:
+    """
+    Списки слов tools/core/data (частотный словарь, сокращения, стоп-слова, местоимения, дискурсивные маркеры)
+    и построенные по ним структуры поиска, общие для всех модулей.
+
+    Данные загружаются при первом обращении из снимка (кэш pickle, см. write_snapshot), а не разбираются как
+    исходный код Python при каждом запуске. Если снимка нет, списки слов (в том числе стоп-слова NLTK) изменились
+    или снимок сохранен другой версией кода, он собирается заново. Для проверки хэша источников при первом
+    обращении загружаются стоп-слова NLTK.
+
+    Атрибуты после загрузки:
+        words_by_freq - словарь {лемма: ранг} частотного словаря (freq_words и freq_ranks - те же данные
+            в виде кортежа слов и массива рангов);
+        abbreviations_with_point, sorted_abbrev - сокращения;
+        pronoun_lists - {группа местоимений: кортеж местоимений};
+        all_stopwords, all_stopwords_sorted - стоп-слова (союзы, предлоги, частицы, местоимения, стоп-слова NLTK);
+        dm_groups, sci_dms_sorted, dm_marker_categories - дискурсивные маркеры по категориям, все маркеры
+            и индекс маркер -> категории;
+        stopwords_matcher, stopwords_hyphen_matcher, multiword_stopwords_matcher, dm_matcher - предкомпилированные
+            матчеры фраз.
+    """
+
+    def __init__(self, path=LEXICON_SNAPSHOT_PATH):
+        """
+        :param path: Путь к файлу снимка.
+        """
+        self.path = path
+        self.source = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Вызывается только для атрибутов, которых еще нет: данные загружаются при первом обращении
+        if name.startswith('_') or self._loaded:
+            raise AttributeError(name)
+        self.load()
+        return getattr(self, name)
+
+    def load(self):
+        """Загружает снимок (собирает и сохраняет его заново, если он отсутствует или устарел)."""
+        with self._lock:
+            if self._loaded:
+                return
+            digest = source_digest()
+            payload = read_snapshot(self.path, digest)
+            if payload is not None:
+                self.source = 'snapshot'
+            else:
+                payload = build_payload()
+                self.source = 'built'
+                try:
+                    write_snapshot(self.path, digest, payload)
+                except OSError:
+                    # Директория недоступна для записи: данные используются без сохранения снимка
+                    pass
+            self._apply(payload)
+            self._loaded = True
+
+    def _apply(self, payload):
+        # Интернирование строк снимка: все списки ссылаются на эти же объекты
+        self.strings = tuple(map(sys.intern, payload['strings']))
+        self.freq_words = payload['freq_words']
+        self.freq_ranks = payload['freq_ranks']
+        self.words_by_freq = dict(zip(self.freq_words, self.freq_ranks))
+        self.abbreviations_with_point = payload['abbreviations_with_point']
+        self.sorted_abbrev = payload['sorted_abbrev']
+        self.pronoun_lists = payload['pronoun_lists']
+        self.all_stopwords = payload['all_stopwords']
+        self.all_stopwords_sorted = payload['all_stopwords_sorted']
+        self.dm_groups = payload['dm_groups']
+        self.sci_dms_sorted = payload['sci_dms_sorted']
+        self.dm_marker_categories = payload['dm_marker_categories']
+        self.stopwords_matcher = payload['stopwords_matcher']
+        self.stopwords_hyphen_matcher = payload['stopwords_hyphen_matcher']
+        self.multiword_stopwords_matcher = payload['multiword_stopwords_matcher']
+        self.dm_matcher = payload['dm_matcher']
+
+    @cached_property
+    def stopword_patterns(self):
+        """Регулярные выражения \\bстоп-слово\\b без учета регистра, в порядке all_stopwords_sorted."""
+        return [re.compile(r'\b' + re.escape(stopword) + r'\b', re.IGNORECASE) for stopword in
+                self.all_stopwords_sorted]
+
+    @cached_property
+    def dm_pattern(self):
+        """
+        Единое регулярное выражение для всех дискурсивных маркеров: более длинные маркеры проверяются первыми,
+        поэтому в каждой позиции находится самый длинный подходящий маркер.
+        """
+        return re.compile(r'\b(?:' + '|'.join(map(re.escape, self.sci_dms_sorted)) + r')\b')
+
+
+# Единственный экземпляр списков слов на процесс
+lexicon = Lexicon()
+
+
+def build_snapshot(path=LEXICON_SNAPSHOT_PATH):
+    """
+    Собирает снимок списков слов заново и выводит его размер и время загрузки.
+
+    :param path: Путь к файлу снимка.
+    """
+    start_time = time.perf_counter()
+    size = write_snapshot(path, source_digest(), build_payload())
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    loaded = Lexicon(path)
+    loaded.load()
+    load_time = time.perf_counter() - start_time
+
+    print(Fore.GREEN + Style.BRIGHT + f"Снимок списков слов сохранен: {path}" + Fore.RESET)
+    print(Fore.LIGHTGREEN_EX + f"Размер: {size / 1024:.1f} КБ, строк: {len(loaded.strings)}, "
+                               f"сборка: {build_time * 1000:.1f} мс, загрузка: {load_time * 1000:.1f} мс "
+                               f"({loaded.source})" + Fore.RESET)
+
+
+if __name__ == "__main__":
+    build_snapshot()
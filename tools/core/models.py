@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*- # Языковая кодировка UTF-8
+import sys
+import threading
+import time
+
+from colorama import Fore, Style
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+
+def current_rss_mb():
+    """
+    Возвращает объем резидентной памяти текущего процесса в мегабайтах.
+
+    На Linux значение читается из /proc/self/status, на других системах используется пиковое значение
+    из модуля resource (если он доступен).
+
+    :return: Объем памяти в МБ или None, если определить его не удалось.
+    """
+    try:
+        with open('/proc/self/status', encoding='utf-8') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # На macOS ru_maxrss возвращается в байтах, на Linux - в килобайтах
+    return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+
+def _load_morph():
+    from pymorphy2 import MorphAnalyzer
+    return MorphAnalyzer()
+
+
+def _load_segmenter():
+    from natasha import Segmenter
+    return Segmenter()
+
+
+def _load_morph_vocab():
+    from natasha import MorphVocab
+    return MorphVocab()
+
+
+def _load_embedding():
+    from natasha import NewsEmbedding
+    return NewsEmbedding()
+
+
+def _load_morph_tagger():
+    from natasha import NewsMorphTagger
+    return NewsMorphTagger(models.embedding)
+
+
+def _load_syntax_parser():
+    from natasha import NewsSyntaxParser
+    return NewsSyntaxParser(models.embedding)
+
+
+def _load_ner_tagger():
+    from natasha import NewsNERTagger
+    return NewsNERTagger(models.embedding)
+
+
+class ModelRegistry:
+    """
+    Реестр тяжеловесных моделей (pymorphy2 и Natasha), общий для всего процесса.
+
+    Каждая модель загружается лениво при первом обращении и не более одного раза за процесс.
+    Загрузка защищена блокировкой, поэтому реестр можно использовать из нескольких потоков.
+    Для каждой модели запоминаются время загрузки и прирост резидентной памяти.
+    """
+
+    loaders = {
+        'morph': ('pymorphy2 MorphAnalyzer', _load_morph),
+        'segmenter': ('Natasha Segmenter', _load_segmenter),
+        'morph_vocab': ('Natasha MorphVocab', _load_morph_vocab),
+        'embedding': ('Natasha NewsEmbedding', _load_embedding),
+        'morph_tagger': ('Natasha NewsMorphTagger', _load_morph_tagger),
+        'syntax_parser': ('Natasha NewsSyntaxParser', _load_syntax_parser),
+        'ner_tagger': ('Natasha NewsNERTagger', _load_ner_tagger),
+    }
+
+    def __init__(self):
+        self._models = {}
+        self._stats = {}
+        # RLock, так как теггеры Natasha при загрузке обращаются к реестру за общим NewsEmbedding
+        self._lock = threading.RLock()
+
+    def get(self, name):
+        """
+        Возвращает модель по имени, загружая ее при первом обращении.
+
+        :param name: Имя модели (ключ словаря loaders).
+        :return: Загруженная модель.
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if name not in self.loaders:
+            raise KeyError(f"Неизвестная модель: {name}")
+        with self._lock:
+            # Повторная проверка: модель могла быть загружена другим потоком, пока мы ждали блокировку
+            model = self._models.get(name)
+            if model is None:
+                title, loader = self.loaders[name]
+                rss_before = current_rss_mb()
+                start = time.perf_counter()
+                model = loader()
+                load_time = time.perf_counter() - start
+                rss_after = current_rss_mb()
+                rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+                self._stats[name] = {'title': title, 'load_time': load_time, 'rss_delta_mb': rss_delta}
+                self._models[name] = model
+        return model
+
+    def is_loaded(self, name):
+        """Проверяет, загружена ли модель."""
+        return name in self._models
+
+    def stats(self):
+        """
+        Возвращает статистику загрузки моделей.
+
+        :return: Словарь {имя модели: {'title', 'load_time', 'rss_delta_mb'}} и текущий объем памяти процесса в МБ.
+        """
+        return dict(self._stats), current_rss_mb()
+
+    def display_stats(self):
+        """Выводит в консоль таблицу с временем загрузки моделей и занимаемой памятью."""
+        stats, rss = self.stats()
+        if not stats:
+            print(Fore.LIGHTYELLOW_EX + Style.BRIGHT + "Модели еще не загружались." + Fore.RESET)
+            return
+        table = Table(title="\nЗагруженные модели", title_justify="left")
+        table.add_column("Модель", style="cyan")
+        table.add_column("Время загрузки (с)", style="magenta")
+        table.add_column("Прирост памяти (МБ)", style="green")
+        for info in stats.values():
+            rss_delta = f"{info['rss_delta_mb']:.1f}" if info['rss_delta_mb'] is not None else "-"
+            table.add_row(info['title'], f"{info['load_time']:.3f}", rss_delta)
+        console.print(table)
+        if rss is not None:
+            print(Fore.LIGHTGREEN_EX + f"Резидентная память процесса: {rss:.1f} МБ" + Fore.RESET)
+
+    @property
+    def morph(self):
+        return self.get('morph')
+
+    @property
+    def segmenter(self):
+        return self.get('segmenter')
+
+    @property
+    def morph_vocab(self):
+        return self.get('morph_vocab')
+
+    @property
+    def embedding(self):
+        return self.get('embedding')
+
+    @property
+    def morph_tagger(self):
+        return self.get('morph_tagger')
+
+    @property
+    def syntax_parser(self):
+        return self.get('syntax_parser')
+
+    @property
+    def ner_tagger(self):
+        return self.get('ner_tagger')
+
+
+# Единственный реестр моделей на процесс
+models = ModelRegistry()
+
+
+if __name__ == "__main__":
+    # Пример использования
+    print(models.morph.parse('стали')[0])
+    print(type(models.ner_tagger).__name__)
+    models.display_stats()
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*- # Языковая кодировка UTF-8
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from colorama import Fore, Style
+
+from tools.core.models import models
+
+# Максимальное количество словоформ в кэше по умолчанию
+DEFAULT_PARSE_CACHE_SIZE = 100000
+
+
+class ParseCache:
+    """
+    Ограниченный по размеру LRU-кэш лучших разборов pymorphy2, общий для всех лемматизаторов.
+
+    Ключом служит словоформа в том виде, в каком она передается в morph.parse. Научные тексты
+    подчиняются закону Ципфа, поэтому несколько тысяч частотных словоформ покрывают большую
+    часть токенов, и повторные обращения к pymorphy2 для них не выполняются.
+    Кэш потокобезопасен и ведет счетчики попаданий и промахов.
+    """
+
+    def __init__(self, maxsize=DEFAULT_PARSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        # Словоформы, разобранные после последнего take_snapshot (None - не отслеживаются)
+        self._new_tokens = None
+        self._snapshot_hits = 0
+        self._snapshot_misses = 0
+
+    def parse(self, token):
+        """
+        Возвращает наиболее вероятный разбор pymorphy2 для словоформы (аналог morph.parse(token)[0]).
+
+        :param token: Словоформа.
+        :return: Объект Parse.
+        """
+        with self._lock:
+            parsed = self._cache.get(token)
+            if parsed is not None:
+                self._cache.move_to_end(token)
+                self.hits += 1
+                return parsed
+            self.misses += 1
+        parsed = models.morph.parse(token)[0]
+        with self._lock:
+            self._cache[token] = parsed
+            if self._new_tokens is not None:
+                self._new_tokens.append(token)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return parsed
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        """Очищает кэш и обнуляет счетчики."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+            self._snapshot_hits = 0
+            self._snapshot_misses = 0
+            if self._new_tokens is not None:
+                self._new_tokens = []
+
+    def stats(self):
+        """
+        Возвращает статистику использования кэша.
+
+        :return: Словарь с количеством попаданий, промахов, долей попаданий и текущим размером кэша.
+        """
+        total = self.hits + self.misses
+        hit_rate = round(self.hits / total * 100, 3) if total else 0.0
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': hit_rate, 'size': len(self._cache),
+                'maxsize': self.maxsize}
+
+    def display_stats(self):
+        """Выводит статистику кэша разборов в консоль."""
+        stats = self.stats()
+        print(Fore.LIGHTGREEN_EX + Style.BRIGHT + "Кэш морфологических разборов: " + Style.NORMAL +
+              f"попаданий {stats['hits']}, промахов {stats['misses']} ({stats['hit_rate']}% попаданий), "
+              f"словоформ в кэше {stats['size']} из {stats['maxsize']}." + Fore.RESET)
+
+    @staticmethod
+    def _to_record(token, parsed):
+        """Сериализует разбор: словоформа, тег, нормальная форма и оценка."""
+        return [token, parsed.word, str(parsed.tag), parsed.normal_form, parsed.score]
+
+    @staticmethod
+    def _restore(records):
+        """
+        Восстанавливает разборы из записей _to_record.
+
+        Разборы создаются как pymorphy2.analyzer.Parse (публичный namedtuple pymorphy2 0.9.x) с пустым
+        methods_stack и без привязки к анализатору, поэтому для них недоступны inflect, lexeme и normalized;
+        в анализаторе используются только word, tag и normal_form.
+
+        :return: Список кортежей (словоформа, разбор).
+        """
+        from pymorphy2.analyzer import Parse
+
+        tag_class = models.morph.TagClass
+        return [(token, Parse(word, tag_class(tag), normal_form, score, ()))
+                for token, word, tag, normal_form, score in records]
+
+    def _add_restored(self, restored):
+        """Добавляет восстановленные разборы как недавно использованные."""
+        with self._lock:
+            for token, parsed in restored:
+                self._cache[token] = parsed
+                self._cache.move_to_end(token)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def start_tracking(self):
+        """
+        Начинает отслеживать новые разборы для take_snapshot. Вызывается в процессах-обработчиках пула,
+        кэши которых основной процесс собирает для сохранения и статистики.
+        """
+        with self._lock:
+            self._new_tokens = []
+            self._snapshot_hits = self.hits
+            self._snapshot_misses = self.misses
+
+    def take_snapshot(self):
+        """
+        Возвращает разборы, добавленные после предыдущего снимка, и приращение счетчиков.
+
+        Снимок передается в основной процесс вместе с результатом анализа текста и объединяется
+        с его кэшем методом merge_snapshot.
+
+        :return: Словарь {'records': записи разборов, 'hits': попадания, 'misses': промахи} или None,
+            если новые разборы не отслеживаются.
+        """
+        with self._lock:
+            if self._new_tokens is None:
+                return None
+            records = [self._to_record(token, self._cache[token])
+                       for token in dict.fromkeys(self._new_tokens) if token in self._cache]
+            snapshot = {'records': records, 'hits': self.hits - self._snapshot_hits,
+                        'misses': self.misses - self._snapshot_misses}
+            self._new_tokens = []
+            self._snapshot_hits = self.hits
+            self._snapshot_misses = self.misses
+        return snapshot
+
+    def merge_snapshot(self, snapshot):
+        """
+        Добавляет в кэш разборы и счетчики снимка процесса-обработчика (см. take_snapshot).
+
+        :param snapshot: Словарь, возвращаемый take_snapshot, или None.
+        """
+        if not snapshot:
+            return
+        self._add_restored(self._restore(snapshot['records']))
+        with self._lock:
+            self.hits += snapshot['hits']
+            self.misses += snapshot['misses']
+
+    def save(self, path):
+        """
+        Сохраняет содержимое кэша на диск для последующего теплого старта.
+
+        Сохраняются только словоформа, тег, нормальная форма и оценка разбора, в порядке от
+        давно использованных к недавно использованным.
+
+        Файл заменяется атомарно, поэтому прерванное сохранение не оставляет недописанный файл.
+
+        :param path: Путь к JSON-файлу.
+        """
+        with self._lock:
+            records = [self._to_record(token, parsed) for token, parsed in self._cache.items()]
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(records, file, ensure_ascii=False)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def load(self, path):
+        """
+        Загружает сохраненные разборы с диска (теплый старт). Если файла нет, он поврежден или разборы
+        не удается восстановить (например, после обновления pymorphy2), кэш остается холодным.
+
+        Восстановление разбора из тега в десятки раз быстрее, чем повторный разбор pymorphy2.
+
+        :param path: Путь к JSON-файлу.
+        :return: Количество загруженных словоформ.
+        """
+        if not os.path.isfile(path):
+            return 0
+        try:
+            with open(path, encoding='utf-8') as file:
+                records = json.load(file)
+            restored = self._restore(records[-self.maxsize:])
+        except (OSError, ValueError, TypeError, KeyError, AttributeError, ImportError) as error:
+            print(Fore.LIGHTRED_EX + f"Кэш морфологических разборов {path} не загружен ({error}), "
+                                     f"разборы будут выполнены заново." + Fore.RESET)
+            return 0
+        self._add_restored(restored)
+        return len(restored)
+
+
+# Единственный кэш разборов на процесс
+parse_cache = ParseCache()
+
+
+def parse_word(token):
+    """
+    Возвращает наиболее вероятный разбор pymorphy2 для словоформы через общий кэш разборов.
+
+    :param token: Словоформа.
+    :return: Объект Parse.
+    """
+    return parse_cache.parse(token)
+
+
+if __name__ == "__main__":
+    # Пример использования
+    for word in "стали стали стекла стали".split():
+        print(parse_word(word))
+    parse_cache.display_stats()
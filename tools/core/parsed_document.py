@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*- # Языковая кодировка UTF-8
+import re
+from functools import cached_property
+
+from tools.core.custom_punkt_tokenizer import sent_tokenize_with_abbr, sentence_splitter
+from tools.core.lazy_imports import word_tokenize
+from tools.core.lemmatizators import lemmatize_words, lemmatize_words_without_stopwords
+from tools.core.lexicon import lexicon
+from tools.core.parse_cache import parse_word
+from tools.core.text_preparation import text_preprocessor
+
+# Шаблон для словарных токенов с латиницей (используется при подсчете типов и повторяемости)
+words_with_latin_pattern = r"[^А-Яа-яёЁa-zA-Z\-]+"
+
+
+def align_spans(source, pieces):
+    """
+    Находит смещения (start, end) фрагментов в исходной строке, двигаясь слева направо.
+
+    Если фрагмент не найден (например, токенизатор изменил кавычки), ему присваивается пустой
+    интервал в текущей позиции.
+
+    :param source: Исходная строка.
+    :param pieces: Последовательность фрагментов (предложений или токенов) в порядке следования.
+    :return: Список кортежей (start, end).
+    """
+    spans = []
+    position = 0
+    for piece in pieces:
+        start = source.find(piece, position)
+        if start < 0:
+            spans.append((position, position))
+            continue
+        end = start + len(piece)
+        spans.append((start, end))
+        position = end
+    return spans
+
+
+class ParsedDocument:
+    """
+    Разобранный документ: текст, разбитый на предложения и токены один раз и переиспользуемый
+    всеми индикаторами.
+
+    Все слои (предобработанный текст, предложения, токены, смещения, разборы pymorphy2, леммы,
+    части речи, флаги стоп-слов) вычисляются лениво при первом обращении и затем кэшируются,
+    поэтому индикаторы, принимающие ParsedDocument вместо строки, не повторяют токенизацию и
+    морфологический разбор одного и того же текста.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.text_processor = text_preprocessor
+        # Спаны именованных сущностей (EntitySpan) заполняются модулем explicitation при первом вызове
+        # get_entity_spans: NER выполняется один раз на документ
+        self.entity_spans = None
+
+    def parse(self, token):
+        """
+        Возвращает лучший морфологический разбор pymorphy2 для токена через общий кэш разборов.
+
+        :param token: Токен (словоформа).
+        :return: Объект Parse.
+        """
+        return parse_word(token)
+
+    # Текстовые слои
+
+    @cached_property
+    def lower_text(self):
+        return self.text.lower()
+
+    @cached_property
+    def processed_text(self):
+        """Текст после замены аббревиатур и исправления пробелов (TextPreProcessor.process_text)."""
+        return self.text_processor.process_text(self.text)
+
+    @cached_property
+    def spacing_fixed_text(self):
+        """Текст после TextPreProcessor.fix_spacing."""
+        return self.text_processor.fix_spacing(self.text)
+
+    # Предложения
+
+    @cached_property
+    def sentence_text(self):
+        """Текст, который разбивается на предложения (без символов новой строки)."""
+        return sentence_splitter.prepare(self.text)
+
+    @cached_property
+    def sentence_spans(self):
+        """Смещения (start, end) предложений в sentence_text (общий токенизатор sentence_splitter)."""
+        return sentence_splitter.span_tokenize(self.sentence_text)
+
+    @cached_property
+    def sentences(self):
+        """Предложения исходного текста (срезы sentence_text по sentence_spans)."""
+        text = self.sentence_text
+        return [text[start:end] for start, end in self.sentence_spans]
+
+    @cached_property
+    def processed_sentences(self):
+        """Предложения после TextPreProcessor.process_text (для позиционных и контекстных индикаторов)."""
+        return [self.text_processor.process_text(sent) for sent in self.sentences]
+
+    @cached_property
+    def pmi_sentences(self):
+        """
+        Леммы словарных токенов (только кириллица) каждого предложения для подсчета PMI.
+
+        Используется общее разбиение на предложения (sentences); знаки препинания и некириллические
+        символы удаляются внутри предложений.
+        """
+        lemmatized_sentences = []
+        for sentence in self.sentences:
+            tokens = word_tokenize(re.sub(r'[^а-яА-ЯёЁ\s\.\!\?]', '', sentence), language="russian")
+            lemmatized_sentences.append([self.parse(token).normal_form for token in tokens
+                                         if token not in ('.', '?', '!')])
+        return lemmatized_sentences
+
+    @cached_property
+    def sentences_for_mean_len(self):
+        """Предложения текста, подготовленного TextPreProcessor.fix_spacing_for_mean_sent_len."""
+        return sent_tokenize_with_abbr(self.text_processor.fix_spacing_for_mean_sent_len(self.text))
+
+    # Токены
+
+    @cached_property
+    def tokens(self):
+        """Токены исходного текста вместе со знаками препинания (word_tokenize)."""
+        return word_tokenize(self.text, language="russian")
+
+    @cached_property
+    def token_spans(self):
+        """Смещения (start, end) токенов в исходном тексте."""
+        return align_spans(self.text, self.tokens)
+
+    @cached_property
+    def lower_tokens(self):
+        """Токены текста в нижнем регистре (word_tokenize)."""
+        return word_tokenize(self.lower_text, language="russian")
+
+    @cached_property
+    def word_tokens(self):
+        """Словарные токены: кириллица, латиница и дефис."""
+        return word_tokenize(re.sub(words_with_latin_pattern, ' ', self.text), language="russian")
+
+    @cached_property
+    def cyrillic_word_tokens(self):
+        """Словарные токены в нижнем регистре: только кириллица и дефис."""
+        return word_tokenize(re.sub(r"[^А-Яа-яёЁ\-]+", ' ', self.lower_text), language="russian")
+
+    # Морфология
+
+    @cached_property
+    def words(self):
+        """Разборы pymorphy2 для словарных токенов исходного текста (lemmatize_words)."""
+        return lemmatize_words(self.text)
+
+    @cached_property
+    def processed_words(self):
+        """Разборы pymorphy2 для словарных токенов предобработанного текста."""
+        return lemmatize_words(self.processed_text)
+
+    @cached_property
+    def lower_words(self):
+        """Разборы pymorphy2 для словарных токенов текста в нижнем регистре."""
+        return lemmatize_words(self.lower_text)
+
+    @cached_property
+    def words_without_stopwords(self):
+        """Разборы pymorphy2 для знаменательных слов (стоп-слова удалены)."""
+        return lemmatize_words_without_stopwords(self.lower_text, words_with_latin_pattern)
+
+    @cached_property
+    def lemmas(self):
+        return [token.normal_form for token in self.words]
+
+    @cached_property
+    def pos_tags(self):
+        return [token.tag.POS for token in self.words]
+
+    @cached_property
+    def stopword_flags(self):
+        all_stopwords = lexicon.all_stopwords
+        return [lemma in all_stopwords for lemma in self.lemmas]
+
+
+def as_document(text):
+    """
+    Возвращает ParsedDocument для строки или сам документ, если он уже разобран.
+
+    :param text: Строка текста или ParsedDocument.
+    :return: ParsedDocument.
+    """
+    if isinstance(text, ParsedDocument):
+        return text
+    return ParsedDocument(text)
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*- # Языковая кодировка UTF-8
+import re
+
+# Символ слова в смысле регулярных выражений (\w), используется для проверки границ \b
+_word_char = re.compile(r'\w').match
+
+# Ключ конца фразы в узлах префиксного дерева
+_END = ''
+
+
+def _is_word_char(text, index):
+    return 0 <= index < len(text) and _word_char(text, index) is not None
+
+
+class PhraseMatcher:
+    """
+    Предкомпилированный поиск множества фраз (стоп-слов, дискурсивных маркеров) за один проход по тексту.
+
+    Фразы хранятся в префиксном дереве (trie). Текст просматривается слева направо один раз, и в каждой
+    позиции, где может проходить граница слова, находятся все фразы, начинающиеся в ней. Затем
+    пересекающиеся совпадения разрешаются по приоритету фраз: фраза, стоящая раньше в переданном списке
+    (обычно более длинная), побеждает, а совпадения одной фразы берутся слева направо без перекрытий.
+
+    Такой порядок воспроизводит прежнюю схему «для каждой фразы по порядку: найти по шаблону
+    \\bфраза\\b и удалить из текста», но без отдельного регулярного выражения и полного прохода по
+    тексту на каждую фразу.
+    """
+
+    def __init__(self, phrases, exclude_hyphen_neighbours=False):
+        """
+        :param phrases: Фразы в порядке приоритета (например, отсортированные по длине по убыванию).
+        :param exclude_hyphen_neighbours: Если True, совпадение не засчитывается, если перед ним или после
+            него стоит дефис (аналог шаблона (?<!-)\\bфраза\\b(?!-)).
+        """
+        self.phrases = []
+        self.exclude_hyphen_neighbours = exclude_hyphen_neighbours
+        self._trie = {}
+        for phrase in phrases:
+            node = self._trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            # Повторяющиеся фразы сохраняют приоритет первого вхождения
+            if _END not in node:
+                node[_END] = len(self.phrases)
+                self.phrases.append(phrase)
+        self._ranks = {phrase: rank for rank, phrase in enumerate(self.phrases)}
+
+    def _candidates(self, text):
+        """
+        Находит все (в том числе пересекающиеся) вхождения фраз: список кортежей (приоритет, start, end).
+
+        Позиции внутри слова (буквы слева и справа) пропускаются: граница слова там невозможна.
+        Сами границы проверяются позже, в find, с учетом уже удаленных фраз.
+        """
+        candidates = []
+        trie = self._trie
+        text_length = len(text)
+        for start in range(text_length):
+            node = trie.get(text[start])
+            if node is None or (_is_word_char(text, start - 1) and _is_word_char(text, start)):
+                continue
+            end = start + 1
+            while node is not None:
+                rank = node.get(_END)
+                if rank is not None:
+                    candidates.append((rank, start, end))
+                if end >= text_length:
+                    break
+                node = node.get(text[end])
+                end += 1
+        return candidates
+
+    def _neighbours(self, text, taken, start, end):
+        """Возвращает индексы ближайших неудаленных символов слева от start и справа от end (или -1 / len)."""
+        before = start - 1
+        while before >= 0 and taken[before]:
+            before -= 1
+        after = end
+        while after < len(text) and taken[after]:
+            after += 1
+        return before, after
+
+    def _matches_here(self, text, taken, start, end):
+        """
+        Проверяет границы слова (\\b) у вхождения так, как их видел бы re.search в тексте, из которого
+        уже удалены фразы с более высоким приоритетом.
+        """
+        before, after = self._neighbours(text, taken, start, end)
+        if _is_word_char(text, before) == _is_word_char(text, start):
+            return False
+        if _is_word_char(text, end - 1) == _is_word_char(text, after):
+            return False
+        if self.exclude_hyphen_neighbours:
+            if (before >= 0 and text[before] == '-') or (after < len(text) and text[after] == '-'):
+                return False
+        return True
+
+    def _select(self, text, acceptable, take):
+        """
+        Выбирает вхождения фраз в порядке приоритета: вхождения очередной фразы проверяются функцией
+        acceptable(start, end) до того, как любое из них будет принято (как в re.findall и re.sub),
+        и берутся слева направо без перекрытий; принятые вхождения передаются в take(start, end).
+
+        :return: Список принятых кортежей (start, end, фраза) в порядке приоритета.
+        """
+        matches = []
+        candidates = sorted(self._candidates(text))
+        index = 0
+        while index < len(candidates):
+            rank = candidates[index][0]
+            group_end = index
+            while group_end < len(candidates) and candidates[group_end][0] == rank:
+                group_end += 1
+            accepted = []
+            last_end = -1
+            for _, start, end in candidates[index:group_end]:
+                if start < last_end or not acceptable(start, end):
+                    continue
+                accepted.append((start, end))
+                last_end = end
+            for start, end in accepted:
+                take(start, end)
+                matches.append((start, end, self.phrases[rank]))
+            index = group_end
+        return matches
+
+    def find(self, text):
+        """
+        Находит непересекающиеся вхождения фраз в тексте.
+
+        Фразы обрабатываются в порядке приоритета: вхождения очередной фразы проверяются на границы
+        слова в тексте без уже найденных фраз и берутся слева направо без перекрытий.
+
+        :param text: Текст для поиска (регистр не меняется).
+        :return: Список кортежей (start, end, фраза), упорядоченный по позиции в тексте.
+        """
+        taken = bytearray(len(text))
+
+        def acceptable(start, end):
+            return not any(taken[start:end]) and self._matches_here(text, taken, start, end)
+
+        def take(start, end):
+            taken[start:end] = b'\x01' * (end - start)
+
+        matches = self._select(text, acceptable, take)
+        matches.sort()
+        return matches
+
+    def glue(self, text, separator='_'):
+        """
+        Склеивает найденные фразы в один токен: пробелы внутри фраз заменяются на separator.
+
+        Воспроизводит прежнюю схему «для каждой фразы по порядку: re.sub(\\bфраза\\b, фраза_с_separator)»:
+        границы слова проверяются в тексте, где более приоритетные фразы уже склеены (separator - символ
+        слова), а вхождение, задевающее уже склеенный пробел, не совпадает с фразой. Слова фраз должны
+        разделяться в тексте одним пробелом.
+
+        :param text: Текст для поиска (регистр не меняется).
+        :param separator: Символ слова, которым заменяются пробелы внутри фраз (по умолчанию '_').
+        :return: Текст со склеенными фразами.
+        """
+        glued = bytearray(len(text))
+
+        def is_word_char(index):
+            return _is_word_char(text, index) or (0 <= index < len(text) and glued[index] == 1)
+
+        def acceptable(start, end):
+            if any(glued[start:end]):
+                return False
+            if is_word_char(start - 1) == is_word_char(start) or is_word_char(end - 1) == is_word_char(end):
+                return False
+            if self.exclude_hyphen_neighbours:
+                if (start > 0 and text[start - 1] == '-') or (end < len(text) and text[end] == '-'):
+                    return False
+            return True
+
+        def take(start, end):
+            for index in range(start, end):
+                if text[index] == ' ':
+                    glued[index] = 1
+
+        if not self._select(text, acceptable, take):
+            return text
+        return ''.join(separator if glued[index] else char for index, char in enumerate(text))
+
+    def count(self, text):
+        """
+        Подсчитывает вхождения фраз в тексте.
+
+        :param text: Текст для поиска.
+        :return: Словарь {фраза: количество} для найденных фраз в порядке приоритета фраз.
+        """
+        counts = {}
+        for _, _, phrase in self.find(text):
+            counts[phrase] = counts.get(phrase, 0) + 1
+        return dict(sorted(counts.items(), key=lambda item: self._ranks[item[0]]))
+
+    def remove(self, text, matches=None):
+        """
+        Удаляет найденные фразы из текста (заменяет на пустую строку).
+
+        :param text: Исходный текст.
+        :param matches: Результат find для этого текста (если уже вычислен).
+        :return: Текст без найденных фраз.
+        """
+        if matches is None:
+            matches = self.find(text)
+        pieces = []
+        position = 0
+        for start, end, _ in matches:
+            pieces.append(text[position:start])
+            position = end
+        pieces.append(text[position:])
+        return ''.join(pieces)
+
+
+if __name__ == "__main__":
+    # Пример использования
+    matcher = PhraseMatcher(sorted(["то же", "а то", "а", "то", "же"], key=len, reverse=True))
+    print(matcher.find("а то же самое"))
+    print(matcher.count("а то же самое"))
+    print(matcher.remove("а то же самое"))
+    print(matcher.glue("а то же самое"))
@@ -4,11 +4,11 @@ import os
 import re
 
 from colorama import Style, Fore
-from nltk import word_tokenize
 from rich.console import Console
 
 from tools.core.custom_punkt_tokenizer import sent_tokenize_with_abbr
-from tools.core.text_preparation import TextPreProcessor
+from tools.core.lazy_imports import word_tokenize
+from tools.core.text_preparation import text_preprocessor
 from tools.core.utils import wait_for_enter_to_analyze, wait_for_enter_to_choose_opt
 
 console = Console()
@@ -112,8 +112,7 @@ def adjust_text_length(text):
     """
     print(
         Fore.GREEN + Style.BRIGHT + "ВЫРАВНИВАНИЕ ТЕКСТА ПО ДЛИНЕ ЗАПУЩЕНО\n" + Fore.RESET)
-    text_processor = TextPreProcessor()
-    text_spacing_fixed = text_processor.fix_spacing_for_mean_sent_len(text)
+    text_spacing_fixed = text_preprocessor.fix_spacing_for_mean_sent_len(text)
     sentences = sent_tokenize_with_abbr(text_spacing_fixed)
     current_sentence_count = len(sentences)
     while True:
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*- # Языковая кодировка UTF-8
+import glob
+import hashlib
+import os
+import pickle
+import re
+import sqlite3 as sq
+import threading
+
+from colorama import Fore, Style
+
+from tools.core.constants import ANALYSIS_CACHE_PATH
+from tools.core.context_store import context_retention
+
+# Версия порядка вычисления индикаторов (start_analysis.CorpusText). Увеличивается вручную, если меняется
+# то, как индикаторы собираются в кортежи для сохранения; изменения модулей и словарей учитываются сами
+ANALYZER_VERSION = 1
+
+# Группы индикаторов в порядке вычисления и модули, от которых зависят их значения. Версия группы -
+# хэш исходного кода этих модулей и всех модулей tools, которые они импортируют (включая списки слов
+# tools/core/data), поэтому правка словаря делает устаревшими только группы, которые его используют.
+FEATURE_GROUPS = {
+    'simplification': ('tools.simplification', 'tools.core.tokens_counter'),
+    'normalisation': ('tools.normalisation.repetition',),
+    'pmi': ('tools.normalisation.pmi',),
+    'explicitation': ('tools.explicitation',),
+    'interference': ('tools.interference',),
+    'miscellaneous': ('tools.miscellaneous', 'tools.core.data.pronouns'),
+}
+
+# Группы, значения которых зависят не только от кода, но и от настроек анализа: группа -> функция,
+# возвращающая строку текущих настроек (добавляется к версии группы)
+FEATURE_GROUP_SETTINGS = {
+    'interference': lambda: f"contexts={context_retention.key}",
+}
+
+# Модули, общие для всех групп (разбор текста перед вычислением индикаторов)
+COMMON_MODULES = ('tools.core.parsed_document',)
+
+# Корень проекта (директория, в которой находится пакет tools)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import_pattern = re.compile(r'^\s*(?:from|import)\s+(tools(?:\.\w+)+)', re.MULTILINE)
+
+
+def text_content_hash(text):
+    """
+    Возвращает хэш содержимого текста. Перед хэшированием приводятся к одному виду только переводы
+    строк и пробельные символы в начале и конце текста, не влияющие на значения индикаторов.
+
+    :param text: Текст.
+    :return: Шестнадцатеричная строка SHA-256.
+    """
+    normalized = text.replace('\r\n', '\n').strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def module_files(module_name):
+    """Файлы модуля tools по его имени: файл .py или все файлы .py директории (пакета)."""
+    path = os.path.join(PROJECT_ROOT, *module_name.split('.'))
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, '*.py')))
+    if os.path.isfile(path + '.py'):
+        return [path + '.py']
+    # Имя вида tools.module.object (from tools.module import object)
+    return module_files(module_name.rsplit('.', 1)[0]) if module_name.count('.') > 1 else []
+
+
+def module_closure(module_names):
+    """
+    Находит файлы модулей и всех модулей tools, которые они импортируют (транзитивно).
+
+    :param module_names: Имена модулей.
+    :return: Отсортированный список путей к файлам.
+    """
+    files = set()
+    stack = [path for name in module_names for path in module_files(name)]
+    while stack:
+        path = stack.pop()
+        if path in files:
+            continue
+        files.add(path)
+        with open(path, encoding='utf-8') as file:
+            source = file.read()
+        for name in import_pattern.findall(source):
+            stack.extend(module_files(name))
+    return sorted(files)
+
+
+def compute_feature_versions():
+    """
+    Вычисляет версии групп индикаторов по исходному коду их модулей и списков слов.
+
+    :return: Словарь {группа: версия}.
+    """
+    versions = {}
+    for group, module_names in FEATURE_GROUPS.items():
+        digest = hashlib.sha256(f"{ANALYZER_VERSION}:{group}".encode('utf-8'))
+        for path in module_closure(module_names + COMMON_MODULES):
+            digest.update(os.path.relpath(path, PROJECT_ROOT).replace(os.sep, '/').encode('utf-8'))
+            with open(path, 'rb') as file:
+                digest.update(file.read())
+        versions[group] = digest.hexdigest()[:16]
+    return versions
+
+
+class ResultCache:
+    """
+    Кэш результатов анализа по хэшу содержимого текста, общий для всех корпусов (файл SQLite).
+
+    Для каждого текста хранятся значения групп индикаторов вместе с версией группы (хэш кода и списков
+    слов). Повторный анализ того же текста берет актуальные группы из кэша, а пересчитывает только те,
+    код или словари которых изменились. Каждый процесс открывает свое соединение.
+    """
+
+    def __init__(self, path=ANALYSIS_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._versions = None
+        self._connection = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def versions(self):
+        """
+        Текущие версии групп индикаторов: версия кода вычисляется один раз на процесс, к ней добавляются
+        текущие настройки анализа (FEATURE_GROUP_SETTINGS).
+        """
+        if self._versions is None:
+            self._versions = compute_feature_versions()
+        return {group: f"{version}:{FEATURE_GROUP_SETTINGS[group]()}" if group in FEATURE_GROUP_SETTINGS else version
+                for group, version in self._versions.items()}
+
+    def _connect(self):
+        # Соединение не передается в дочерние процессы пула: после fork открывается новое
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sq.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute('''
+            CREATE TABLE IF NOT EXISTS Result_cache (
+            content_hash TEXT NOT NULL,
+            feature_group TEXT NOT NULL,
+            version TEXT NOT NULL,
+            features BLOB NOT NULL,
+            PRIMARY KEY (content_hash, feature_group)
+            )''')
+            self._connection.commit()
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, content_hash):
+        """
+        Возвращает сохраненные значения групп индикаторов текста, версия которых совпадает с текущей.
+
+        :param content_hash: Хэш содержимого текста (text_content_hash).
+        :return: Словарь {группа: кортеж значений}; устаревшие и отсутствующие группы не включаются.
+        """
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT feature_group, version, features FROM Result_cache WHERE content_hash = ?",
+                (content_hash,)).fetchall()
+        features = {}
+        versions = self.versions
+        for group, version, blob in rows:
+            if versions.get(group) != version:
+                continue
+            try:
+                features[group] = pickle.loads(blob)
+            except Exception:
+                # Запись, которую не удается восстановить (например, после изменения классов), пересчитывается
+                continue
+        self.hits += len(features)
+        self.misses += len(versions) - len(features)
+        return features
+
+    def put(self, content_hash, features):
+        """
+        Сохраняет значения групп индикаторов текста с текущими версиями групп.
+
+        :param content_hash: Хэш содержимого текста.
+        :param features: Словарь {группа: кортеж значений}.
+        """
+        versions = self.versions
+        rows = [(content_hash, group, versions[group], pickle.dumps(values, pickle.HIGHEST_PROTOCOL))
+                for group, values in features.items()]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO Result_cache VALUES (?, ?, ?, ?)", rows)
+
+    def stats(self):
+        """
+        Возвращает статистику использования кэша.
+
+        :return: Словарь с количеством групп, взятых из кэша и вычисленных заново, и долей попаданий.
+        """
+        total = self.hits + self.misses
+        hit_rate = round(self.hits / total * 100, 3) if total else 0.0
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': hit_rate}
+
+    def display_stats(self):
+        """Выводит статистику кэша результатов в консоль."""
+        stats = self.stats()
+        print(Fore.LIGHTGREEN_EX + Style.BRIGHT + "Кэш результатов анализа: " + Style.NORMAL +
+              f"групп индикаторов из кэша {stats['hits']}, вычислено заново {stats['misses']} "
+              f"({stats['hit_rate']}% попаданий)." + Fore.RESET)
+
+
+# Единственный кэш результатов на процесс
+result_cache = ResultCache()
+
+
+if __name__ == "__main__":
+    # Пример использования
+    for group, version in result_cache.versions.items():
+        print(group, version)
+    print(len(module_closure(FEATURE_GROUPS['miscellaneous'])), "файлов в группе miscellaneous")
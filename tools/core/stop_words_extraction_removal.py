@@ -1,18 +1,7 @@
 # -*- coding: utf-8 -*- # Языковая кодировка UTF-8
 import re
 
-from nltk.corpus import stopwords
-
-from tools.core.data import pronouns, prepositions, particles, conjunctions
-from tools.core.data.discource_markers import final_sci_dm_list
-
-nltk_stopwords_ru = stopwords.words("russian")
-
-# 1. Объединение всех списков stopwords в один
-all_stopwords = set(conjunctions.conjunctions_list + prepositions.prepositions_list
-                    + particles.particles_list + pronouns.pronouns_list + nltk_stopwords_ru)
-# 2. Сортировка stopwords по длине по убыванию
-all_stopwords_sorted = sorted(list(all_stopwords), key=len, reverse=True)
+from tools.core.lexicon import lexicon
 
 
 def count_custom_stopwords(text):
@@ -24,17 +13,9 @@ def count_custom_stopwords(text):
         tuple: Общее количество найденных стоп-слов, словарь, где ключи - это стоп-слова,
                а значения - количество их вхождений в текст, и общее количество вхождений всех стоп-слов в тексте.
     """
-    stopword_counts = {stopword: 0 for stopword in all_stopwords_sorted}
-    text_to_clean = text.lower()
+    # Стоп-слова ищутся за один проход; при пересечениях приоритет у более длинных стоп-слов
+    found_stopwords = lexicon.stopwords_matcher.count(text.lower())
 
-    for stopword in all_stopwords_sorted:
-        count = len(re.findall(r'\b' + re.escape(stopword) + r'\b', text_to_clean))
-        if count > 0:
-            stopword_counts[stopword] += count
-            text_to_clean = re.sub(r'\b' + re.escape(stopword) + r'\b', '', text_to_clean)
-
-    # Фильтруем только те стоп-слова, которые были найдены в тексте
-    found_stopwords = {word: count for word, count in stopword_counts.items() if count > 0}
     sorted_stopwords = dict(sorted(found_stopwords.items(), key=lambda item: item[1], reverse=True))
     stopwords_total_count_with_rep = sum(found_stopwords.values())
     unique_stopwords = len(found_stopwords)
@@ -65,16 +46,11 @@ def remove_dm(text):
     """
     # Преобразуем текст в нижний регистр для удобства поиска маркеров
     text_lower = text.lower()
-    deleted_dms = 0
-
-    # Проходим по каждому дискурсивному маркеру
-    for dm in final_sci_dm_list:
-        # Проверяем наличие маркера в тексте
-        count_before = len(re.findall(r'\b' + re.escape(dm) + r'\b', text_lower))
-        if count_before > 0:
-            # Заменяем маркер на пустую строку
-            text_lower = re.sub(r'\b' + re.escape(dm) + r'\b', '', text_lower)
-            deleted_dms += count_before
+
+    # Находим все маркеры за один проход и заменяем их на пустую строку
+    found_dms = lexicon.dm_matcher.find(text_lower)
+    deleted_dms = len(found_dms)
+    text_lower = lexicon.dm_matcher.remove(text_lower, found_dms)
 
     # Убираем лишние пробелы после удаления маркеров
     text_lower = re.sub(r'\s+', ' ', text_lower).strip()
@@ -1,13 +1,61 @@
 # -*- coding: utf-8 -*- # Языковая кодировка UTF-8
 import re
 import sys
+from functools import cached_property
 
-from tools.core.data.abbreviations import abbreviations_with_point
+from tools.core.lexicon import lexicon
+
+
+def compile_longest_match_pattern(phrases):
+    """
+    Компилирует фразы в одно регулярное выражение в виде префиксного дерева: \\b, затем ветвление по
+    символам. В каждой позиции текста выражение находит самую длинную из подходящих фраз, а общие начала
+    фраз проверяются один раз.
+
+    :param phrases: Фразы (например, сокращения с точкой).
+    :return: Скомпилированное регулярное выражение.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Если фраза может закончиться в этом узле, продолжение необязательно (сначала пробуется более длинное)
+        return '(?:' + body + ')?' if '' in node else body
+
+    return re.compile(r'\b' + build(trie))
 
 
 class TextPreProcessor:
-    def __init__(self):
-        self.abbreviations = abbreviations_with_point
+    """
+    Предобработка текста: замена сокращений полными формами и исправление пробелов.
+
+    Все модули используют один экземпляр (text_preprocessor): шаблон сокращений компилируется один раз,
+    при первой обработке текста.
+    """
+
+    def __init__(self, abbreviations=None):
+        """
+        :param abbreviations: Словарь {сокращение: полная форма}. По умолчанию используются сокращения
+            из снимка списков слов (lexicon.abbreviations_with_point).
+        """
+        self._abbreviations = abbreviations
+
+    @cached_property
+    def abbreviations(self):
+        return self._abbreviations if self._abbreviations is not None else lexicon.abbreviations_with_point
+
+    @cached_property
+    def abbreviation_pattern(self):
+        """Регулярное выражение, находящее самое длинное сокращение в каждой позиции текста."""
+        return compile_longest_match_pattern(self.abbreviations)
 
     def fix_spacing(self, text):
         """Исправляет пробелы и форматирование в тексте.
@@ -65,19 +113,14 @@ class TextPreProcessor:
     def point_abbr_to_full(self, text):
         """Заменяет аббревиатуры на полные формы в тексте.
 
-        Использует отсортированный список аббревиатур для замены их полными формами в тексте.
+        Все аббревиатуры заменяются за один проход по тексту: в каждой позиции выбирается самая длинная
+        подходящая аббревиатура.
 
         :param text: Исходный текст с аббревиатурами.
         :return: Текст с замененными аббревиатурами на полные формы.
         """
-        abbreviation_items = list(self.abbreviations.items())  # Получаем список кортежей
-        abbreviation_items.sort(key=lambda x: len(x[0]), reverse=True)
-
-        # Применение замен в тексте
-        for abbreviation, full_form in abbreviation_items:
-            pattern = r'\b' + re.escape(abbreviation)
-            text = re.sub(pattern, full_form, text)
-        return text
+        abbreviations = self.abbreviations
+        return self.abbreviation_pattern.sub(lambda match: abbreviations[match.group()], text)
 
     def process_text(self, text):
         """Обрабатывает текст, заменяя аббревиатуры и исправляя пробелы.
@@ -92,6 +135,10 @@ class TextPreProcessor:
         return text
 
 
+# Единственный экземпляр предобработчика на процесс
+text_preprocessor = TextPreProcessor()
+
+
 def get_full_input():
     print("Введите текст для анализа (нажмите Command+D для завершения ввода):")
     input_text = sys.stdin.read()
@@ -100,7 +147,7 @@ def get_full_input():
 
 # Использование класса
 if __name__ == "__main__":
-    processor = TextPreProcessor()
+    processor = text_preprocessor
 
     # Текст для примера (сгенерирован ИИ)
     text = """
@@ -1,8 +1,6 @@
 import re
 
-import re
-
-import re
+from tools.core.parsed_document import ParsedDocument
 
 
 def separate_tokens_with_hyphen(text):
@@ -24,11 +22,13 @@ def count_tokens(text):
     """
     Подсчитывает общее количество токенов в тексте, состоящих из кириллицы, латиницы и дефиса.
 
-    :param text: Строка текста для анализа.
+    :param text: Строка текста (или ParsedDocument) для анализа.
     :return: Количество токенов, состоящих из кириллицы, латиницы и дефиса.
     """
     # Регулярное выражение для токенов, содержащих только кириллицу, латиницу или дефисы
     pattern = r'\b[А-Яа-яЁёA-Za-z-]+\b'
+    if isinstance(text, ParsedDocument):
+        text = text.text
     separated_text = separate_tokens_with_hyphen(text)
     # Поиск всех токенов по регулярному выражению
     alpha_tokens = re.findall(pattern, separated_text)
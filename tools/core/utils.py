@@ -1,32 +1,33 @@
 import os
 
 from colorama import Fore, Style
-from natasha import (Segmenter,
-                     MorphVocab,
-
-                     NewsEmbedding,
-                     NewsMorphTagger,
-                     NewsSyntaxParser,
-                     NewsNERTagger,
-
-                     PER,
-                     NamesExtractor,
-
-                     Doc
-                     )
 from prettytable import PrettyTable
 from rich.console import Console
 from rich.table import Table
 
 from tools.core.constants import GRAMMEMES_MORPH_ANNOTATION_GRAM_CATEGORIES, GRAMMEMES_NGRAMS, \
     GRAMMEMES_MORPH_ANNOTATION, NON_TRANSLATED_DB_NAME, MACHINE_TRANSLATED_DB_NAME, HUMAN_TRANSLATED_DB_NAME
+from tools.core.models import models
 
 console = Console()
 
+# В неинтерактивном режиме (пакетный запуск из командной строки) паузы с ожиданием Enter пропускаются
+interactive = True
+
+
+def set_interactive(enabled):
+    """
+    Включает или отключает ожидание нажатия Enter между выводом результатов.
+
+    :param enabled: False - для запуска без участия пользователя (batch_analysis.py).
+    """
+    global interactive
+    interactive = enabled
+
 
 def wait_for_enter_to_analyze():
     """Функция, которая ждет нажатия Enter, чтобы продолжить анализ."""
-    while True:
+    while interactive:
         pause = input(Fore.LIGHTBLUE_EX + Style.BRIGHT + "Нажмите 'Enter', чтобы продолжить." + Fore.RESET)
         if pause.strip() == '':  # если нажали только Enter (строка пустая)
             break
@@ -36,7 +37,7 @@ def wait_for_enter_to_choose_opt():
     """
      Ожидает нажатия клавиши Enter от пользователя, чтобы вернуться к выбору опции.
      """
-    while True:
+    while interactive:
         pause = input(
             Fore.LIGHTBLUE_EX + Style.BRIGHT + "Нажмите 'Enter', чтобы вернуться к выбору опции." + Fore.RESET)
         if pause.strip() == '':  # если нажали только Enter (строка пустая)
@@ -250,17 +251,15 @@ def display_position_explanation():
 
 def get_syntactic_annotation(text):
     """Метод для выполнения синтаксической разметки текста с использованием Natasha."""
+    from natasha import Doc
+
     doc = Doc(text)
-    segmenter = Segmenter()
-    emb = NewsEmbedding()
-    morph_tagger = NewsMorphTagger(emb)
-    syntax_parser = NewsSyntaxParser(emb)
     # Сегментация на предложения для дальнейшего анализа
-    doc.segment(segmenter)
+    doc.segment(models.segmenter)
     # Морфологический анализ для дальнейшего синтаксического анализа
-    doc.tag_morph(morph_tagger)
+    doc.tag_morph(models.morph_tagger)
     # Анализ синтаксиса
-    doc.parse_syntax(syntax_parser)
+    doc.parse_syntax(models.syntax_parser)
     # Собираем синтаксическую разметку в строку
     tokens_info = []
     i = 0
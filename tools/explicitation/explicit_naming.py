@@ -1,15 +1,13 @@
 # -*- coding: utf-8 -*- # Языковая кодировка UTF-8
-import pymorphy2
 from colorama import Fore, Style, init
-from nltk.tokenize import word_tokenize
 from rich.console import Console
 from rich.table import Table
 
-from tools.core.data.pronouns import pers_possessive_pronouns_analysis_list
+from tools.core.lexicon import lexicon
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
-from tools.explicitation.named_entities_extraction import extract_entities
+from tools.explicitation.named_entities_extraction import get_entity_spans
 
-morph = pymorphy2.MorphAnalyzer()
 console = Console()
 init(autoreset=True)
 
@@ -19,16 +17,17 @@ def calculate_explicit_naming_ratio(text, show_analysis=True):
     """
     Рассчитывает параметр явного называния через отношение личных местоимений к именам собственным в тексте.
 
-    :param text: Входной текст на русском языке, который будет анализироваться.
+    :param text: Входной текст на русском языке (строка или ParsedDocument), который будет анализироваться.
     :param show_analysis: Если True, отображает результаты анализа в виде таблицы (по умолчанию True).
 
     :return: Отношение личных местоимений к именам собственным в процентах. Если в тексте нет имен собственных, возвращается 0.
     """
-    found_entities, entities_count = extract_entities(text, False)
+    document = as_document(text)
+    entities_count = len(get_entity_spans(document))
 
-    tokens = word_tokenize(text.lower(), language="russian")
+    tokens = document.lower_tokens
 
-    pronouns_count = sum(1 for token in tokens if morph.parse(token)[0].normal_form in pers_possessive_pronouns_analysis_list)
+    pronouns_count = sum(1 for token in tokens if document.parse(token).normal_form in lexicon.pronoun_lists['pers_possessive'])
 
     if entities_count > 0:
         ratio = round((pronouns_count / entities_count) * 100, 3)
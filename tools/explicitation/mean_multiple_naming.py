@@ -1,12 +1,11 @@
 # -*- coding: utf-8 -*- # Языковая кодировка UTF-8
-import ast
-
 from colorama import Style, Fore
 from rich.console import Console
 from rich.table import Table
 
 from tools.core.utils import wait_for_enter_to_analyze
-from tools.explicitation.named_entities_extraction import extract_entities
+from tools.core.parsed_document import as_document
+from tools.explicitation.named_entities_extraction import get_entity_spans
 
 console = Console()
 
@@ -15,7 +14,7 @@ def calculate_mean_multiple_naming(text, show_analysis=True):
     """
     Вычисляет среднее количество слов в именах собственных в тексте.
 
-    :param text: Входной текст на русском языке для анализа имен собственных.
+    :param text: Входной текст на русском языке (строка или ParsedDocument) для анализа имен собственных.
     :param show_analysis: Если True, отображает результаты анализа в виде таблицы (по умолчанию True).
 
     :return: Возвращает кортеж, включающий:
@@ -25,26 +24,25 @@ def calculate_mean_multiple_naming(text, show_analysis=True):
         - Строку с перечислением многословных имен.
         - Количество многословных имен.
     """
-    found_entities_str, entities_count = extract_entities(text, False)
-    found_entities = ast.literal_eval(found_entities_str)  # Преобразуем строку в список кортежей
+    entity_spans = get_entity_spans(as_document(text))
+    entities_count = len(entity_spans)
 
     single_entities = []
     multiple_entities = []
 
     lengths = []
     current_length = 0
-    for entity, entity_type in found_entities:
-        words = entity.split()
+    for span in entity_spans:
         # Распределяем сущности по спискам в зависимости от количества слов
-        if len(words) == 1:
-            single_entities.append(entity)
+        if span.token_count == 1:
+            single_entities.append(span.text)
         else:
-            multiple_entities.append(entity)
+            multiple_entities.append(span.text)
 
         if current_length == 0:
-            current_length = len(entity.split())
+            current_length = span.token_count
         else:
-            current_length += len(entity.split())
+            current_length += span.token_count
             lengths.append(current_length)
             current_length = 0
     if current_length > 0:
@@ -2,10 +2,11 @@
 import json
 
 from colorama import Style, Fore
-from natasha import NewsNERTagger, NewsEmbedding, Doc, Segmenter
 from rich.console import Console
 from rich.table import Table
 
+from tools.core.models import models
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
 
 console = Console()
@@ -32,30 +33,66 @@ def preprocess_text(text, custom_entities):
     return text
 
 
+class EntitySpan:
+    """
+    Именованная сущность, найденная NER Natasha: текст сущности, ее тип и смещения в исходном тексте.
+    """
+    __slots__ = ('text', 'type', 'start', 'stop')
+
+    def __init__(self, text, type, start, stop):
+        self.text = text
+        self.type = type
+        self.start = start
+        self.stop = stop
+
+    @property
+    def token_count(self):
+        """Количество слов (токенов, разделенных пробелами) в сущности."""
+        return len(self.text.split())
+
+    def __repr__(self):
+        return f"EntitySpan({self.text!r}, {self.type!r}, {self.start}, {self.stop})"
+
+
+def get_entity_spans(text):
+    """
+    Возвращает спаны именованных сущностей текста.
+
+    NER Natasha выполняется один раз на документ: результат сохраняется в ParsedDocument и
+    переиспользуется всеми индикаторами explicitation (explicit naming, single naming,
+    mean multiple naming и список именованных сущностей).
+
+    :param text: Входной текст (строка или ParsedDocument).
+    :return: Список объектов EntitySpan в порядке следования в тексте.
+    """
+    document = as_document(text)
+
+    if document.entity_spans is None:
+        from natasha import Doc
+
+        # Создаем объект Doc с текстом (модели Natasha берутся из общего реестра)
+        doc = Doc(document.text)
+        doc.segment(models.segmenter)
+        doc.tag_ner(models.ner_tagger)
+
+        document.entity_spans = [EntitySpan(doc.text[span.start:span.stop], span.type, span.start, span.stop)
+                                 for span in doc.ner.spans]
+    return document.entity_spans
+
+
 def extract_entities(text, show_entities_in_console=True):
     """
     Извлекает именованные сущности и их типы из текста.
 
-    :param text: Входной текст для анализа на наличие именованных сущностей.
+    :param text: Входной текст (строка или ParsedDocument) для анализа на наличие именованных сущностей.
     :param show_entities_in_console: Флаг, определяющий, выводить ли найденные сущности в консоль (по умолчанию True).
 
     :return: Кортеж, содержащий:
         - Строку в JSON-подобном формате с найденными сущностями и их типами.
         - Количество найденных сущностей.
     """
-    preprocess_text(text, custom_entities)
-    # Инициализация инструментов Natasha
-    segmenter = Segmenter()
-    emb = NewsEmbedding()
-    ner_tagger = NewsNERTagger(emb)
-
-    # Создаем объект Doc с текстом
-    doc = Doc(text)
-    doc.segment(segmenter)
-    doc.tag_ner(ner_tagger)
-
     # Создаем список кортежей (сущность, тип)
-    found_named_entities = [(doc.text[span.start:span.stop], span.type) for span in doc.ner.spans]
+    found_named_entities = [(span.text, span.type) for span in get_entity_spans(text)]
     found_entities_count = len(found_named_entities)
 
     found_named_entities_str = json.dumps(found_named_entities, ensure_ascii=False)
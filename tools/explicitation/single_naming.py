@@ -1,12 +1,11 @@
 # -*- coding: utf-8 -*- # Языковая кодировка UTF-8
-import ast
-
 from colorama import Fore, Style
 from rich.console import Console
 from rich.table import Table
 
 from tools.core.utils import wait_for_enter_to_analyze
-from tools.explicitation.named_entities_extraction import extract_entities
+from tools.core.parsed_document import as_document
+from tools.explicitation.named_entities_extraction import get_entity_spans
 
 console = Console()
 
@@ -15,17 +14,17 @@ def single_naming_frequency(text, show_analysis=True):
     """
     Вычисляет частоту имен собственных, состоящих из одного токена, без соседних имен собственных.
 
-    :param text: Входной текст на русском языке.
+    :param text: Входной текст на русском языке (строка или ParsedDocument).
     :param show_analysis: Флаг, определяющий, нужно ли выводить анализ в консоль. По умолчанию True.
 
     :return: Частота одиночных имен собственных в процентах.
     """
-    found_entities_str, entities_count = extract_entities(text, False)
-    found_entities = ast.literal_eval(found_entities_str)  # Преобразуем строку в список кортежей
+    entity_spans = get_entity_spans(as_document(text))
+    entities_count = len(entity_spans)
     single_entities_count = 0
 
-    for entity, entity_type in found_entities:
-        if len(entity.split()) == 1:
+    for span in entity_spans:
+        if span.token_count == 1:
             single_entities_count += 1
 
     single_entities_frequency = round(single_entities_count / entities_count * 100, 3) if entities_count > 0 else 0.0
@@ -1,41 +1,27 @@
 # -*- coding: utf-8 -*- # Языковая кодировка UTF-8
 import json
 import re
-from collections import defaultdict, Counter
+from collections import Counter
 
-import pymorphy2
 from colorama import Fore, Style
-from nltk.corpus import stopwords
 from rich.console import Console
 from rich.table import Table
 
-from tools.core.custom_punkt_tokenizer import sent_tokenize_with_abbr
-from tools.core.data import pronouns, prepositions, particles, conjunctions
+from tools.core.context_store import ContextStore, is_encoded_contexts
+from tools.core.lexicon import lexicon
+from tools.core.parse_cache import parse_word
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
-from tools.core.text_preparation import TextPreProcessor
 
 console = Console()
 
-# Загрузка стоп-слов
-nltk_stopwords_ru = stopwords.words("russian")
-
-# 1. Объединение всех списков в один
-all_stopwords = set(conjunctions.conjunctions_list + prepositions.prepositions_list
-                    + particles.particles_list + pronouns.pronouns_list + nltk_stopwords_ru)
-
-# 2. Сортировка по длине по убыванию
-all_stopwords_sorted = sorted(list(all_stopwords), key=len, reverse=True)
-
-# Инициализация морфологического анализатора
-morph = pymorphy2.MorphAnalyzer()
-
-
-def get_pos(word):
+def get_pos(word, document=None):
     """
     Определяет часть речи для данного слова с использованием pymorphy2 + есть кастомные POS теги.
 
     Параметры:
     word (str): Слово для определения части речи.
+    document (ParsedDocument): Документ, кэш разборов которого используется (необязательно).
 
     Возвращает:
     str: Часть речи (POS).
@@ -54,21 +40,107 @@ def get_pos(word):
         return 'COLON'
     if re.match(r'[–]', word):
         return 'DASH'
-    parsed = morph.parse(word)[0]
+    parsed = document.parse(word) if document is not None else parse_word(word)
     return parsed.tag.POS
 
 
-def contextual_function_words_in_trigrams(text, show_analysis=True):
+# Категории триграммов по количеству функциональных слов в них (1, 2, 3)
+FUNCTION_WORD_CATEGORIES = ('one_function_word', 'two_function_words', 'three_function_words')
+
+# Отделение знаков препинания пробелами и удаление нежелательных символов
+punctuation_pattern = re.compile(r'([.,!?;–])')
+unwanted_chars_pattern = re.compile(r'[^а-яА-ЯёЁA-Za-z0-9\s.,!?;\-–]')
+
+
+class FunctionWordTrigrams:
+    """
+    Токены предложений текста для подсчета триграммов с функциональными словами.
+
+    Многословные функциональные слова склеиваются в один токен одним проходом матчера
+    lexicon.multiword_stopwords_matcher по всему тексту. Каждый токен получает номер (id) в словаре
+    текста, предложения хранятся списками id, а триграммы - окна из трех соседних id. Метка токена
+    (само функциональное слово или его часть речи) определяется один раз на токен, а не на каждое
+    вхождение триграмма.
+    """
+
+    def __init__(self, document):
+        """
+        :param document: ParsedDocument (его кэш разборов используется для определения частей речи).
+        """
+        self.document = document
+        self.vocabulary = {}
+        self.tokens = []
+        self.is_function_word = []
+        self._labels = []
+        self.sentences = [self._encode(sentence.split()) for sentence in self._glued_sentences()]
+
+    def _glued_sentences(self):
+        """Предложения документа с многословными функциональными словами, склеенными через '_'."""
+        sentences = []
+        for sent in self.document.processed_sentences:
+            # Разделение слов и знаков препинания пробелами, удаление нежелательных символов
+            sent = unwanted_chars_pattern.sub(' ', punctuation_pattern.sub(r' \1 ', sent))
+            sentences.append(' '.join(sent.split()))
+        # Перевод строки не входит во фразы, поэтому фразы не склеиваются через границу предложений
+        return lexicon.multiword_stopwords_matcher.glue('\n'.join(sentences)).split('\n')
+
+    def _encode(self, tokens):
+        """Переводит токены предложения в id, пополняя словарь текста."""
+        ids = []
+        all_stopwords = lexicon.all_stopwords
+        for token in tokens:
+            token_id = self.vocabulary.get(token)
+            if token_id is None:
+                token_id = self.vocabulary[token] = len(self.tokens)
+                clean_token = token.replace('_', ' ')
+                self.tokens.append(clean_token)
+                self.is_function_word.append(clean_token in all_stopwords)
+                self._labels.append(None)
+            ids.append(token_id)
+        return ids
+
+    @property
+    def total(self):
+        """Общее количество триграммов (окон из трех токенов внутри предложений)."""
+        return sum(max(len(ids) - 2, 0) for ids in self.sentences)
+
+    def label(self, token_id):
+        """Функциональное слово или часть речи токена (определяется при первом обращении)."""
+        label = self._labels[token_id]
+        if label is None:
+            token = self.tokens[token_id]
+            label = token if self.is_function_word[token_id] else get_pos(token, self.document)
+            # Часть речи может быть None, поэтому в кэше хранится кортеж
+            self._labels[token_id] = label = (label,)
+        return label[0]
+
+    def windows(self):
+        """
+        Перебирает триграммы с функциональными словами скользящим окном по id токенов.
+
+        :return: Генератор кортежей (id трех токенов, количество функциональных слов в триграмме).
+        """
+        is_function_word = self.is_function_word
+        for ids in self.sentences:
+            for trigram in zip(ids, ids[1:], ids[2:]):
+                first, second, third = trigram
+                function_words = is_function_word[first] + is_function_word[second] + is_function_word[third]
+                if function_words:
+                    yield trigram, function_words
+
+
+def contextual_function_words_in_trigrams(text, show_analysis=True, retention=None):
     """
     Анализирует текст и находит триграммы, содержащие функциональные слова, а также их контексты и частоты.
 
-    :param text (str): Входной текст для анализа.
+    :param text (str | ParsedDocument): Входной текст для анализа.
     :param show_analysis (bool): Если True, выводит результаты анализа.
+    :param retention (ContextRetention): Политика хранения контекстов (по умолчанию - общая context_retention).
 
-    :return tuple: Состоящий из трех JSON-строк:
-        - Нормализованные частоты триграмм с функциональными словами.
-        - Абсолютные частоты триграмм с функциональными словами.
-        - Контексты триграмм с функциональными словами.
+    :return tuple: Состоящий из трех элементов:
+        - Нормализованные частоты триграмм с функциональными словами (JSON-строка).
+        - Абсолютные частоты триграмм с функциональными словами (JSON-строка).
+        - Контексты триграмм с функциональными словами (двоичная форма ContextStore).
     """
     if show_analysis:
         print(
@@ -76,79 +148,37 @@ def contextual_function_words_in_trigrams(text, show_analysis=True):
         print(Fore.LIGHTRED_EX + Style.BRIGHT + "Внимание! В зависимости от размера текста подсчет может занять "
                                                 "какое-то время. \nПожалуйста, будьте готовы подождать.\n" + Fore.RESET)
         wait_for_enter_to_analyze()
-    text_processor = TextPreProcessor()
-    sentences = sent_tokenize_with_abbr(text)
-
-    func_words_contexts_with_tokens_or_pos = defaultdict(list)
-    token_trigram_counts = Counter()
-    pos_trigram_counts = {
-        'one_function_word': Counter(),
-        'two_function_words': Counter(),
-        'three_function_words': Counter()
-    }
-    all_trigram_counts = Counter()
-
-    for sent in sentences:
-        # Предварительная обработка текста
-        sent = text_processor.process_text(sent)
-        # Разделение слов и знаков препинания пробелами
-        sent = re.sub(r'([.,!?;–])', r' \1 ', sent)
-        # Удаление нежелательных символов
-        sent = re.sub(r'[^а-яА-ЯёЁA-Za-z0-9\s.,!?;\-–]', ' ', sent)
-        # Замена многотокенных стоп-слов на уникальные маркеры
-        for stopword in all_stopwords_sorted:
-            stopword_tokens = stopword.split()
-            if len(stopword_tokens) > 1:  # Если стоп-слово состоит из нескольких токенов
-                pattern = r'\b' + r'\s+'.join(map(re.escape, stopword_tokens)) + r'\b'
-                sent = re.sub(pattern, stopword.replace(' ', '_'), sent)
-        # Разделение предложения на токены
-        tokens = sent.strip().split()
-
-        for i in range(len(tokens) - 2):
-            trigram = tokens[i:i + 3]
-            all_trigram_counts[tuple(trigram)] += 1
-
-            stopword_count = sum(1 for token in trigram if token.replace('_', ' ') in all_stopwords)
-
-            clean_trigram = [token.replace('_', ' ') for token in trigram]
-
-            if stopword_count > 0:
-                trigram_pos_with_at_least_one_func_w = [
-                    token.replace('_', ' ') if token.replace('_', ' ') in all_stopwords
-                    else get_pos(token.replace('_', ' '))
-                    for token in trigram
-                ]
-
-                if stopword_count == 1:
-                    func_words_contexts_with_tokens_or_pos['one_function_word'].append(
-                        (clean_trigram, trigram_pos_with_at_least_one_func_w))
-                    pos_trigram_counts['one_function_word'][tuple(trigram_pos_with_at_least_one_func_w)] += 1
-                elif stopword_count == 2:
-                    func_words_contexts_with_tokens_or_pos['two_function_words'].append(
-                        (clean_trigram, trigram_pos_with_at_least_one_func_w))
-                    pos_trigram_counts['two_function_words'][tuple(trigram_pos_with_at_least_one_func_w)] += 1
-                elif stopword_count == 3:
-                    func_words_contexts_with_tokens_or_pos['three_function_words'].append(
-                        (clean_trigram, trigram_pos_with_at_least_one_func_w))
-                    pos_trigram_counts['three_function_words'][tuple(trigram_pos_with_at_least_one_func_w)] += 1
-
-            token_trigram_counts[tuple(clean_trigram)] += 1
-
-    total_all_trigrams = sum(all_trigram_counts.values())
+    # Предложения, уже обработанные TextPreProcessor.process_text, берем из разобранного документа
+    trigrams = FunctionWordTrigrams(as_document(text))
+
+    # Для каждого разного триграмма id токенов один раз составляются токены, метки и категория
+    trigram_info = {}
+    trigram_id_counts = Counter()
+    contexts = ContextStore(3, retention)
+    for trigram, function_words in trigrams.windows():
+        info = trigram_info.get(trigram)
+        if info is None:
+            tokens = tuple(trigrams.tokens[token_id] for token_id in trigram)
+            labels = tuple(trigrams.label(token_id) for token_id in trigram)
+            info = trigram_info[trigram] = (FUNCTION_WORD_CATEGORIES[function_words - 1], tokens, labels)
+        category, tokens, labels = info
+        contexts.add(category, tokens, labels)
+        trigram_id_counts[trigram] += 1
+
+    # Разные токены могут иметь одинаковые метки: количества складываются в порядке первого появления
+    pos_trigram_counts = {category: Counter() for category in FUNCTION_WORD_CATEGORIES}
+    for trigram, count in trigram_id_counts.items():
+        category, _, labels = trigram_info[trigram]
+        pos_trigram_counts[category][labels] += count
+
+    total_all_trigrams = trigrams.total
 
     normalized_freqs = {
-        'one_function_word': {
-            trigram: round(count / total_all_trigrams * 100, 3)
-            for trigram, count in pos_trigram_counts['one_function_word'].items()
-        },
-        'two_function_words': {
+        category: {
             trigram: round(count / total_all_trigrams * 100, 3)
-            for trigram, count in pos_trigram_counts['two_function_words'].items()
-        },
-        'three_function_words': {
-            trigram: round(count / total_all_trigrams * 100, 3)
-            for trigram, count in pos_trigram_counts['three_function_words'].items()
+            for trigram, count in pos_trigram_counts[category].items()
         }
+        for category in FUNCTION_WORD_CATEGORIES
     }
 
     sorted_normalized_freqs = {
@@ -157,16 +187,10 @@ def contextual_function_words_in_trigrams(text, show_analysis=True):
     }
 
     pos_trigram_counts = {
-        'one_function_word': dict(
-            sorted(pos_trigram_counts['one_function_word'].items(), key=lambda item: item[1], reverse=True)),
-        'two_function_words': dict(
-            sorted(pos_trigram_counts['two_function_words'].items(), key=lambda item: item[1], reverse=True)),
-        'three_function_words': dict(
-            sorted(pos_trigram_counts['three_function_words'].items(), key=lambda item: item[1], reverse=True))
+        category: dict(sorted(pos_trigram_counts[category].items(), key=lambda item: item[1], reverse=True))
+        for category in FUNCTION_WORD_CATEGORIES
     }
 
-    func_words_contexts_with_tokens_or_pos = dict(func_words_contexts_with_tokens_or_pos)
-
     def convert_keys_to_str(d):
         """
         Рекурсивно преобразует ключи словаря в строки.
@@ -184,15 +208,29 @@ def contextual_function_words_in_trigrams(text, show_analysis=True):
 
     sorted_normalized_freqs = convert_keys_to_str(sorted_normalized_freqs)
     pos_trigram_counts = convert_keys_to_str(pos_trigram_counts)
-    func_words_contexts_with_tokens_or_pos = convert_keys_to_str(func_words_contexts_with_tokens_or_pos)
     sorted_normalized_freqs_json = json.dumps(sorted_normalized_freqs, ensure_ascii=False)
     pos_trigram_counts_json = json.dumps(pos_trigram_counts, ensure_ascii=False)
-    func_words_contexts_with_tokens_or_pos_json = json.dumps(func_words_contexts_with_tokens_or_pos, ensure_ascii=False)
+    func_words_contexts = contexts.to_bytes()
 
     if show_analysis:
-        print_trigram_tables_with_func_w(sorted_normalized_freqs_json, pos_trigram_counts_json,
-                                         func_words_contexts_with_tokens_or_pos_json)
-    return sorted_normalized_freqs_json, pos_trigram_counts_json, func_words_contexts_with_tokens_or_pos_json
+        print_trigram_tables_with_func_w(sorted_normalized_freqs_json, pos_trigram_counts_json, func_words_contexts)
+    return sorted_normalized_freqs_json, pos_trigram_counts_json, func_words_contexts
+
+
+def load_trigram_contexts(func_words_contexts):
+    """
+    Восстанавливает контексты триграммов с функциональными словами.
+
+    :param func_words_contexts: Двоичная форма ContextStore или JSON-строка (записи БД, сохраненные
+        до появления двоичной формы).
+    :return: Кортеж (словарь {категория: [(токены, метки), ...]}, пояснение о неполных контекстах или None).
+    """
+    if not is_encoded_contexts(func_words_contexts):
+        return json.loads(func_words_contexts), None
+    store = ContextStore.from_bytes(func_words_contexts)
+    contexts = {category: [(list(tokens), list(labels)) for _, tokens, labels in store.rows(category)]
+                for category in store.categories()}
+    return contexts, store.retention_note()
 
 
 def print_trigram_tables_with_func_w(sorted_normalized_freqs, pos_trigram_counts_json, func_words_contexts_with_tokens_or_pos_json, for_corpus=False):
@@ -201,7 +239,8 @@ def print_trigram_tables_with_func_w(sorted_normalized_freqs, pos_trigram_counts
 
     :param sorted_normalized_freqs: JSON-строка, содержащая нормализованные частоты триграммов с функциональными словами.
     :param pos_trigram_counts_json: JSON-строка, содержащая абсолютные частоты триграммов с функциональными словами.
-    :param func_words_contexts_with_tokens_or_pos_json: JSON-строка, содержащая контексты триграмм с функциональными словами.
+    :param func_words_contexts_with_tokens_or_pos_json: Контексты триграмм с функциональными словами (двоичная форма
+        ContextStore или JSON-строка); восстанавливаются, только если пользователь захочет их вывести.
     :param for_corpus: Булевый параметр. Если True, контексты не будут выводиться. По умолчанию False.
 
     Выводит таблицы с нормализованными частотами и абсолютными частотами триграммов в зависимости от минимальной частоты, указанной пользователем.
@@ -213,7 +252,6 @@ def print_trigram_tables_with_func_w(sorted_normalized_freqs, pos_trigram_counts
         wait_for_enter_to_analyze()
     sorted_normalized_freqs = json.loads(sorted_normalized_freqs)
     pos_trigram_counts = json.loads(pos_trigram_counts_json)
-    func_words_contexts_with_tokens_or_pos = json.loads(func_words_contexts_with_tokens_or_pos_json)
 
     print(
         Fore.LIGHTGREEN_EX + Style.BRIGHT + "Введите интересующую Вас минимальную частоту триграммов или просто нажмите 'Enter' \n(по умолчанию значение=1):" + Fore.RESET)
@@ -275,6 +313,10 @@ def print_trigram_tables_with_func_w(sorted_normalized_freqs, pos_trigram_counts
 
         print(
             Fore.GREEN + Style.BRIGHT + "\n            КОНТЕКСТЫ ЧАСТЕРЕЧНЫХ ТРИГРАММОВ С ФУНКЦИОНАЛЬНЫМИ СЛОВАМИ" + Fore.RESET)
+        func_words_contexts_with_tokens_or_pos, retention_note = load_trigram_contexts(
+            func_words_contexts_with_tokens_or_pos_json)
+        if retention_note:
+            print(Fore.LIGHTRED_EX + Style.BRIGHT + retention_note + Fore.RESET)
         wait_for_enter_to_analyze()
         for category in ['one_function_word', 'two_function_words', 'three_function_words']:
             if category == 'one_function_word':
@@ -1,81 +1,249 @@
 # -*- coding: utf-8 -*- # Языковая кодировка UTF-8
 import json
 import re
-from collections import Counter
+from functools import cached_property
 
-import pymorphy2
 from colorama import Style, Fore
-from nltk import ngrams
 from rich.console import Console
 from rich.table import Table
 
+from tools.core.constants import POS_NGRAM_TAGS
+from tools.core.lazy_imports import LazyModule
 from tools.core.utils import display_grammemes, wait_for_enter_to_analyze
 from tools.core.lemmatizators import lemmatize_words_into_sents_for_n_grams
-from tools.core.text_preparation import TextPreProcessor
-
-morph = pymorphy2.MorphAnalyzer()
+from tools.core.parsed_document import as_document
 
 console = Console()
 
+# numpy нужен только для подсчета n-граммов и загружается при первом обращении
+np = LazyModule('numpy')
+
+# Граница кодов n-граммов: n-граммы кодируются числом int64, пока alphabet_size ** n не превышает ее
+MAX_NGRAM_CODE = 2 ** 63
+
+# Номера меток частеречных n-граммов и количество бит на метку в упакованном ключе n-грамма
+POS_TAG_IDS = {tag: tag_id for tag_id, tag in enumerate(POS_NGRAM_TAGS)}
+POS_TAG_BITS = max(len(POS_NGRAM_TAGS) - 1, 1).bit_length()
+
+# Размеры n-граммов, которые возвращают pos_ngrams и character_ngrams (униграммы, биграммы, триграммы)
+STORED_NGRAM_SIZES = (1, 2, 3)
+
+
+class NgramCounts:
+    """
+    Общая часть частот n-граммов: таблица n-граммов (self.ngrams) в порядке первого появления,
+    массив их количеств numpy (self.counts) и общее количество n-граммов (self.total).
+    """
+
+    def __len__(self):
+        return len(self.counts)
+
+    def frequencies(self):
+        """Нормализованные частоты n-граммов (% от общего количества n-граммов), округленные до 3 знаков."""
+        if not len(self):
+            return []
+        return [round(value, 3) for value in (self.counts / self.total * 100).tolist()]
+
+    def sorted_counts(self):
+        """Словарь {n-грамм: количество} по убыванию количества (равные - в порядке первого появления)."""
+        order = np.argsort(-self.counts, kind='stable').tolist()
+        counts = self.counts.tolist()
+        return {self.ngrams[index]: counts[index] for index in order}
+
+    def sorted_frequencies(self):
+        """Словарь {n-грамм: частота} по убыванию частоты (равные - в порядке первого появления)."""
+        frequencies = self.frequencies()
+        order = sorted(range(len(frequencies)), key=lambda index: frequencies[index], reverse=True)
+        return {self.ngrams[index]: frequencies[index] for index in order}
+
+
+class CharNgramCounts(NgramCounts):
+    """
+    Частоты символьных n-граммов одного размера: таблица id -> n-грамм (строка) в порядке первого
+    появления в тексте и массив количеств numpy с тем же порядком.
+
+    N-граммы считаются без создания кортежа на каждую позицию: текст переводится в массив кодов символов,
+    коды - в номера символов алфавита текста, а окна длины n - в одно целое число (запись в системе
+    счисления с основанием, равным размеру алфавита). Количества находит np.unique.
+    """
+
+    def __init__(self, n, ngrams_table, counts, total):
+        """
+        :param n: Размер n-граммов.
+        :param ngrams_table: Список n-граммов (id - индекс в списке).
+        :param counts: Массив количеств n-граммов (int64).
+        :param total: Общее количество n-граммов (позиций окна) в тексте или корпусе.
+        """
+        self.n = n
+        self.ngrams = ngrams_table
+        self.counts = counts
+        self.total = total
+
+    @classmethod
+    def from_text(cls, text, n):
+        """
+        Подсчитывает символьные n-граммы строки.
+
+        :param text: Строка.
+        :param n: Размер n-граммов (любое положительное число).
+        :return: CharNgramCounts.
+        """
+        windows = len(text) - n + 1
+        if n < 1 or windows <= 0:
+            return cls(n, [], np.zeros(0, dtype=np.int64), max(windows, 0))
+        code_points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        alphabet, symbols = np.unique(code_points, return_inverse=True)
+        symbols = symbols.astype(np.int64)
+
+        if len(alphabet) ** n < MAX_NGRAM_CODE:
+            codes = symbols[:windows].copy()
+            for offset in range(1, n):
+                codes *= len(alphabet)
+                codes += symbols[offset:offset + windows]
+            _, first_positions, counts = np.unique(codes, return_index=True, return_counts=True)
+        else:
+            # Очень длинные n-граммы не помещаются в int64: сравниваются окна целиком
+            windows_view = np.lib.stride_tricks.sliding_window_view(symbols, n)
+            _, first_positions, counts = np.unique(windows_view, axis=0, return_index=True, return_counts=True)
+
+        order = np.argsort(first_positions, kind='stable')
+        first_positions = first_positions[order]
+        ngrams_table = [text[position:position + n] for position in first_positions.tolist()]
+        return cls(n, ngrams_table, counts[order].astype(np.int64), windows)
+
+
+class PosNgramCounts(NgramCounts):
+    """
+    Частоты частеречных n-граммов одного размера.
+
+    Метки частей речи и маркеры S_START, S_END, COMMA хранятся номерами из POS_NGRAM_TAGS (uint8):
+    таблица n-граммов - матрица номеров размера (количество n-граммов, n) в порядке первого появления,
+    количества - массив numpy с тем же порядком. Для подсчета каждый n-грамм упаковывается в одно
+    число int64 (POS_TAG_BITS бит на метку), поэтому n-граммы любого порядка считаются за один проход
+    np.unique без создания кортежей строк.
+    """
+
+    def __init__(self, n, tag_ids, counts, total):
+        """
+        :param n: Размер n-граммов.
+        :param tag_ids: Матрица номеров меток n-граммов (uint8, форма (количество n-граммов, n)).
+        :param counts: Массив количеств n-граммов (int64).
+        :param total: Общее количество n-граммов в тексте или корпусе.
+        """
+        self.n = n
+        self.tag_ids = tag_ids
+        self.counts = counts
+        self.total = total
+
+    @classmethod
+    def empty(cls, n, total=0):
+        """Пустые частоты n-граммов."""
+        return cls(n, np.zeros((0, n), dtype=np.uint8), np.zeros(0, dtype=np.int64), total)
+
+    @classmethod
+    def from_tags(cls, tags, n):
+        """
+        Подсчитывает n-граммы последовательности меток частей речи.
+
+        :param tags: Последовательность меток (строки из POS_NGRAM_TAGS).
+        :param n: Размер n-граммов (любое положительное число).
+        :return: PosNgramCounts.
+        """
+        if n < 1:
+            return cls.empty(n)
+        sequence = encode_pos_tags(tags)
+        if len(sequence) < n:
+            return cls.empty(n)
+        windows = np.lib.stride_tricks.sliding_window_view(sequence, n)
+        if POS_TAG_BITS * n < 64:
+            keys = pack_pos_ngrams(windows)
+            _, first_positions, counts = np.unique(keys, return_index=True, return_counts=True)
+        else:
+            # Очень длинные n-граммы не помещаются в int64: сравниваются окна целиком
+            _, first_positions, counts = np.unique(windows, axis=0, return_index=True, return_counts=True)
+        order = np.argsort(first_positions, kind='stable')
+        return cls(n, windows[first_positions[order]], counts[order].astype(np.int64), len(windows))
+
+    @cached_property
+    def ngrams(self):
+        """Список n-граммов (кортежей меток) в порядке таблицы."""
+        return [tuple(POS_NGRAM_TAGS[tag_id] for tag_id in row) for row in self.tag_ids.tolist()]
+
+
+def encode_pos_tags(tags):
+    """
+    Переводит метки частей речи в номера POS_NGRAM_TAGS.
+
+    :param tags: Последовательность меток.
+    :return: Массив numpy uint8.
+    """
+    try:
+        return np.fromiter((POS_TAG_IDS[tag] for tag in tags), dtype=np.uint8, count=len(tags))
+    except KeyError as error:
+        raise ValueError(f"Неизвестная метка частеречного n-грамма: {error.args[0]}") from None
+
+
+def pack_pos_ngrams(tag_ids):
+    """
+    Упаковывает строки матрицы номеров меток в числа int64 (POS_TAG_BITS бит на метку).
+
+    :param tag_ids: Матрица номеров меток (uint8, форма (количество, n)).
+    :return: Массив int64.
+    """
+    keys = tag_ids[:, 0].astype(np.int64)
+    for column in range(1, tag_ids.shape[1]):
+        keys <<= POS_TAG_BITS
+        keys |= tag_ids[:, column]
+    return keys
+
+
+def check_ngram_sizes(n_values):
+    """
+    Проверяет, что запрошены только размеры n-граммов из STORED_NGRAM_SIZES.
+
+    :param n_values: Размеры n-граммов.
+    :raises ValueError: Если запрошен размер, для которого функция не возвращает результат.
+    """
+    unsupported = [n for n in n_values if n not in STORED_NGRAM_SIZES]
+    if unsupported:
+        raise ValueError(f"Неподдерживаемые размеры n-граммов: {unsupported}. "
+                         f"Допустимые размеры: {STORED_NGRAM_SIZES}.")
+
 
 def pos_ngrams(text, n_values=(1, 2, 3), show_analysis=True):
     """
     Вычисляет n-граммы частей речи для русского текста и возвращает результаты в виде строк JSON.
 
-    :param text: Входной текст на русском языке.
+    :param text: Входной текст на русском языке (строка или ParsedDocument).
     :param n_values: Размеры n-грамм, которые нужно вычислить (по умолчанию (1, 2, 3)).
     :param show_analysis: Флаг для отображения анализа (по умолчанию True).
 
     :return tuple: Строки JSON с абсолютными и нормализованными частотами униграммов, биграммов и триграммов.
+    :raises ValueError: Если в n_values есть размеры, отличные от 1, 2 и 3 (n-граммы других размеров
+        считает PosNgramCounts.from_tags).
     """
+    check_ngram_sizes(n_values)
     if show_analysis:
         display_grammemes()
         wait_for_enter_to_analyze()
         print(Fore.GREEN + Style.BRIGHT + "\n                    ЧАСТОТЫ ЧАСТЕРЕЧНЫХ N-ГРАММОВ" + Fore.RESET)
         print(Fore.LIGHTGREEN_EX + "По умолчанию в консоль выводятся n-граммы с абсолютной частотой >20." + Fore.RESET)
 
-    text_processor = TextPreProcessor()
-    text = text_processor.process_text(text)
-    n_grams, lemmas = lemmatize_words_into_sents_for_n_grams(text)
+    text = as_document(text).processed_text
+    tags, lemmas = lemmatize_words_into_sents_for_n_grams(text)
 
-    unigram_counts = Counter()
-    bigram_counts = Counter()
-    trigram_counts = Counter()
+    # Ключ n-грамма в JSON - строковое представление кортежа меток, например "('NOUN', 'VERB')"
+    def to_json(counts):
+        return json.dumps({str(ngram): value for ngram, value in counts.items()}, ensure_ascii=False)
 
+    results = {n: (to_json({}), to_json({})) for n in STORED_NGRAM_SIZES}
     for n in n_values:
-        if n == 1:
-            unigrams = list(ngrams(n_grams, n))
-            unigram_counts.update(unigrams)
-        elif n == 2:
-            bigrams = list(ngrams(n_grams, n))
-            bigram_counts.update(bigrams)
-        elif n == 3:
-            trigrams = list(ngrams(n_grams, n))
-            trigram_counts.update(trigrams)
-
-    def normalize_frequencies(counts, n):
-        total_ngrams = sum(counts.values())
-        return {ngram: round((count / total_ngrams) * 100, 3) for ngram, count in counts.items()}
-
-    unigram_normalized_frequencies = normalize_frequencies(unigram_counts, 1)
-    bigram_normalized_frequencies = normalize_frequencies(bigram_counts, 2)
-    trigram_normalized_frequencies = normalize_frequencies(trigram_counts, 3)
-
-    def convert_keys_to_strings(counter):
-        return {str(k): v for k, v in counter.items()}
-
-    def sort_counter_by_value(counter):
-        return dict(sorted(counter.items(), key=lambda item: item[1], reverse=True))
-
-    unigram_counts = json.dumps(convert_keys_to_strings(sort_counter_by_value(unigram_counts)), ensure_ascii=False)
-    unigram_normalized_frequencies = json.dumps(convert_keys_to_strings(sort_counter_by_value(unigram_normalized_frequencies)),
-                       ensure_ascii=False)
-    bigram_counts = json.dumps(convert_keys_to_strings(sort_counter_by_value(bigram_counts)), ensure_ascii=False)
-    bigram_normalized_frequencies = json.dumps(convert_keys_to_strings(sort_counter_by_value(bigram_normalized_frequencies)),
-                       ensure_ascii=False)
-    trigram_counts = json.dumps(convert_keys_to_strings(sort_counter_by_value(trigram_counts)), ensure_ascii=False)
-    trigram_normalized_frequencies = json.dumps(convert_keys_to_strings(sort_counter_by_value(trigram_normalized_frequencies)),
-                       ensure_ascii=False)
+        ngram_counts = PosNgramCounts.from_tags(tags, n)
+        results[n] = (to_json(ngram_counts.sorted_counts()), to_json(ngram_counts.sorted_frequencies()))
+
+    unigram_counts, unigram_normalized_frequencies = results[1]
+    bigram_counts, bigram_normalized_frequencies = results[2]
+    trigram_counts, trigram_normalized_frequencies = results[3]
     if show_analysis:
         display_ngrams_summary(unigram_counts, unigram_normalized_frequencies, bigram_counts,
                                bigram_normalized_frequencies, trigram_counts, trigram_normalized_frequencies)
@@ -86,19 +254,22 @@ def character_ngrams(text, n_values=(1, 2, 3), show_analysis=True):
     """
     Вычисляет символьные n-граммы для текста и возвращает результаты в виде строк JSON.
 
-    :param text: Входной текст.
+    :param text: Входной текст (строка или ParsedDocument).
     :param n_values: Размеры n-грамм, которые нужно вычислить (по умолчанию (1, 2, 3)).
     :param show_analysis: Флаг для отображения анализа (по умолчанию True).
 
     :return tuple: Строки JSON с абсолютными и нормализованными частотами униграммов, биграммов и триграммов.
+    :raises ValueError: Если в n_values есть размеры, отличные от 1, 2 и 3 (n-граммы других размеров
+        считает CharNgramCounts.from_text).
     """
+    check_ngram_sizes(n_values)
     if show_analysis:
         print(Fore.GREEN + Style.BRIGHT + "\n                      ЧАСТОТЫ БУКВЕННЫХ N-ГРАММОВ" + Fore.RESET)
         print(
             Fore.LIGHTRED_EX + Style.BRIGHT + "Внимание! N-граммы '<' и '>' используются для обозначания начала и конца \nслов соответственно.\n" + Fore.RESET)
         wait_for_enter_to_analyze()
     # Удаление всех знаков препинания и лишних символов, оставляя только буквы и пробелы
-    text = re.sub(r'[^а-яА-ЯёЁ\s]', '', text)
+    text = re.sub(r'[^а-яА-ЯёЁ\s]', '', as_document(text).text)
 
     text = text.lower()
 
@@ -109,52 +280,18 @@ def character_ngrams(text, n_values=(1, 2, 3), show_analysis=True):
     # Объединение всех слов в строку
     processed_text = ''.join(processed_words)
 
-    unigram_counts = Counter()
-    bigram_counts = Counter()
-    trigram_counts = Counter()
-    unigram_normalized_frequencies = {}
-    bigram_normalized_frequencies = {}
-    trigram_normalized_frequencies = {}
+    # Ключ n-грамма в JSON - строковое представление кортежа символов, например "('а', 'б')"
+    def to_json(counts):
+        return json.dumps({str(tuple(ngram)): value for ngram, value in counts.items()}, ensure_ascii=False)
 
-    total_letters = sum(1 for char in processed_text if char)
-
-    # Генерация и подсчет n-грамм
+    results = {n: (to_json({}), to_json({})) for n in STORED_NGRAM_SIZES}
     for n in n_values:
-        ngram_counts = Counter()
-        char_ngrams = list(ngrams(processed_text, n))
-        ngram_counts.update(char_ngrams)
-
-        normalized_frequencies = {}
-        for ngram in ngram_counts:
-            all_n_grams = total_letters - n + 1
-            normalized_frequencies[ngram] = round((ngram_counts[ngram] / all_n_grams) * 100, 3)
-
-        if n == 1:
-            unigram_counts = ngram_counts
-            unigram_normalized_frequencies = normalized_frequencies
-        elif n == 2:
-            bigram_counts = ngram_counts
-            bigram_normalized_frequencies = normalized_frequencies
-        elif n == 3:
-            trigram_counts = ngram_counts
-            trigram_normalized_frequencies = normalized_frequencies
-
-    # Преобразование ключей-кортежей в строки для JSON
-    def convert_keys_to_strings(counter):
-        return {str(k): v for k, v in counter.items()}
-
-    def sort_counter_by_value(counter):
-        return dict(sorted(counter.items(), key=lambda item: item[1], reverse=True))
-
-    unigram_counts = json.dumps(convert_keys_to_strings(sort_counter_by_value(unigram_counts)), ensure_ascii=False)
-    unigram_normalized_frequencies = json.dumps(convert_keys_to_strings(sort_counter_by_value(unigram_normalized_frequencies)),
-                       ensure_ascii=False)
-    bigram_counts = json.dumps(convert_keys_to_strings(sort_counter_by_value(bigram_counts)), ensure_ascii=False)
-    bigram_normalized_frequencies = json.dumps(convert_keys_to_strings(sort_counter_by_value(bigram_normalized_frequencies)),
-                       ensure_ascii=False)
-    trigram_counts = json.dumps(convert_keys_to_strings(sort_counter_by_value(trigram_counts)), ensure_ascii=False)
-    trigram_normalized_frequencies = json.dumps(convert_keys_to_strings(sort_counter_by_value(trigram_normalized_frequencies)),
-                       ensure_ascii=False)
+        ngram_counts = CharNgramCounts.from_text(processed_text, n)
+        results[n] = (to_json(ngram_counts.sorted_counts()), to_json(ngram_counts.sorted_frequencies()))
+
+    unigram_counts, unigram_normalized_frequencies = results[1]
+    bigram_counts, bigram_normalized_frequencies = results[2]
+    trigram_counts, trigram_normalized_frequencies = results[3]
     if show_analysis:
         display_ngrams_summary(unigram_counts, unigram_normalized_frequencies, bigram_counts,
                                bigram_normalized_frequencies, trigram_counts, trigram_normalized_frequencies)
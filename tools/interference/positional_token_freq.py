@@ -4,13 +4,12 @@ import re
 from collections import Counter, defaultdict
 
 from colorama import init, Fore, Style
-from nltk import word_tokenize
 from rich.console import Console
 from rich.table import Table
 
-from tools.core.custom_punkt_tokenizer import sent_tokenize_with_abbr
+from tools.core.lazy_imports import word_tokenize
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze, display_position_explanation
-from tools.core.text_preparation import TextPreProcessor
 
 init(autoreset=True)
 console = Console()
@@ -26,7 +25,7 @@ def calculate_position_frequencies(text, show_analysis=True):
     - penultimate: предпоследний токен
     - last: последний токен
 
-    :param text (str): Входной текст для анализа
+    :param text (str | ParsedDocument): Входной текст для анализа
     :param show_analysis (bool): Флаг для отображения анализа (по умолчанию True).
 
     :return: JSON-объекты с нормализованными частотами токенов в позициях ('first', 'second', 'antepenultimate', 'penultimate', 'last')
@@ -37,14 +36,13 @@ def calculate_position_frequencies(text, show_analysis=True):
         print(
             Fore.LIGHTGREEN_EX + Style.BRIGHT + "Учитываются предложения, длина которых больше 5 токенов." + Fore.RESET)
 
-    text_processor = TextPreProcessor()
-    sentences = sent_tokenize_with_abbr(text)
+    # Предложения, уже обработанные TextPreProcessor.process_text, берем из разобранного документа
+    sentences = as_document(text).processed_sentences
 
     position_counts = defaultdict(Counter)
     total_sentences = 0
 
     for sent in sentences:
-        sent = text_processor.process_text(sent)
         # Разделение слов и знаков препинания пробелами
         sent = re.sub(r'(["„”«»‘’.,!?;")(/\\])', r' \1 ', sent)
         sent = re.sub(r'[^а-яА-ЯёЁA-Za-z0-9\s.",)(!?;-]', '', sent)
@@ -2,25 +2,28 @@
 import json
 import re
 
-from nltk import word_tokenize
+from colorama import Fore, Style
 from rich.console import Console
 from rich.table import Table
-import pymorphy2
 
-from tools.core.custom_punkt_tokenizer import sent_tokenize_with_abbr
+from tools.core.context_store import ContextStore, is_encoded_contexts
+from tools.core.lazy_imports import word_tokenize
+from tools.core.parse_cache import parse_word
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
-from tools.core.text_preparation import TextPreProcessor
-
-morph = pymorphy2.MorphAnalyzer()
 
 console = Console()
 
+# Позиции токенов в предложении, для которых сохраняются контексты
+SENTENCE_POSITIONS = ('first', 'second', 'antepenultimate', 'penultimate', 'last')
+
 
-def get_pos(word):
+def get_pos(word, document=None):
     """
     Определяет часть речи для данного токена.
 
     :param word: str - Входной токен для определения части речи.
+    :param document: ParsedDocument - Документ, кэш разборов которого используется (необязательно).
 
     :return: str - Часть речи слова (например, 'NOUN', 'VERB', 'ADJ' и т.д.) или кастомные
      варианты (например, 'NUMBER', 'LATIN_WORD', 'FULL_STOP').
@@ -41,26 +44,28 @@ def get_pos(word):
         return 'SEMICOLON'
     if re.match(r'[:]', word):  # Проверка на знак препинания
         return 'COLON'
-    parsed = morph.parse(word)[0]
+    parsed = document.parse(word) if document is not None else parse_word(word)
     return parsed.tag.POS
 
 
-def extract_positions(text, show_analysis=True):
+def extract_positions(text, show_analysis=True, retention=None):
     """
     Извлекает позиции слов, их части речи на разных позициях предложении.
 
-    :param text: str - Входной текст для анализа.
+    :param text: str | ParsedDocument - Входной текст для анализа.
     :param show_analysis: Bool - Флаг для отображения анализа (по умолчанию True).
+    :param retention: ContextRetention - Политика хранения контекстов (по умолчанию - общая context_retention).
 
-    :return: str - JSON-объект с токенами и их частями речи на разных позициях для каждого предложения.
+    :return: bytes - Двоичная форма ContextStore с токенами и их частями речи на разных позициях для каждого
+     предложения (категория 'sentences', номер контекста - номер предложения).
     """
-    text_processor = TextPreProcessor()
-    sentences = sent_tokenize_with_abbr(text)
+    document = as_document(text)
+    # Предложения, уже обработанные TextPreProcessor.process_text, берем из разобранного документа
+    sentences = document.processed_sentences
 
-    token_positions_in_sent = []
+    token_positions_in_sent = ContextStore(len(SENTENCE_POSITIONS), retention)
 
     for i, sent in enumerate(sentences, start=1):
-        sent = text_processor.process_text(sent)
         sent = re.sub(r'([.,!?;])', r' \1 ', sent)
         sent = re.sub(r'[^а-яА-ЯёЁA-Za-z0-9\s.,!?;]', '', sent)
 
@@ -70,35 +75,45 @@ def extract_positions(text, show_analysis=True):
         if len(tokens) < 5:
             continue
 
-        positions = {
-            'first': tokens[0],
-            'second': tokens[1],
-            'antepenultimate': tokens[-3],
-            'penultimate': tokens[-2],
-            'last': tokens[-1]
-        }
+        positions = (tokens[0], tokens[1], tokens[-3], tokens[-2], tokens[-1])
 
-        # Получаем часть речи для каждого токена
-        positions_with_pos = {
-            position: (token, get_pos(token))
-            for position, token in positions.items()
-        }
+        # Получаем часть речи для каждого токена (если контексты не сохраняются, разбор не нужен)
+        labels = [get_pos(token, document) for token in positions] if token_positions_in_sent.enabled else ()
+        token_positions_in_sent.add('sentences', positions, labels, i)
 
-        token_positions_in_sent.append({'SENTENCE_NUMBER': i, 'positions': positions_with_pos})
-
-    positions_contexts = json.dumps(token_positions_in_sent, ensure_ascii=False)
+    positions_contexts = token_positions_in_sent.to_bytes()
     if show_analysis:
         print_positions(positions_contexts)
     return positions_contexts
 
 
+def load_positions(sentence_data):
+    """
+    Восстанавливает позиционные контексты предложений.
+
+    :param sentence_data: Двоичная форма ContextStore или JSON-строка (записи БД, сохраненные до появления
+        двоичной формы).
+    :return: Кортеж (список {'SENTENCE_NUMBER': номер, 'positions': {позиция: (токен, часть речи)}},
+        пояснение о неполных контекстах или None).
+    """
+    if not is_encoded_contexts(sentence_data):
+        return json.loads(sentence_data), None
+    store = ContextStore.from_bytes(sentence_data)
+    sentences = [{'SENTENCE_NUMBER': number, 'positions': dict(zip(SENTENCE_POSITIONS, zip(tokens, labels)))}
+                 for number, tokens, labels in store.rows('sentences')]
+    return sentences, store.retention_note()
+
+
 def print_positions(sentence_data):
     """
     Выводит позиционные контексты слов и их частей речи.
 
-    :param sentence_data: str - JSON-строка с данными о позициях слов, их частях речи.
+    :param sentence_data: bytes | str - Двоичная форма ContextStore (или JSON-строка) с данными о позициях слов,
+     их частях речи.
     """
-    sentence_data = json.loads(sentence_data)
+    sentence_data, retention_note = load_positions(sentence_data)
+    if retention_note:
+        print(Fore.LIGHTRED_EX + Style.BRIGHT + retention_note + Fore.RESET)
 
     table = Table()
 
@@ -116,7 +131,7 @@ def print_positions(sentence_data):
         tokens_row = [f"{sentence_number}"]
         pos_row = [""]  # Пустая ячейка для выравнивания под номером предложения
 
-        for position in ['first', 'second', 'antepenultimate', 'penultimate', 'last']:
+        for position in SENTENCE_POSITIONS:
             token, pos = positions[position]
             tokens_row.append(token)
             pos_row.append(pos)
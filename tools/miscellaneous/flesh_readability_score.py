@@ -2,11 +2,11 @@
 import re
 
 from colorama import Fore, Style
-from nltk.tokenize import word_tokenize
 from rich.console import Console
 from rich.table import Table
 
-from tools.core.custom_punkt_tokenizer import sent_tokenize_with_abbr
+from tools.core.lazy_imports import word_tokenize
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
 from tools.simplification.mean_word_length import calculate_syllable_ratio
 
@@ -17,11 +17,11 @@ def mean_sentence_length_in_tokens(text):
     """
     Рассчитывает среднюю длину предложения в токенах.
 
-    :param text: str - Входной текст для анализа.
+    :param text: str | ParsedDocument - Входной текст для анализа.
     :return: float - Средняя длина предложения в токенах, округленная до трех знаков после запятой.
     """
     sentence_lengths = []
-    sentences = sent_tokenize_with_abbr(text)
+    sentences = as_document(text).sentences
 
     for sentence in sentences:
         sentence = re.sub(r'[^а-яА-ЯёЁ\s]', '', sentence)
@@ -36,16 +36,17 @@ def flesh_readability_index_for_rus(text, show_analysis=True):
     """
     Рассчитывает индекс удобочитаемости Флеша для РЯ.
 
-    :param text: str - Входной текст для анализа.
+    :param text: str | ParsedDocument - Входной текст для анализа.
     :param show_analysis: bool - Флаг для отображения анализа (по умолчанию True).
 
     :return: float - Индекс удобочитаемости текста, округленный до трех знаков после запятой.
     """
+    document = as_document(text)
     # Получаем среднюю длину предложения (aver_sent_len)
-    aver_sent_len = mean_sentence_length_in_tokens(text)
+    aver_sent_len = mean_sentence_length_in_tokens(document)
 
     # Получаем среднее количество слогов в слове (ASW)
-    aver_syll_per_word, _ = calculate_syllable_ratio(text, False)
+    aver_syll_per_word, _ = calculate_syllable_ratio(document, False)
 
     # Рассчитываем индекс удобочитаемости по формуле Оборневой
     flesh_idx = round(206.836 - 1.3 * aver_sent_len - 60.1 * aver_syll_per_word, 3)
@@ -4,45 +4,32 @@ import re
 
 from collections import defaultdict
 
-import pymorphy2
 from colorama import Fore, Style
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
 from rich.console import Console
 from rich.table import Table
 
-from tools.core.data import pronouns, prepositions, particles, conjunctions
+from tools.core.lazy_imports import word_tokenize
+from tools.core.lexicon import lexicon
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
 
 console = Console()
 
-# Загрузка стоп-слов
-nltk_stopwords_ru = stopwords.words("russian")
-
-# 1. Объединение всех списков в один
-all_stopwords = set(conjunctions.conjunctions_list + prepositions.prepositions_list
-                    + particles.particles_list + pronouns.pronouns_list + nltk_stopwords_ru)
-
-# 2. Сортировка по длине по убыванию
-all_stopwords_sorted = sorted(list(all_stopwords), key=len, reverse=True)
-
-morph = pymorphy2.MorphAnalyzer()
-
-
 def compute_function_word_frequencies(text, show_analysis=True):
     """
     Рассчитывает нормализованные частоты функциональных слов в тексте и их абсолютные частоты.
 
-    :param text: str - Входной текст для анализа.
+    :param text: str | ParsedDocument - Входной текст для анализа.
     :param show_analysis: Bool - Флаг для отображения анализа (по умолчанию True).
 
     :return: tuple - Кортеж из двух элементов:
         - str: JSON-строка с нормализованными частотами функциональных слов.
         - str: JSON-строка с абсолютными частотами функциональных слов.
     """
-    text = re.sub(r'[^а-яА-ЯËёa-zA-Z\-]', ' ', text)
+    document = as_document(text)
+    text = re.sub(r'[^а-яА-ЯËёa-zA-Z\-]', ' ', document.text)
     # Замена многотокенных стоп-слов на уникальные маркеры
-    for stopword in all_stopwords_sorted:
+    for stopword in lexicon.all_stopwords_sorted:
         stopword_tokens = stopword.split()
         if len(stopword_tokens) > 1:  # Если стоп-слово состоит из нескольких токенов
             pattern = r'\b' + r'\s+'.join(map(re.escape, stopword_tokens)) + r'\b'
@@ -56,9 +43,9 @@ def compute_function_word_frequencies(text, show_analysis=True):
     for token in tokens:
         # Учитываем, что составные стоп-слова уже заменены на уникальные маркеры
         token = re.sub(r'_', ' ', token)
-        token = morph.parse(token)[0]
+        token = document.parse(token)
         lemmatized_token = token.normal_form
-        if lemmatized_token in all_stopwords_sorted:
+        if lemmatized_token in lexicon.all_stopwords:
             function_word_counts[lemmatized_token] += 1
 
     normalized_frequencies = {word: round((count / total_tokens) * 100, 3) for word, count in
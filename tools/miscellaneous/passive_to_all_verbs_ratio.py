@@ -2,19 +2,15 @@
 import re
 
 from colorama import Fore, Style
-from nltk import word_tokenize
-from pymorphy2 import MorphAnalyzer
 from rich.console import Console
 from rich.table import Table
 
+from tools.core.lazy_imports import word_tokenize
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
-from tools.core.text_preparation import TextPreProcessor
 
 console = Console()
 
-# Инициализация анализатора
-morph = MorphAnalyzer()
-
 patterns = r"[^А-Яа-яёЁ\-]+"  # Оставляем только кириллицу и дефис
 
 
@@ -22,7 +18,7 @@ def calculate_passive_verbs_ratio(text, show_analysis=True):
     """
     Подсчитывает соотношение глаголов в пассивном залоге ко всем глаголам в тексте.
 
-    :param text: str - Текст для анализа.
+    :param text: str | ParsedDocument - Текст для анализа.
     :param show_analysis: Bool - Флаг для отображения анализа (по умолчанию True).
 
     :return: tuple - Кортеж из пяти элементов:
@@ -37,13 +33,12 @@ def calculate_passive_verbs_ratio(text, show_analysis=True):
     all_verbs_count = 0
     all_verbs = []
 
-    text_processor = TextPreProcessor()
-    text = text_processor.process_text(text)
-    text = re.sub(patterns, ' ', text)
+    document = as_document(text)
+    text = re.sub(patterns, ' ', document.processed_text)
     tokens = word_tokenize(text, language="russian")
 
     for token in tokens:
-        token_analysis = morph.parse(token)[0]
+        token_analysis = document.parse(token)
         if (token_analysis.tag.POS in {'VERB', 'INFN', 'PRTF', 'PRTS', 'GRND'}
                 and token_analysis.normal_form not in 'быть'):  # Если это глагол/ его форма
             all_verbs_count += 1
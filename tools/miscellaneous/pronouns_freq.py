@@ -6,16 +6,9 @@ from colorama import Fore, Style
 from rich.console import Console
 from rich.table import Table
 
-from tools.core.data.pronouns import (pers_possessive_pronouns_analysis_list,
-                                      reflexive_pronoun_list,
-                                      demonstrative_pronouns_list,
-                                      defining_pronouns_list,
-                                      relative_pronouns_list,
-                                      indefinite_pronouns_list,
-                                      negative_pronouns_list
-                                      )
+from tools.core.lexicon import lexicon
 from tools.core.utils import wait_for_enter_to_analyze
-from tools.core.lemmatizators import lemmatize_words
+from tools.core.parsed_document import as_document
 
 console = Console()
 
@@ -24,12 +17,13 @@ def compute_pronoun_frequencies(text, pronouns_list, show_analysis=True):
     """
     Вычисляет абсолютные и нормализованные частоты местоимений в тексте.
 
-    :param text: Входной текст на русском языке.
+    :param text: Входной текст на русском языке (строка или ParsedDocument).
     :param show_analysis: Определяет, выводить ли анализ в терминал.
 
     :return: JSON-строка с нормализованными частотами местоимений и JSON-строка сабсолютными частотами.
     """
-    tokens_info = lemmatize_words(text)
+    # Лемматизация выполняется один раз на документ и переиспользуется для всех семи групп местоимений
+    tokens_info = as_document(text).words
     token_counts = Counter()
     pronoun_frequencies = {}
 
@@ -53,21 +47,9 @@ def compute_pronoun_frequencies(text, pronouns_list, show_analysis=True):
 
     pronoun_freqs_json = json.dumps(rounded_pronoun_frequencies, ensure_ascii=False)
     pronoun_counts_json = json.dumps(dict(sorted_pronoun_counts), ensure_ascii=False)
-    pronouns_type = ''
-    if pronouns_list == pers_possessive_pronouns_analysis_list:
-        pronouns_type = 'pers_possessive'
-    elif pronouns_list == reflexive_pronoun_list:
-        pronouns_type = 'reflexive_pronoun'
-    elif pronouns_list == demonstrative_pronouns_list:
-        pronouns_type = 'demonstrative_pronouns'
-    elif pronouns_list == defining_pronouns_list:
-        pronouns_type = 'defining_pronouns'
-    elif pronouns_list == relative_pronouns_list:
-        pronouns_type = 'relative_pronouns'
-    elif pronouns_list == indefinite_pronouns_list:
-        pronouns_type = 'indefinite_pronouns'
-    elif pronouns_list == negative_pronouns_list:
-        pronouns_type = 'negative_pronouns'
+    # Группа местоимений определяется по переданному списку
+    pronouns_type = next(
+        (group for group, group_list in lexicon.pronoun_lists.items() if group_list == pronouns_list), '')
 
     if show_analysis:
         print_pronoun_frequencies(pronouns_type, pronoun_freqs_json, pronoun_counts_json)
@@ -141,4 +123,4 @@ if __name__ == "__main__":
     оставаясь верной своей мечте — сделать мир лучше. Она знала, что впереди ещё много вызовов, но с каждым добрым 
     делом, с каждой спасённой жизнью, с каждой улыбкой на лице благодарного человека мир становился чуть светлее и 
     добрее."""
-    frequencies_json, a = compute_pronoun_frequencies(text, demonstrative_pronouns_list)
+    frequencies_json, a = compute_pronoun_frequencies(text, lexicon.demonstrative_pronouns_list)
@@ -3,10 +3,10 @@ import json
 from collections import Counter
 
 from colorama import Fore, Style, init
-from nltk.tokenize import word_tokenize
 from rich.console import Console
 from rich.table import Table
 
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
 
 init(autoreset=True)
@@ -19,14 +19,14 @@ def analyze_punctuation(text, show_analysis=True):
     """
     Анализирует использование знаков препинания в заданном фрагменте текста.
 
-    :param text: Текстовый фрагмент для анализа.
+    :param text: Текстовый фрагмент для анализа (строка или ParsedDocument).
     :param show_analysis: Определяет, выводить ли анализ в терминал.
     :return: Два словаря в формате JSON:
         - normalized_frequency: частоты знаков препинания относительно общего числа токенов.
         - punct_to_all_punct_frequency: частоты знаков препинания относительно всех знаков препинания.
     """
     # Токенизация текста для подсчета слов и знаков препинания
-    tokens = word_tokenize(text, language="russian")
+    tokens = as_document(text).tokens
     total_tokens = len(tokens)
     punctuation_counts = Counter(token for token in tokens if token in punctuation_marks)
     total_punctuation_marks = sum(punctuation_counts.values())
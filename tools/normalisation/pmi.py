@@ -1,21 +1,34 @@
 # -*- coding: utf-8 -*- # Языковая кодировка UTF-8
+import csv
 import os
 import glob
-import math
 import re
 from collections import Counter
 
 from colorama import Style, Fore
-from nltk import word_tokenize
 from rich.table import Table
 from rich.console import Console
 
 from tools.core.custom_punkt_tokenizer import sent_tokenize_with_abbr
-from tools.core.lemmatizators import lemmatize_words, lemmatize_words_into_sents_for_pmi
+from tools.core.lazy_imports import LazyModule, word_tokenize
+from tools.core.lemmatizators import lemmatize_words
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
 
 console = Console()
 
+# numpy нужен только для расчета PMI и загружается при первом обращении
+np = LazyModule('numpy')
+
+# Варианты меры ассоциации: PMI, нормализованный PMI и положительный PMI (max(PMI, 0))
+PMI_MEASURES = ('pmi', 'npmi', 'ppmi')
+
+# Количество биграммов на одной странице таблицы в консоли
+PMI_PAGE_SIZE = 50
+
+# Количество биграммов, которые записываются в файл за один шаг потокового экспорта
+PMI_EXPORT_CHUNK_SIZE = 10000
+
 
 def process_text_for_pmi_wordforms(text):
     """
@@ -60,66 +73,244 @@ def read_texts_from_directory(directory):
     return corpus
 
 
-def calculate_pmi(corpus_directory=None, corpus_set=None):
+def count_pmi_ngrams(text):
     """
-    Расчет PMI для корпуса текстов из указанной директории.
+    Лемматизирует текст и подсчитывает леммы и биграммы лемм внутри предложений.
 
-    :param corpus_directory: Путь к директории, содержащей текстовые файлы, если используется директория.
-    :param corpus_set: Множество строк, представляющих собой тексты, если используется набор текстов.
-    :return: Словарь биграмм и их значений PMI, отсортированный по убыванию PMI, число биграммов > 0,
+    Счетчики сохраняются для каждого текста при анализе, поэтому PMI корпуса вычисляется по их суммам
+    без повторной лемматизации текстов.
+
+    :param text: Текст для обработки (строка или ParsedDocument).
+    :return: Кортеж (Counter лемм, Counter биграмм (лемма1, лемма2)).
     """
-    if corpus_directory:
-        corpus = read_texts_from_directory(corpus_directory)
-    else:
-        corpus = corpus_set
-    all_bigrams = Counter()
     word_counts = Counter()
-    total_bigrams_above_zero = 0
-    total_bigrams_count = 0
+    bigram_counts = Counter()
+    # Предложения и разборы берутся из общего разобранного документа
+    for sentence in as_document(text).pmi_sentences:
+        word_counts.update(sentence)
+        # Создание биграмм внутри предложения
+        bigram_counts.update(zip(sentence[:-1], sentence[1:]))
+    return word_counts, bigram_counts
 
-    # Обработка каждого текста в корпусе
-    for text in corpus:
-        # Лемматизация текста и получение полной информации по каждому слову
-        lemmatized_sentences = lemmatize_words_into_sents_for_pmi(text)
 
-        for sentence in lemmatized_sentences:
-            word_counts.update(sentence)
+def _split_bigram(bigram):
+    """Биграмм в виде пары лемм: ключи хранимых счетчиков записаны строкой "лемма1 лемма2"."""
+    return bigram.split(' ') if isinstance(bigram, str) else bigram
 
-            # Создание биграмм внутри предложения
-            bigrams = zip(sentence[:-1], sentence[1:])
-            all_bigrams.update(bigrams)  # Обновляем частоты биграмм
 
-    total_word_number = sum(word_counts.values())
-    total_bigram_number = sum(all_bigrams.values())
+class PMITable:
+    """
+    Значения PMI всех биграммов корпуса, вычисляемые векторно (NumPy) по количествам лемм и биграммов.
 
-    # Вычисляем вероятности для слов и биграмм
-    p_word = {word: count / total_word_number for word, count in word_counts.items()}
-    p_bigram = {bigram: count / total_bigram_number for bigram, count in all_bigrams.items()}
+    Леммы кодируются целыми id, а биграммы хранятся в упакованных массивах (id первой леммы, id второй
+    леммы, количество), поэтому для вычисления не создаются словари вероятностей и кортежи на каждый
+    биграмм. Кортежи лемм создаются только для отбираемых результатов (top, above).
 
-    pmi_values = {}
-    for bigram, count in all_bigrams.items():
-        w1, w2 = bigram
-        pmi = math.log2(p_bigram[bigram] / (p_word[w1] * p_word[w2]))
-        if pmi > 0:
-            pmi_values[bigram] = pmi
-            total_bigrams_above_zero += 1  # Увеличиваем счетчик биграммов с положительным PMI
+    Меры: 'pmi' - log2(p(w1, w2) / (p(w1) * p(w2))); 'npmi' - PMI / -log2(p(w1, w2)) (нормализованный PMI,
+    не зависящий от частоты биграмма); 'ppmi' - max(PMI, 0).
 
-    normalized_bigrams_above_zero = total_bigrams_above_zero / len(all_bigrams) if len(all_bigrams) > 0 else 0
+    Для 'pmi' и 'ppmi' p(w) оценивается по количествам лемм, а p(w1, w2) - по количествам биграммов.
+    Биграммов меньше, чем лемм (биграммы не пересекают границы предложений), поэтому для 'npmi'
+    p(w1) и p(w2) оцениваются по маргинальным количествам биграммов (лемма на первой и на второй позиции)
+    с тем же знаменателем: тогда p(w1, w2) <= min(p(w1), p(w2)) и NPMI всегда лежит в [-1, 1].
+    """
 
-    sorted_pmi_values = sorted(pmi_values.items(), key=lambda x: x[1], reverse=True)
-    return dict(sorted_pmi_values), total_bigrams_above_zero, normalized_bigrams_above_zero
+    def __init__(self, word_counts, bigram_counts):
+        """
+        :param word_counts: Словарь {лемма: количество}.
+        :param bigram_counts: Словарь {(лемма1, лемма2) или "лемма1 лемма2": количество}.
+        """
+        self.lemmas = list(word_counts)
+        lemma_ids = {lemma: index for index, lemma in enumerate(self.lemmas)}
+        self.word_counts = np.fromiter(word_counts.values(), dtype=np.int64, count=len(self.lemmas))
+        pairs = np.fromiter((lemma_ids[lemma] for bigram in bigram_counts for lemma in _split_bigram(bigram)),
+                            dtype=np.int32, count=2 * len(bigram_counts))
+        self.left = pairs[0::2]
+        self.right = pairs[1::2]
+        self.counts = np.fromiter(bigram_counts.values(), dtype=np.int64, count=len(bigram_counts))
+        self._values = {}
+
+    def __len__(self):
+        return len(self.counts)
+
+    def values(self, measure='pmi'):
+        """
+        Возвращает массив значений меры для всех биграммов (в порядке их первого появления).
+
+        :param measure: Мера из PMI_MEASURES.
+        :return: numpy.ndarray значений.
+        """
+        if measure not in PMI_MEASURES:
+            raise ValueError(f"Неизвестная мера: {measure}")
+        if not self._values:
+            p_word = self.word_counts / self.word_counts.sum()
+            p_bigram = self.counts / self.counts.sum() if len(self) else np.empty(0)
+            pmi = np.log2(p_bigram / (p_word[self.left] * p_word[self.right]))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # Маргинальные вероятности лемм на первой и второй позиции биграмма
+                total = self.counts.sum()
+                p_first = np.bincount(self.left, weights=self.counts, minlength=len(self.lemmas)) / total
+                p_second = np.bincount(self.right, weights=self.counts, minlength=len(self.lemmas)) / total
+                bigram_pmi = np.log2(p_bigram / (p_first[self.left] * p_second[self.right]))
+                # Если в корпусе единственный биграмм (p = 1), его NPMI равен 1
+                # Ограничение только убирает погрешность округления на границах интервала
+                npmi = np.clip(np.where(p_bigram < 1, bigram_pmi / -np.log2(p_bigram), 1.0), -1.0, 1.0)
+            self._values = {'pmi': pmi, 'npmi': npmi, 'ppmi': np.maximum(pmi, 0)}
+        return self._values[measure]
+
+    def bigram(self, index):
+        """Возвращает биграмм (лемма1, лемма2) по его индексу в массивах."""
+        return self.lemmas[self.left[index]], self.lemmas[self.right[index]]
+
+    def _pairs(self, indexes, values):
+        return [(self.bigram(index), value) for index, value in zip(indexes.tolist(), values[indexes].tolist())]
+
+    def count_above(self, threshold=0.0, measure='pmi'):
+        """Возвращает количество биграммов, значение меры которых больше threshold."""
+        return int(np.count_nonzero(self.values(measure) > threshold))
+
+    @staticmethod
+    def _top_indexes(indexes, values, k):
+        """
+        Выбирает из indexes k биграммов с наибольшими значениями частичной сортировкой (argpartition).
+
+        k-е по величине значение находится без полной сортировки; биграммы, равные ему, берутся все,
+        чтобы при равных значениях порядок совпадал с полной сортировкой (порядок первого появления).
+
+        :return: Массив индексов по убыванию значения.
+        """
+        subset = values[indexes]
+        if k < len(indexes):
+            kth_value = -np.partition(-subset, k - 1)[k - 1]
+            keep = subset >= kth_value
+            indexes, subset = indexes[keep], subset[keep]
+        return indexes[np.lexsort((indexes, -subset))[:k]]
+
+    def top(self, k, measure='pmi'):
+        """
+        Возвращает k биграммов с наибольшими значениями меры (частичная сортировка вместо полной).
+
+        :return: Список кортежей ((лемма1, лемма2), значение) по убыванию значения.
+        """
+        values = self.values(measure)
+        if k <= 0:
+            return []
+        return self._pairs(self._top_indexes(np.arange(len(values)), values, k), values)
+
+    def pages(self, page_size=PMI_PAGE_SIZE, threshold=0.0, measure='pmi'):
+        """
+        Лениво выдает биграммы со значением меры больше threshold страницами по убыванию значения.
+
+        Каждая страница выбирается частичной сортировкой из оставшихся биграммов, поэтому для просмотра
+        первых страниц не сортируется весь словарь биграммов.
+
+        :return: Генератор списков кортежей ((лемма1, лемма2), значение).
+        """
+        values = self.values(measure)
+        remaining = np.flatnonzero(values > threshold)
+        while len(remaining):
+            selected = self._top_indexes(remaining, values, page_size)
+            yield self._pairs(selected, values)
+            keep = np.ones(len(remaining), dtype=bool)
+            keep[np.searchsorted(remaining, np.sort(selected))] = False
+            remaining = remaining[keep]
+
+    def iter_sorted(self, threshold=0.0, measure='pmi', chunk_size=PMI_EXPORT_CHUNK_SIZE):
+        """
+        Выдает все биграммы со значением меры больше threshold частями по убыванию значения
+        (при равных значениях - в порядке первого появления).
+
+        Сортируются только массивы индексов; кортежи лемм создаются для одной части за раз.
+
+        :return: Генератор списков кортежей ((лемма1, лемма2), значение).
+        """
+        values = self.values(measure)
+        indexes = np.flatnonzero(values > threshold)
+        indexes = indexes[np.argsort(-values[indexes], kind='stable')]
+        for start in range(0, len(indexes), chunk_size):
+            yield self._pairs(indexes[start:start + chunk_size], values)
+
+    def above(self, threshold=0.0, measure='pmi'):
+        """
+        Возвращает биграммы со значением меры больше threshold по убыванию значения
+        (при равных значениях - в порядке первого появления).
+
+        :return: Список кортежей ((лемма1, лемма2), значение).
+        """
+        return [pair for chunk in self.iter_sorted(threshold, measure) for pair in chunk]
+
+    def as_dict(self, threshold=0.0, measure='pmi'):
+        """Словарь {(лемма1, лемма2): значение} биграммов со значением меры больше threshold по убыванию."""
+        return dict(self.above(threshold, measure))
+
+
+def export_pmi_table(pmi_table, path, threshold=0.0, measure='pmi', chunk_size=PMI_EXPORT_CHUNK_SIZE):
+    """
+    Потоково записывает биграммы со значением меры больше threshold в файл CSV или Parquet
+    (по расширению .parquet; для него нужен пакет pyarrow). В памяти одновременно находится
+    не более chunk_size строк.
+
+    :param pmi_table: PMITable.
+    :param path: Путь к файлу.
+    :param threshold: Минимальное значение меры (не включительно).
+    :param measure: Мера из PMI_MEASURES.
+    :param chunk_size: Количество строк, записываемых за один шаг.
+    :return: Количество записанных биграммов.
+    """
+    written = 0
+    chunks = pmi_table.iter_sorted(threshold, measure, chunk_size)
+    if path.lower().endswith('.parquet'):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Для экспорта в Parquet установите пакет pyarrow (pip install pyarrow).") from None
+        schema = pa.schema([('lemma1', pa.string()), ('lemma2', pa.string()), (measure, pa.float64())])
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in chunks:
+                writer.write_table(pa.table({
+                    'lemma1': [bigram[0] for bigram, _ in chunk],
+                    'lemma2': [bigram[1] for bigram, _ in chunk],
+                    measure: [value for _, value in chunk],
+                }, schema=schema))
+                written += len(chunk)
+    else:
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['lemma1', 'lemma2', measure])
+            for chunk in chunks:
+                writer.writerows((bigram[0], bigram[1], value) for bigram, value in chunk)
+                written += len(chunk)
+    return written
 
 
-def display_pmi_table(pmi_values):
+def calculate_pmi(corpus_directory=None, corpus_set=None):
     """
-    Выводит таблицу биграммов с PMI выше заданного минимального значения.
+    Расчет PMI для корпуса текстов из указанной директории.
 
-    :param pmi_values: Словарь биграмм и их значений PMI.
+    :param corpus_directory: Путь к директории, содержащей текстовые файлы, если используется директория.
+    :param corpus_set: Множество строк, представляющих собой тексты, если используется набор текстов.
+    :return: Словарь биграмм и их значений PMI, отсортированный по убыванию PMI, число биграммов > 0,
     """
+    table = calculate_pmi_table(corpus_directory, corpus_set)
+    total_bigrams_above_zero = table.count_above(0)
+    normalized_bigrams_above_zero = total_bigrams_above_zero / len(table) if len(table) > 0 else 0
+    return table.as_dict(), total_bigrams_above_zero, normalized_bigrams_above_zero
+
+
+def display_pmi_table(pmi_table, measure='pmi'):
+    """
+    Выводит таблицу биграммов с PMI выше заданного минимального значения постранично
+    (по PMI_PAGE_SIZE биграммов) и при необходимости экспортирует их в файл.
+
+    :param pmi_table: PMITable с биграммами корпуса.
+    :param measure: Мера из PMI_MEASURES.
+    """
+    title = measure.upper()
     while True:
         try:
             min_pmi_input = input(
-                Fore.LIGHTGREEN_EX + Style.BRIGHT + f"Введите минимальное значение интересующего Вас PMI или просто нажмите 'Enter', "
+                Fore.LIGHTGREEN_EX + Style.BRIGHT + f"Введите минимальное значение интересующего Вас {title} или просто нажмите 'Enter', "
                                                     f"\nчтобы продолжить (по умолчанию значение=0): \n").strip()
 
             if not min_pmi_input:
@@ -131,29 +322,72 @@ def display_pmi_table(pmi_values):
         except ValueError:
             print(Fore.LIGHTRED_EX + Style.BRIGHT + "\nОшибка! Введите числовое значение.")
 
+    found = pmi_table.count_above(min_pmi, measure)
     print(
-        Fore.GREEN + Style.BRIGHT + f"\n             БИГРАММЫ И ИХ ЗНАЧЕНИЯ PMI" + Fore.RESET)
-    table = Table()
-    table.add_column("№", justify="center")
-    table.add_column("Биграмма", justify="center")
-    table.add_column("PMI", justify="center")
+        Fore.GREEN + Style.BRIGHT + f"\n             БИГРАММЫ И ИХ ЗНАЧЕНИЯ {title}" + Fore.RESET)
+
+    # Страницы выбираются лениво: следующая вычисляется, только если пользователь хочет ее увидеть
+    shown = 0
+    for page in pmi_table.pages(PMI_PAGE_SIZE, min_pmi, measure):
+        table = Table()
+        table.add_column("№", justify="center")
+        table.add_column("Биграмма", justify="center")
+        table.add_column(title, justify="center")
+        for index, (bigram, pmi) in enumerate(page, start=shown + 1):
+            table.add_row(str(index), f"{bigram[0]} {bigram[1]}", f"{pmi:.4f}")
+        console.print(table)
+        shown += len(page)
+        if shown >= found:
+            break
+        next_page = input(
+            Fore.LIGHTGREEN_EX + Style.BRIGHT + f"Показано {shown} из {found}. Нажмите 'Enter', чтобы показать следующие "
+                                                f"{PMI_PAGE_SIZE}, или 'q', чтобы закончить вывод: " + Fore.RESET).strip()
+        if next_page.lower() == 'q':
+            break
+
+    print(Fore.GREEN + Style.BRIGHT + f"Найдено {found} биграммов с {title} > {min_pmi}.\n")
+
+    if found:
+        path = input(
+            Fore.LIGHTGREEN_EX + Style.BRIGHT + "Чтобы сохранить все найденные биграммы, введите путь к файлу .csv или "
+                                                ".parquet, или просто нажмите 'Enter', чтобы продолжить: " + Fore.RESET).strip()
+        if path:
+            try:
+                written = export_pmi_table(pmi_table, path, min_pmi, measure)
+                print(Fore.GREEN + Style.BRIGHT + f"Сохранено {written} биграммов в файл {path}.\n")
+            except (ImportError, OSError) as error:
+                print(Fore.LIGHTRED_EX + Style.BRIGHT + f"Ошибка при сохранении файла: {error}\n")
+
+
+def calculate_pmi_table(corpus_directory=None, corpus_set=None):
+    """
+    Подсчитывает леммы и биграммы текстов и возвращает PMITable корпуса (без построения словаря PMI).
 
-    # Фильтруем и сортируем биграммы по PMI, выводим только те, что больше min_pmi
-    filtered_bigrams = {bigram: pmi for bigram, pmi in pmi_values.items() if pmi > min_pmi}
-    sorted_bigrams = sorted(filtered_bigrams.items(), key=lambda x: x[1], reverse=True)
+    :param corpus_directory: Путь к директории, содержащей текстовые файлы, если используется директория.
+    :param corpus_set: Множество строк, представляющих собой тексты, если используется набор текстов.
+    :return: PMITable.
+    """
+    if corpus_directory:
+        corpus = read_texts_from_directory(corpus_directory)
+    else:
+        corpus = corpus_set
+    all_bigrams = Counter()
+    word_counts = Counter()
 
-    for index, (bigram, pmi) in enumerate(sorted_bigrams, start=1):
-        table.add_row(str(index), f"{bigram[0]} {bigram[1]}", f"{pmi:.4f}")
+    # Обработка каждого текста в корпусе
+    for text in corpus:
+        text_word_counts, text_bigrams = count_pmi_ngrams(text)
+        word_counts.update(text_word_counts)
+        all_bigrams.update(text_bigrams)  # Обновляем частоты биграмм
 
-    console.print(table)
+    return PMITable(word_counts, all_bigrams)
 
-    print(Fore.GREEN + Style.BRIGHT + f"Найдено {len(filtered_bigrams)} биграммов с PMI > {min_pmi}.\n")
 
 if __name__ == "__main__":
 
     # Пример того, как передавать директорию с Вашими текстами в метод calculate_pmi. Раскомментируйте код ниже.
     # directory = '../your_directory'  # (должна быть в головной директории)
-    # example_1 = calculate_pmi(corpus_directory=directory)
+    # example_1 = calculate_pmi_table(corpus_directory=directory)
     # display_pmi_table(example_1)
 
 
@@ -190,6 +424,6 @@ if __name__ == "__main__":
     # Добавляем тексты в set
     texts_set.update([text_1, text_2])
 
-    example_2, count_above_zero, normalized_bigrams_above_zero = calculate_pmi(corpus_set=texts_set)
+    example_2 = calculate_pmi_table(corpus_set=texts_set)
     display_pmi_table(example_2)
-    print(normalized_bigrams_above_zero)
\ No newline at end of file
+    print(example_2.count_above(0) / len(example_2))
\ No newline at end of file
@@ -9,7 +9,7 @@ from rich.table import Table
 from tools.core.utils import wait_for_enter_to_analyze
 from tools.core.lemmatizators import lemmatize_words_without_stopwords
 from tools.core.stop_words_extraction_removal import count_custom_stopwords
-from tools.core.text_preparation import TextPreProcessor
+from tools.core.parsed_document import as_document
 
 console = Console()
 patterns = r"[^А-Яа-яёЁa-zA-Z\-]+"
@@ -19,7 +19,7 @@ def calculate_repetition(text, show_analysis=True):
     """
     Рассчитывает повторяемость знаменательных слов в тексте и предоставляет информацию о количестве повторяющихся слов.
 
-    :param text: str, Текст для анализа.
+    :param text: str | ParsedDocument, Текст для анализа.
     :param show_analysis: bool, Если True, промежуточные результаты и таблицы будут отображены. По умолчанию True.
     :return: tuple (float, str, int, int)
         - repetition: float, Процент повторяемости содержательных слов в тексте.
@@ -33,8 +33,7 @@ def calculate_repetition(text, show_analysis=True):
             Fore.LIGHTRED_EX + Style.BRIGHT + "Внимание! В зависимости от размера текста подсчет повторяемости может занять какое-то время. \nПожалуйста, будьте готовы подождать.\n" + Fore.RESET)
 
         wait_for_enter_to_analyze()
-    text_processor = TextPreProcessor()
-    text = text_processor.fix_spacing(text)
+    text = as_document(text).spacing_fixed_text
     lemmatized_tokens = lemmatize_words_without_stopwords(text.lower(), patterns)
     content_word_counts = {}
     stopwords_count, found_stopwords_dict, unique_stopwords = count_custom_stopwords(text)
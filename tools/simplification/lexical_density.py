@@ -7,15 +7,13 @@ from rich.table import Table
 
 from tools.core.utils import wait_for_enter_to_analyze
 from tools.core.lemmatizators import lemmatize_words
-from tools.core.stop_words_extraction_removal import all_stopwords_sorted
-from tools.core.text_preparation import TextPreProcessor
+from tools.core.parsed_document import as_document
+from tools.core.lexicon import lexicon
 
 console = Console()
 
 # Предкомпилируем регулярные выражения
 compiled_patterns = re.compile(r"[^А-Яа-яёЁa-zA-Z0-9\-]+")
-compiled_stopwords = [re.compile(r'\b' + re.escape(stopword) + r'\b', re.IGNORECASE) for stopword in
-                      all_stopwords_sorted]
 
 def remove_stopwords(text, stopwords):
     """Удаляем стоп-слова из текста и подсчитываем количество удаленных слов."""
@@ -34,20 +32,19 @@ def calculate_lexical_density(text, show_analysis=True):
     существительных, прилагательных и наречий) к общему количеству
     слов в тексте.
 
-    :param text (str): Входной текст для анализа.
+    :param text (str | ParsedDocument): Входной текст для анализа.
     :param show_analysis: Boolean.
     :return float: лексическая плотность текста, выраженная в процентах.
     """
 
-    # Предобработка текста: замена аббревиатур и исправление пробелов
-    text_processor = TextPreProcessor()
-    text = text_processor.process_text(text)
+    # Предобработка текста: замена аббревиатур и исправление пробелов (выполняется один раз на документ)
+    text = as_document(text).processed_text
 
     # Используем предкомпилированное регулярное выражение
     text = compiled_patterns.sub(' ', text)
     all_words = len(re.findall(r'\b\w+\b', text))
 
-    text_without_stopwords, stopwords_count = remove_stopwords(text, compiled_stopwords)
+    text_without_stopwords, stopwords_count = remove_stopwords(text, lexicon.stopword_patterns)
     words = lemmatize_words(text_without_stopwords)
     content_words = [token.normal_form for token in words if
                      token.tag.POS in {'NOUN', 'VERB', 'INFN', 'PRTF', 'PRTS', 'GRND', 'PRED', 'ADJF', 'ADJS', 'COMP',
@@ -1,13 +1,12 @@
 # -*- coding: utf-8 -*- # Языковая кодировка UTF-8
 import math
 
-import nltk
 from colorama import Fore, Style
 from rich.console import Console
 from rich.table import Table
 
-from tools.core.lemmatizators import lemmatize_words
-from tools.core.text_preparation import TextPreProcessor
+from tools.core.lazy_imports import nltk
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
 
 console = Console()
@@ -22,7 +21,7 @@ def lexical_variety(text, show_analysis=True):
     3. **Modified TTR**: Модифицированное соотношение типов к токенам, которое учитывает уникальные типы, встречающиеся
     только один раз в тексте.
 
-    :param text : str
+    :param text : str | ParsedDocument
         Текст, для которого будет рассчитана лексическая вариативность.
     :return tuple(float, float, float)
         Кортеж из трех значений:
@@ -31,11 +30,8 @@ def lexical_variety(text, show_analysis=True):
         - Modified TTR (округленное до 3 знаков после запятой)
     """
 
-    # Предобработка текста: замена аббревиатур и исправление пробелов
-    text_processor = TextPreProcessor()
-    text = text_processor.process_text(text)
-
-    lemmatized_words_info = lemmatize_words(text)
+    # Предобработка текста (замена аббревиатур и исправление пробелов) и лемматизация выполняются один раз на документ
+    lemmatized_words_info = as_document(text).processed_words
     lemmatized_words = [token.normal_form for token in lemmatized_words_info]
     tokens_number = len(lemmatized_words)
 
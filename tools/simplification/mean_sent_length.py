@@ -2,13 +2,12 @@
 import re
 
 from colorama import Fore, Style
-from nltk.tokenize import word_tokenize
 from rich.console import Console
 from rich.table import Table
 
-from tools.core.custom_punkt_tokenizer import sent_tokenize_with_abbr
+from tools.core.lazy_imports import word_tokenize
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
-from tools.core.text_preparation import TextPreProcessor
 
 console = Console()
 
@@ -28,14 +27,12 @@ def mean_sentence_length_in_tokens(text, show_analysis=True):
     """
     Вычисляет среднюю длину предложения в токенах (включая знаки препинания).
 
-    :param text: Текст для анализа.
+    :param text: Текст для анализа (строка или ParsedDocument).
     :param show_analysis: Если True, выводит результат в виде таблицы.
     :return float: Средняя длина предложений в токенах.
     """
-    text_processor = TextPreProcessor()
-    text = text_processor.fix_spacing_for_mean_sent_len(text)
     sentence_lengths = []
-    sentences = sent_tokenize_with_abbr(text)
+    sentences = as_document(text).sentences_for_mean_len
 
     # Подсчитываем токены в каждом предложении
     for sentence in sentences:
@@ -64,12 +61,12 @@ def mean_sentence_length_in_chars(text, show_analysis=True):
     """
     Вычисляет среднюю длину предложения в символах (без учета пробелов).
 
-    :param text: Текст для анализа.
+    :param text: Текст для анализа (строка или ParsedDocument).
     :param show_analysis: Если True, выводит результат в виде таблицы.
     :return float:  Средняя длина предложений в символах.
     """
     sentence_lengths = []
-    sentences = sent_tokenize_with_abbr(text)
+    sentences = as_document(text).sentences
 
     # Подсчитываем количество символов в каждом предложении
     for sentence in sentences:
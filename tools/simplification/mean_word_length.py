@@ -1,12 +1,9 @@
 # -*- coding: utf-8 -*- # Языковая кодировка UTF-8
-import re
-
 from colorama import Fore, Style
-from nltk.tokenize import word_tokenize
-
 from rich.console import Console
 from rich.table import Table
 
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
 
 console = Console()
@@ -16,15 +13,12 @@ def mean_word_length_char(text, show_analysis=True):
     """
     Вычисляет среднюю длину слов в тексте в символах.
 
-    :param text: Текст для анализа.
+    :param text: Текст для анализа (строка или ParsedDocument).
     :param show_analysis: Если True, выводит результат в виде таблицы.
     :return float: Средняя длина слов в символах.
     """
-    patterns = r"[^А-Яа-яёЁa-zA-Z\-]+"  # Оставляем кириллицу, латинские буквы и дефис
-    text = re.sub(patterns, ' ', text)
-
-    # Разбиваем фильтрованный текст на слова, создаем их список
-    tokens = word_tokenize(text, language="russian")
+    # Словарные токены (кириллица, латинские буквы и дефис) берем из разобранного документа
+    tokens = as_document(text).word_tokens
 
     # Проверка на наличие слов
     if len(tokens) == 0:
@@ -66,14 +60,12 @@ def calculate_syllable_ratio(text, show_in_console=True):
     """
     Вычисляет показатель соотношения слогов к словам в тексте.
 
-    :param text: Текст для анализа.
+    :param text: Текст для анализа (строка или ParsedDocument).
     :param show_in_console: Если True, выводит результат в виде таблицы.
     :return: Кортеж из двух значений: соотношение слогов к словам и общее количество слогов.
     """
-    patterns = r"[^А-Яа-яёЁ\-]+"  # Оставляем кириллицу и дефис
-    text = re.sub(patterns, ' ', text.lower())
-    # Разбиваем фильтрованный текст на слова, создаем их список
-    tokens = word_tokenize(text, language="russian")
+    # Словарные токены в нижнем регистре (только кириллица и дефис) берем из разобранного документа
+    tokens = as_document(text).cyrillic_word_tokens
 
     if len(tokens) == 0:
         if show_in_console:
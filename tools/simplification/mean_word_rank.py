@@ -3,24 +3,25 @@ from colorama import Fore, Style
 from rich.console import Console
 from rich.table import Table
 
-from tools.core.data.lang_word_frequencies import words_by_freq
+from tools.core.lexicon import lexicon
 from tools.core.utils import wait_for_enter_to_analyze
-from tools.core.lemmatizators import lemmatize_words
+from tools.core.parsed_document import as_document
 
 console = Console()
 
 
-def calculate_mean_word_rank(text: str, show_analysis=True):
+def calculate_mean_word_rank(text, show_analysis=True):
     """
     Рассчитывает средний ранг слов в тексте двумя способами и выводит результаты в виде таблицы.
 
-    :param text: Текст для анализа.
+    :param text: Текст для анализа (строка или ParsedDocument).
     :param show_analysis: Если True, выводит результат и пояснение в виде таблицы.
     :return: Кортеж из двух значений:
              - Средний ранг слов (метрика 1), где слова, не найденные в частотном списке, получают ранг 6000.
              - Средний ранг слов (метрика 2), где слова, не найденные в частотном списке, игнорируются.
     """
-    words = lemmatize_words(text.lower())
+    words = as_document(text).lower_words
+    words_by_freq = lexicon.words_by_freq
     total_rank_1 = 0
     total_rank_2 = 0
     word_count_1 = 0
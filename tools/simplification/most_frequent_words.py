@@ -6,11 +6,10 @@ from colorama import Fore, Style
 from rich.console import Console
 from rich.table import Table
 
-from tools.core.lemmatizators import lemmatize_words_without_stopwords
+from tools.core.parsed_document import as_document
 from tools.core.utils import wait_for_enter_to_analyze
 
 console = Console()
-patterns = r"[^А-Яа-яёЁa-zA-Z\-]+"
 
 
 def count_types_in_text(text):
@@ -20,10 +19,10 @@ def count_types_in_text(text):
     Функция принимает текст, лемматизирует его, затем подсчитывает, как часто встречаются знаменательные части речи
     (существительные, глаголы, прилагательные и наречия). В конце результат выводится в формате JSON.
 
-    :param text: Строка текста, который необходимо проанализировать.
+    :param text: Строка текста (или ParsedDocument), который необходимо проанализировать.
     :return: JSON-объект, содержащий абсолютную частоту встречаемости знаменательных слов.
     """
-    words = lemmatize_words_without_stopwords(text.lower(), patterns)
+    words = as_document(text).words_without_stopwords
     word_list = [token.normal_form for token in words]
     significant_words_count = defaultdict(int)
 
@@ -39,12 +38,12 @@ def find_n_most_frequent_words(text, values=(50,), show_analysis=True):
     """
     Выводит наиболее частотные слова в тексте с нормализованными частотами.
 
-    :param text: Текст для анализа.
+    :param text: Текст для анализа (строка или ParsedDocument).
     :param values: Кортеж, содержащий количество наиболее частотных слов, которые нужно вывести. По умолчанию 50.
     :param show_analysis: Если True, выводит результаты в виде таблицы и ожидает нажатия клавиши для продолжения.
     :return: Строка, представляющая собой словарь наиболее частотных слов с нормализованными частотами.
     """
-    words = lemmatize_words_without_stopwords(text.lower(), patterns)
+    words = as_document(text).words_without_stopwords
     word_list = [token.normal_form for token in words]
     word_counts = Counter(word_list)
     total_words = sum(word_counts.values())
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
+import csv
 import json
+import os
 from collections import defaultdict
+from contextlib import contextmanager
 
 import re
 import sqlite3 as sq
@@ -17,13 +20,13 @@ from tools.miscellaneous.func_words_freqs import print_func_w__frequencies
 from tools.interference.n_grams_analyzer import display_ngrams_summary
 from tools.explicitation.named_entities_extraction import display_entities
 from tools.miscellaneous.passive_to_all_verbs_ratio import print_passive_verbs_ratio
-from tools.normalisation.pmi import calculate_pmi, display_pmi_table
+from tools.normalisation.pmi import PMITable, count_pmi_ngrams, display_pmi_table
 from tools.interference.positional_token_freq import print_frequencies
 from tools.interference.positional_tokens_contexts_by_sent import print_positions
 from tools.miscellaneous.pronouns_freq import print_pronoun_frequencies
 from tools.miscellaneous.punct_analysis import display_punctuation_analysis
 from tools.normalisation.repetition import print_word_occurrences_table
-from tools.explicitation.sci_dm_analysis import print_dm_analysis_results
+from tools.explicitation.sci_dm_analysis import print_dm_analysis_results, DiscourseMarkersResult, DM_CATEGORIES
 from tools.core.utils import wait_for_enter_to_analyze, wait_for_enter_to_choose_opt, display_morphological_annotation, \
     display_grammemes, display_position_explanation, get_syntactic_annotation, display_syntactic_annotation, \
     choose_universal
@@ -31,34 +34,697 @@ from tools.core.utils import wait_for_enter_to_analyze, wait_for_enter_to_choose
 console = Console()
 init(autoreset=True)
 
+# Настройки SQLite для каждого соединения: журнал WAL и синхронизация с диском только при контрольных точках
+SQLITE_PRAGMAS = (
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+)
+
+# Количество текстов, строки которых записываются одной транзакцией в пакетном режиме
+DEFAULT_BATCH_SIZE = 50
+
+# Базы данных, для которых таблицы уже созданы в текущем процессе
+_initialized_dbs = set()
+
+# Версия схемы БД (хранится в PRAGMA user_version).
+# 0 - у каждой таблицы свой AUTOINCREMENT text_id; 1 - text_id выдает Text_Passport, остальные таблицы ссылаются на него;
+# 2 - счетчики n-граммов, служебных слов, местоимений и т.д. дублируются в длинном формате в Feature_counts
+#     (источник данных - JSON-столбцы, Feature_counts - производный индекс, см. FEATURE_COUNT_COLUMNS);
+# 3 - накопленные суммы по корпусу хранятся в Corpus_indicator_totals и Corpus_feature_totals
+SCHEMA_VERSION = 3
+
+# Таблицы индикаторов и разметки, строки которых принадлежат тексту из Text_Passport
+TEXT_DATA_TABLES = (
+    'Simplification_features', 'Normalisation_features', 'Explicitation_features', 'Interference_features',
+    'Miscellaneous_features', 'Morphological_annotation', 'Syntactic_annotation',
+)
+
+# Определение text_id в таблицах индикаторов и разметки. Внешний ключ является первичным ключом таблицы,
+# поэтому поиск и соединения по text_id используют индекс rowid. Проверка откладывается до конца транзакции,
+# так как в пакетном режиме порядок вставок по таблицам не гарантирован.
+TEXT_ID_REFERENCE = ("text_id INTEGER PRIMARY KEY REFERENCES Text_Passport(text_id) "
+                     "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED")
+
+# JSON-столбцы, которые раскладываются в Feature_counts строками (text_id, feature_family, key, count, freq):
+# (таблица, столбец количеств, столбец частот, семейство, вложенный словарь).
+# Для вложенных словарей ({категория: {ключ: значение}}) семейство записывается как "семейство:категория".
+# Источником данных остаются JSON-столбцы: по ним выводятся результаты текста, а строка Feature_counts
+# объединяет количество и частоту ключа и не сохраняет ни отдельный порядок ключей словаря частот,
+# ни пустые категории вложенных словарей. Строки Feature_counts этих семейств только выводятся из JSON
+# (feature_count_rows) и используются для сумм по корпусу; расхождение находит find_feature_count_drift,
+# а исправляет rebuild_feature_counts.
+FEATURE_COUNT_COLUMNS = (
+    ('Simplification_features', 'types_counts', None, 'types', False),
+    ('Interference_features', 'pos_unigrams_counts', 'pos_unigrams_freq', 'pos_unigrams', False),
+    ('Interference_features', 'pos_bigrams_counts', 'pos_bigrams_freq', 'pos_bigrams', False),
+    ('Interference_features', 'pos_trigrams_counts', 'pos_trigrams_freq', 'pos_trigrams', False),
+    ('Interference_features', 'char_unigram_counts', 'char_unigram_freq', 'char_unigrams', False),
+    ('Interference_features', 'char_bigram_counts', 'char_bigram_freq', 'char_bigrams', False),
+    ('Interference_features', 'char_trigram_counts', 'char_trigram_freq', 'char_trigrams', False),
+    ('Interference_features', 'func_w_trigram_with_pos_counts', 'func_w_trigrams_freqs', 'func_w_trigrams', True),
+    ('Interference_features', 'token_positions_counts', 'token_positions_normalized_frequencies', 'token_positions',
+     True),
+    ('Miscellaneous_features', 'func_words_counts', 'func_words_freq', 'func_words', False),
+    ('Miscellaneous_features', 'pers_possessive_pronouns_counts', 'pers_possessive_pronouns_frequencies',
+     'pers_possessive_pronouns', False),
+    ('Miscellaneous_features', 'reflexive_pronoun_counts', 'reflexive_pronoun_frequencies', 'reflexive_pronoun',
+     False),
+    ('Miscellaneous_features', 'demonstrative_pronouns_counts', 'demonstrative_pronouns_frequencies',
+     'demonstrative_pronouns', False),
+    ('Miscellaneous_features', 'defining_pronouns_counts', 'defining_pronouns_frequencies', 'defining_pronouns',
+     False),
+    ('Miscellaneous_features', 'relative_pronouns_counts', 'relative_pronouns_frequencies', 'relative_pronouns',
+     False),
+    ('Miscellaneous_features', 'indefinite_pronouns_counts', 'indefinite_pronouns_frequencies',
+     'indefinite_pronouns', False),
+    ('Miscellaneous_features', 'negative_pronouns_counts', 'negative_pronouns_frequencies', 'negative_pronouns',
+     False),
+    ('Miscellaneous_features', 'punctuation_counts', 'punct_marks_normalized_frequency', 'punctuation', False),
+    ('Miscellaneous_features', None, 'punct_marks_to_all_punct_frequency', 'punct_to_all_punct', False),
+)
+
+# Семейства Feature_counts, выводимые из JSON-столбцов (без семейств PMI)
+JSON_FEATURE_FAMILIES = tuple(dict.fromkeys(column[3] for column in FEATURE_COUNT_COLUMNS))
+
+INSERT_FEATURE_COUNT = "INSERT INTO Feature_counts (text_id, feature_family, key, count, freq) VALUES (?, ?, ?, ?, ?)"
+
+# Столбец Simplification_features, на который умножаются значения семейства при суммировании по корпусу
+# (None - значения суммируются без весов)
+FEATURE_FAMILY_WEIGHTS = {
+    'types': None,
+    'pos_unigrams': 'all_tokens_count', 'pos_bigrams': 'all_tokens_count', 'pos_trigrams': 'all_tokens_count',
+    'char_unigrams': 'all_tokens_count', 'char_bigrams': 'all_tokens_count', 'char_trigrams': 'all_tokens_count',
+    'func_w_trigrams': 'all_tokens_count', 'token_positions': 'all_tokens_count',
+    'func_words': 'alpha_tokens_count', 'pers_possessive_pronouns': 'alpha_tokens_count',
+    'reflexive_pronoun': 'alpha_tokens_count', 'demonstrative_pronouns': 'alpha_tokens_count',
+    'defining_pronouns': 'alpha_tokens_count', 'relative_pronouns': 'alpha_tokens_count',
+    'indefinite_pronouns': 'alpha_tokens_count', 'negative_pronouns': 'alpha_tokens_count',
+    'punctuation': 'all_tokens_count', 'punct_to_all_punct': 'all_tokens_count',
+    'pmi_lemmas': None, 'pmi_bigrams': None,
+}
+
+# Семейства Feature_counts с количествами лемм и биграммов лемм внутри предложений для подсчета PMI корпуса
+# (ключ биграмма - две леммы через пробел)
+PMI_FEATURE_FAMILIES = ('pmi_lemmas', 'pmi_bigrams')
+
+# Индикаторы, средние значения которых по корпусу выводятся в отчетах по корпусу
+SIMPLIFICATION_CORPUS_COLUMNS = (
+    'lexical_density', 'ttr_lex_variety', 'log_ttr_lex_variety', 'modified_lex_variety', 'mean_word_length',
+    'syllable_ratio', 'total_syllables_count', 'tokens_mean_sent_length', 'chars_mean_sent_length',
+    'mean_word_rank_1', 'mean_word_rank_2',
+)
+NORMALISATION_CORPUS_COLUMNS = ('repetition', 'repeated_content_words', 'total_word_tokens')
+EXPLICITATION_CORPUS_COLUMNS = (
+    'explicit_naming_ratio', 'single_naming', 'mean_multiple_naming', 'single_entities_count',
+    'multiple_entities_count', 'named_entities_count', 'sci_markers_total_count',
+) + tuple(f"{key}_{suffix}" for key, _ in DM_CATEGORIES for suffix in ('count', 'freq'))
+MISCELLANEOUS_CORPUS_COLUMNS = ('passive_to_all_v_ratio', 'passive_verbs_count', 'all_verbs_count',
+                                'readability_index')
+
+ALPHA_WEIGHT = 'Simplification_features.alpha_tokens_count'
+ALL_WEIGHT = 'Simplification_features.all_tokens_count'
+
+
+def _corpus_indicators(table, columns, weight):
+    return tuple((f"{table}.{column}", table, f"{table}.{column}", weight) for column in columns)
+
+
+# Накопленные суммы по корпусу (таблица Corpus_indicator_totals): (индикатор, таблица, значение, вес).
+# Хранятся SUM(вес * значение) и SUM(вес); среднее по корпусу - их отношение. Для общих количеств токенов
+# вес равен 1, поэтому вторая сумма - количество текстов.
+CORPUS_INDICATORS = (
+    _corpus_indicators('Simplification_features', SIMPLIFICATION_CORPUS_COLUMNS[:8], ALPHA_WEIGHT) +
+    _corpus_indicators('Simplification_features', ('chars_mean_sent_length',), ALL_WEIGHT) +
+    _corpus_indicators('Simplification_features', SIMPLIFICATION_CORPUS_COLUMNS[9:], ALPHA_WEIGHT) +
+    _corpus_indicators('Normalisation_features', NORMALISATION_CORPUS_COLUMNS, ALPHA_WEIGHT) +
+    _corpus_indicators('Explicitation_features', EXPLICITATION_CORPUS_COLUMNS,
+                       'Explicitation_features.total_tokens_with_dms') +
+    _corpus_indicators('Miscellaneous_features', MISCELLANEOUS_CORPUS_COLUMNS, ALPHA_WEIGHT) +
+    (
+        ('Simplification_features.alpha_tokens_count', 'Simplification_features', ALPHA_WEIGHT, '1'),
+        ('Interference_features.all_tokens_count', 'Interference_features', ALL_WEIGHT, '1'),
+        ('Miscellaneous_features.alpha_tokens_count', 'Miscellaneous_features', ALPHA_WEIGHT, '1'),
+        ('Miscellaneous_features.all_tokens_count', 'Miscellaneous_features', ALL_WEIGHT, '1'),
+    )
+)
+
+# Группы индикаторов для сравнения корпусов: (методы, собирающие средние по корпусу в comparison_results,
+# метод вывода сравнительной таблицы). Номера групп совпадают с пунктами меню choose_universal
+CORPUS_COMPARISON_GROUPS = {
+    'simplification': (('display_simplification_features_for_corpus',), 'print_simpl_comparison_table'),
+    'normalisation': (('display_normalisation_features_for_corpus', 'calculate_pmi_for_corpus'),
+                      'print_normalisation_comparison_table'),
+    'explicitation': (('display_explicitation_features_for_corpus',), 'print_explicitation_comparison_table'),
+    'interference': (('display_interference_features_for_corpus',), 'print_ngrams_comparison_table'),
+    'miscellaneous': (('display_miscellaneous_features_for_corpus',), 'print_miscellaneous_comparison_table'),
+}
+COMPARISON_OPTIONS = dict(zip(('1', '2', '3', '4', '5'), CORPUS_COMPARISON_GROUPS))
+
+# Таблицы, числовые столбцы которых выгружаются в export_text_features (по одной строке на текст)
+EXPORT_FEATURE_TABLES = ('Simplification_features', 'Normalisation_features', 'Explicitation_features',
+                         'Interference_features', 'Miscellaneous_features')
+EXPORT_PASSPORT_COLUMNS = ('text_id', 'title', 'subject_area', 'keywords', 'publication_year', 'published_in',
+                           'authors', 'author_gender', 'author_birth_year')
+
+# Индикатор, по количеству текстов которого проверяется актуальность накопленных сумм
+CORPUS_TEXTS_INDICATOR = 'Simplification_features.alpha_tokens_count'
+
+
+def _add_nullable(column):
+    """Выражение ON CONFLICT, прибавляющее новую сумму к накопленной (NULL - нет значений, как у SUM)."""
+    return (f"{column} = CASE WHEN {column} IS NULL THEN excluded.{column} "
+            f"WHEN excluded.{column} IS NULL THEN {column} ELSE {column} + excluded.{column} END")
+
+
+def _family_rows(text_id, family, counts, freqs):
+    """Строки Feature_counts для одного семейства: ключи в порядке следования в словарях."""
+    keys = dict.fromkeys(list(counts) + list(freqs))
+    return [(text_id, family, key, counts.get(key), freqs.get(key)) for key in keys]
+
+
+def pmi_count_rows(text_id, word_counts, bigram_counts):
+    """
+    Строки Feature_counts с количествами лемм и биграммов лемм текста для подсчета PMI.
+
+    :param text_id: ID текста.
+    :param word_counts: Словарь {лемма: количество}.
+    :param bigram_counts: Словарь {(лемма1, лемма2): количество}.
+    :return: Список кортежей (text_id, feature_family, key, count, freq).
+    """
+    rows = [(text_id, 'pmi_lemmas', word, count, None) for word, count in word_counts.items()]
+    rows.extend((text_id, 'pmi_bigrams', f"{w1} {w2}", count, None) for (w1, w2), count in bigram_counts.items())
+    return rows
+
+
+def feature_count_rows(text_id, table, values):
+    """
+    Раскладывает JSON-счетчики строки таблицы индикаторов в строки длинного формата для Feature_counts.
+
+    :param text_id: ID текста.
+    :param table: Название таблицы индикаторов.
+    :param values: Словарь {столбец: значение} (JSON-строка или уже разобранный словарь).
+    :return: Список кортежей (text_id, feature_family, key, count, freq).
+    """
+    def load(column):
+        if column is None or values.get(column) is None:
+            return {}
+        value = values[column]
+        return json.loads(value) if isinstance(value, str) else value
+
+    rows = []
+    for feature_table, counts_column, freqs_column, family, nested in FEATURE_COUNT_COLUMNS:
+        if feature_table != table:
+            continue
+        counts, freqs = load(counts_column), load(freqs_column)
+        if nested:
+            for group in dict.fromkeys(list(counts) + list(freqs)):
+                rows.extend(_family_rows(text_id, f"{family}:{group}", counts.get(group, {}), freqs.get(group, {})))
+        else:
+            rows.extend(_family_rows(text_id, family, counts, freqs))
+    return rows
+
 
 class SaveToDatabase:
     def __init__(self, db_name=None):
         self.db_name = db_name
         self.connection = None
         self.cursor = None
+        # Накопленные строки {запрос INSERT: [параметры]}; None - каждая вставка фиксируется сразу
+        self._pending = None
+        self._batch_size = None
+        self._pending_texts = 0
+        self._transaction_depth = 0
+        self._next_text_id = None
+        self._pending_text_ids = []
+        # Функции on_done текстов, строки которых еще не записаны
+        self._pending_callbacks = []
         self.connect_db()
-        self.create_tables()
 
     def connect_db(self):
         """Подключение к базе данных SQLite или создание новой базы данных."""
         if self.db_name:
             self.connection = sq.connect(self.db_name)
             self.cursor = self.connection.cursor()
+            for pragma in SQLITE_PRAGMAS:
+                self.cursor.execute(pragma)
+            self._next_text_id = None
+            # Создание и миграция таблиц выполняются один раз на базу данных за процесс
+            # (в том числе для баз, к которым объект переключается при сравнении корпусов)
+            if os.path.abspath(self.db_name) not in _initialized_dbs:
+                self.ensure_schema()
+                _initialized_dbs.add(os.path.abspath(self.db_name))
+
+    def ensure_schema(self):
+        """
+        Создает таблицы и при необходимости переводит существующую базу данных на текущую версию схемы.
+        """
+        version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+        existing_tables = {row[0] for row in self.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'Text_Passport' not in existing_tables:
+            self.create_tables()
+            self.cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.connection.commit()
+            return
+        if version < 1:
+            self.migrate_to_text_id_references(existing_tables)
+        if version < 2:
+            self.migrate_to_feature_counts()
+        if version < 3:
+            self.migrate_to_corpus_totals()
+
+    def migrate_to_text_id_references(self, existing_tables):
+        """
+        Миграция схемы 0 -> 1: таблицы индикаторов и разметки пересоздаются с внешним ключом text_id на
+        Text_Passport (ON DELETE CASCADE).
+
+        Значения text_id сохраняются. Строки без соответствующего паспорта текста (остатки прерванного
+        анализа) не переносятся. Миграция выполняется одной транзакцией.
+
+        :param existing_tables: Названия таблиц, уже существующих в базе данных.
+        """
+        tables = [table for table in TEXT_DATA_TABLES if table in existing_tables]
+        # Внешние ключи отключаются на время пересоздания таблиц (вне транзакции это обязательно)
+        self.connection.commit()
+        self.cursor.execute("PRAGMA foreign_keys=OFF")
+        dropped_rows = 0
+        try:
+            self.cursor.execute("BEGIN")
+            for table in tables:
+                self.cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_v0")
+            self.create_tables()
+            for table in tables:
+                self.cursor.execute(f"INSERT INTO {table} SELECT * FROM {table}_v0 "
+                                    f"WHERE text_id IN (SELECT text_id FROM Text_Passport)")
+                total = self.cursor.execute(f"SELECT COUNT(*) FROM {table}_v0").fetchone()[0]
+                dropped_rows += total - self.cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                self.cursor.execute(f"DROP TABLE {table}_v0")
+            if self.cursor.execute("PRAGMA foreign_key_check").fetchall():
+                raise sq.IntegrityError("Нарушены внешние ключи после миграции схемы")
+            self.cursor.execute("PRAGMA user_version = 1")
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            self.cursor.execute("PRAGMA foreign_keys=ON")
+        print(Fore.LIGHTGREEN_EX + Style.BRIGHT + f"База данных {self.db_name} обновлена до версии схемы 1." + Fore.RESET)
+        if dropped_rows:
+            print(Fore.LIGHTYELLOW_EX + f"Удалено строк без паспорта текста: {dropped_rows}." + Fore.RESET)
+
+    def migrate_to_feature_counts(self):
+        """
+        Миграция схемы 1 -> 2: создает таблицу Feature_counts и заполняет ее из JSON-столбцов уже
+        сохраненных текстов. Миграция выполняется одной транзакцией.
+        """
+        try:
+            self.create_tables()
+            self.cursor.execute("DELETE FROM Feature_counts")
+            for _, rows in self.derived_feature_count_rows():
+                self.cursor.executemany(INSERT_FEATURE_COUNT, rows)
+            self.cursor.execute("PRAGMA user_version = 2")
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        print(Fore.LIGHTGREEN_EX + Style.BRIGHT + f"База данных {self.db_name} обновлена до версии схемы 2." + Fore.RESET)
+
+    def derived_feature_count_rows(self, text_ids=None):
+        """
+        Выводит строки Feature_counts семейств JSON_FEATURE_FAMILIES из JSON-столбцов таблиц индикаторов.
+
+        :param text_ids: ID текстов (None - все тексты базы данных).
+        :return: Генератор кортежей (text_id, список строк Feature_counts текста) по возрастанию text_id.
+        """
+        rows_by_text = {}
+        for table in dict.fromkeys(column[0] for column in FEATURE_COUNT_COLUMNS):
+            columns = []
+            for feature_table, counts_column, freqs_column, _, _ in FEATURE_COUNT_COLUMNS:
+                if feature_table == table:
+                    columns.extend(column for column in (counts_column, freqs_column) if column)
+            query = f"SELECT text_id, {', '.join(columns)} FROM {table}"
+            params = []
+            if text_ids is not None:
+                params = list(text_ids)
+                query += f" WHERE text_id IN ({', '.join('?' * len(params))})"
+            for row in self.connection.execute(query, params):
+                rows_by_text.setdefault(row[0], []).extend(
+                    feature_count_rows(row[0], table, dict(zip(columns, row[1:]))))
+        for text_id in sorted(rows_by_text):
+            yield text_id, rows_by_text[text_id]
+
+    def _json_families_condition(self):
+        """Условие WHERE для строк Feature_counts семейств JSON_FEATURE_FAMILIES и его параметры."""
+        nested_families = {family for _, _, _, family, nested in FEATURE_COUNT_COLUMNS if nested}
+        conditions = ["feature_family GLOB ?" if family in nested_families else "feature_family = ?"
+                      for family in JSON_FEATURE_FAMILIES]
+        params = [f"{family}:*" if family in nested_families else family for family in JSON_FEATURE_FAMILIES]
+        return f"({' OR '.join(conditions)})", params
+
+    def find_feature_count_drift(self):
+        """
+        Сравнивает строки Feature_counts каждого текста со строками, выведенными из его JSON-столбцов.
+
+        :return: Список ID текстов, для которых строки расходятся.
+        """
+        condition, params = self._json_families_condition()
+        drifted = []
+        for text_id, expected in self.derived_feature_count_rows():
+            stored = self.connection.execute(
+                f"SELECT text_id, feature_family, key, count, freq FROM Feature_counts "
+                f"WHERE text_id = ? AND {condition} ORDER BY rowid", [text_id] + params).fetchall()
+            if stored != expected:
+                drifted.append(text_id)
+        return drifted
+
+    def rebuild_feature_counts(self, text_ids=None):
+        """
+        Заново выводит строки Feature_counts семейств JSON_FEATURE_FAMILIES из JSON-столбцов и обновляет
+        суммы этих семейств по корпусу. Выполняется одной транзакцией.
+
+        :param text_ids: ID текстов (None - все тексты базы данных).
+        :return: Количество текстов, строки которых записаны заново.
+        """
+        self.ensure_corpus_totals()
+        condition, params = self._json_families_condition()
+        ids_params = [] if text_ids is None else list(text_ids)
+        text_condition = "" if text_ids is None else f" AND text_id IN ({', '.join('?' * len(ids_params))})"
+        rebuilt = 0
+        with self.connection:
+            self.update_corpus_totals(text_ids, sign=-1, families=JSON_FEATURE_FAMILIES)
+            self.cursor.execute(f"DELETE FROM Feature_counts WHERE {condition}{text_condition}", params + ids_params)
+            for _, rows in self.derived_feature_count_rows(text_ids):
+                self.cursor.executemany(INSERT_FEATURE_COUNT, rows)
+                rebuilt += 1
+            self.update_corpus_totals(text_ids, families=JSON_FEATURE_FAMILIES)
+        return rebuilt
+
+    def migrate_to_corpus_totals(self):
+        """
+        Миграция схемы 2 -> 3: создает таблицы накопленных сумм по корпусу и заполняет их по уже
+        сохраненным текстам. Миграция выполняется одной транзакцией.
+        """
+        try:
+            self.create_tables()
+            self.cursor.execute("DELETE FROM Corpus_indicator_totals")
+            self.cursor.execute("DELETE FROM Corpus_feature_totals")
+            self.update_corpus_totals()
+            self.cursor.execute("PRAGMA user_version = 3")
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        print(Fore.LIGHTGREEN_EX + Style.BRIGHT + f"База данных {self.db_name} обновлена до версии схемы 3." + Fore.RESET)
 
     def __enter__(self):
         # Открываем соединение с базой данных и возвращаем объект для использования в блоке with
-        self.connect_db()
+        if self.connection is None:
+            self.connect_db()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        # Закрываем соединение с базой данных
+        # Записываем накопленные строки и закрываем соединение с базой данных
         if self.connection:
+            self.flush()
             self.connection.commit()
             self.connection.close()
         self.connection = None
         self.cursor = None
 
+    def _insert(self, query, params):
+        """
+        Выполняет вставку строки или, внутри transaction/batch, откладывает ее до записи методом flush.
+
+        :param query: Запрос INSERT.
+        :param params: Кортеж параметров запроса.
+        """
+        if self._pending is None:
+            self.cursor.execute(query, params)
+            self.connection.commit()
+        else:
+            self._pending.setdefault(query, []).append(params)
+
+    def _insert_many(self, query, rows):
+        """Аналог _insert для нескольких строк одного запроса (executemany)."""
+        if self._pending is None:
+            self.cursor.executemany(query, rows)
+            self.connection.commit()
+        else:
+            self._pending.setdefault(query, []).extend(rows)
+
+    def insert_feature_counts(self, text_id, table, values):
+        """
+        Сохраняет счетчики строки таблицы индикаторов в длинном формате (таблица Feature_counts).
+
+        Вызывается только методами insert_* вместе с записью тех же значений в JSON-столбцы, в той же
+        транзакции: строки Feature_counts выводятся из значений JSON-столбцов, которые остаются источником данных.
+
+        :param text_id: ID текста.
+        :param table: Название таблицы индикаторов.
+        :param values: Словарь {JSON-столбец: значение}.
+        """
+        rows = feature_count_rows(text_id, table, values)
+        if rows:
+            self._insert_many(INSERT_FEATURE_COUNT, rows)
+
+    def insert_pmi_counts(self, text_id, word_counts, bigram_counts):
+        """
+        Сохраняет количества лемм и биграммов лемм текста для подсчета PMI корпуса (таблица Feature_counts).
+
+        :param text_id: ID текста.
+        :param word_counts: Словарь {лемма: количество}.
+        :param bigram_counts: Словарь {(лемма1, лемма2): количество}.
+        """
+        rows = pmi_count_rows(text_id, word_counts, bigram_counts)
+        if rows:
+            self._insert_many(INSERT_FEATURE_COUNT, rows)
+
+    def backfill_pmi_counts(self):
+        """
+        Подсчитывает и сохраняет количества лемм и биграммов для текстов, сохраненных без них
+        (до появления хранимых счетчиков PMI). Каждый текст записывается своей транзакцией вместе
+        с обновлением сумм по корпусу.
+
+        :return: Количество обработанных текстов.
+        """
+        self.ensure_corpus_totals()
+        texts = self.connection.execute('''
+            SELECT text_id, text FROM Text_Passport
+            WHERE text_id NOT IN (SELECT text_id FROM Feature_counts WHERE feature_family = 'pmi_lemmas')
+            ORDER BY text_id
+        ''').fetchall()
+        for text_id, text in texts:
+            rows = pmi_count_rows(text_id, *count_pmi_ngrams(text))
+            if not rows:
+                continue
+            with self.connection:
+                self.cursor.executemany(INSERT_FEATURE_COUNT, rows)
+                self.update_corpus_totals([text_id], families=PMI_FEATURE_FAMILIES)
+        return len(texts)
+
+    def update_corpus_totals(self, text_ids=None, sign=1, families=None):
+        """
+        Прибавляет к накопленным суммам по корпусу значения текстов (sign=1) или вычитает их (sign=-1).
+
+        Обновление выполняется запросами INSERT ... SELECT ... ON CONFLICT DO UPDATE по уже записанным строкам
+        текстов и не фиксирует транзакцию: метод вызывается внутри транзакции, которая записывает
+        или удаляет тексты, поэтому суммы всегда согласованы с таблицами индикаторов.
+
+        :param text_ids: ID текстов (None - все тексты базы данных).
+        :param sign: 1 - добавление текстов, -1 - удаление.
+        :param families: Обновить только суммы этих семейств Feature_counts (None - все индикаторы и семейства).
+        """
+        ids_params = [] if text_ids is None else list(text_ids)
+
+        def text_condition(table):
+            if text_ids is None:
+                return "1"
+            return f"{table}.text_id IN ({', '.join('?' * len(ids_params))})"
+
+        for indicator, table, value, weight in CORPUS_INDICATORS if families is None else ():
+            join = ""
+            if table != 'Simplification_features' and 'Simplification_features.' in value + weight:
+                join = f"JOIN Simplification_features ON {table}.text_id = Simplification_features.text_id"
+            self.cursor.execute(f'''
+                INSERT INTO Corpus_indicator_totals (indicator, weighted_sum, weight_sum)
+                SELECT ?, ? * SUM({weight} * {value}), ? * SUM({weight})
+                FROM {table} {join}
+                WHERE {text_condition(table)}
+                ON CONFLICT(indicator) DO UPDATE SET
+                    {_add_nullable('weighted_sum')}, {_add_nullable('weight_sum')}
+            ''', [indicator, sign, sign] + ids_params)
+
+        nested_families = {family for _, _, _, family, nested in FEATURE_COUNT_COLUMNS if nested}
+        families_by_weight = {}
+        for family, weight_column in FEATURE_FAMILY_WEIGHTS.items():
+            if families is None or family in families:
+                families_by_weight.setdefault(weight_column, []).append(family)
+        for weight_column, weight_families in families_by_weight.items():
+            weight = f"Simplification_features.{weight_column}" if weight_column else "1"
+            join = ("JOIN Simplification_features ON Feature_counts.text_id = Simplification_features.text_id"
+                    if weight_column else "")
+            conditions = ["feature_family GLOB ?" if family in nested_families else "feature_family = ?"
+                          for family in weight_families]
+            params = [f"{family}:*" if family in nested_families else family for family in weight_families]
+            self.cursor.execute(f'''
+                INSERT INTO Corpus_feature_totals (feature_family, key, count_sum, freq_sum, texts_count, first_seen)
+                SELECT feature_family, key, ? * SUM(count * {weight}), ? * SUM(freq * {weight}), ? * COUNT(*),
+                       MIN(Feature_counts.rowid)
+                FROM Feature_counts {join}
+                WHERE ({' OR '.join(conditions)}) AND {text_condition('Feature_counts')}
+                GROUP BY feature_family, key
+                ON CONFLICT(feature_family, key) DO UPDATE SET
+                    {_add_nullable('count_sum')}, {_add_nullable('freq_sum')},
+                    texts_count = texts_count + excluded.texts_count,
+                    first_seen = MIN(first_seen, excluded.first_seen)
+            ''', [sign, sign, sign] + params + ids_params)
+        if sign < 0:
+            self.cursor.execute("DELETE FROM Corpus_feature_totals WHERE texts_count <= 0")
+
+    def rebuild_corpus_totals(self):
+        """Пересчитывает накопленные суммы по корпусу заново по всем сохраненным текстам."""
+        with self.connection:
+            self.cursor.execute("DELETE FROM Corpus_indicator_totals")
+            self.cursor.execute("DELETE FROM Corpus_feature_totals")
+            self.update_corpus_totals()
+
+    def ensure_corpus_totals(self):
+        """
+        Проверяет, что накопленные суммы учитывают все тексты корпуса, и пересчитывает их, если нет
+        (например, если строки были записаны вне transaction/batch).
+        """
+        row = self.cursor.execute("SELECT weight_sum FROM Corpus_indicator_totals WHERE indicator = ?",
+                                  (CORPUS_TEXTS_INDICATOR,)).fetchone()
+        texts_count = self.cursor.execute("SELECT COUNT(*) FROM Simplification_features").fetchone()[0]
+        if (row[0] if row and row[0] is not None else 0) != texts_count:
+            self.rebuild_corpus_totals()
+
+    def flush(self):
+        """
+        Записывает накопленные строки одной транзакцией (executemany для каждой таблицы) и добавляет
+        записанные тексты к накопленным суммам по корпусу.
+
+        При ошибке транзакция откатывается целиком, поэтому в таблицах не остается строк
+        части текстов. Функции on_done всех текстов транзакции вызываются после фиксации
+        (с error=None) или после отката (с исключением), затем исключение передается выше.
+        """
+        callbacks = self._pending_callbacks
+        self._pending_callbacks = []
+        if not self._pending:
+            self._pending_texts = 0
+            self._pending_text_ids = []
+            for callback in callbacks:
+                callback(None)
+            return
+        pending = self._pending
+        text_ids = self._pending_text_ids
+        self._pending = {}
+        self._pending_texts = 0
+        self._pending_text_ids = []
+        try:
+            with self.connection:
+                for query, rows in pending.items():
+                    self.cursor.executemany(query, rows)
+                # Суммы по корпусу обновляются в той же транзакции, что и строки текстов
+                if text_ids:
+                    self.update_corpus_totals(text_ids)
+        except Exception as e:
+            # Ни один текст транзакции не записан
+            for callback in callbacks:
+                callback(e)
+            raise
+        for callback in callbacks:
+            callback(None)
+
+    @contextmanager
+    def transaction(self, on_done=None):
+        """
+        Группирует вставки для одного текста: строки всех таблиц текста записываются атомарно.
+
+        Вне пакетного режима строки записываются при выходе из блока. В пакетном режиме (batch)
+        они остаются в буфере до накопления batch_size текстов. Если в блоке возникает исключение,
+        строки текста отбрасываются.
+
+        :param on_done: Функция (error), вызываемая, когда строки текста записаны (error=None) или когда
+            их запись не удалась (error - исключение). В пакетном режиме это происходит при записи
+            всего пакета. Не вызывается, если исключение возникло внутри блока.
+        """
+        if self._transaction_depth:
+            # Вложенный блок входит во внешнюю транзакцию текста
+            self._transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self._transaction_depth -= 1
+            if on_done is not None:
+                self._pending_callbacks.append(on_done)
+            return
+        standalone = self._pending is None
+        if standalone:
+            self._pending = {}
+        snapshot = {query: len(rows) for query, rows in self._pending.items()}
+        text_ids_snapshot = len(self._pending_text_ids)
+        callbacks_snapshot = len(self._pending_callbacks)
+        self._transaction_depth = 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth = 0
+            for query in list(self._pending):
+                if query in snapshot:
+                    del self._pending[query][snapshot[query]:]
+                else:
+                    del self._pending[query]
+            del self._pending_text_ids[text_ids_snapshot:]
+            del self._pending_callbacks[callbacks_snapshot:]
+            if standalone:
+                self._pending = None
+            raise
+        self._transaction_depth = 0
+        if on_done is not None:
+            self._pending_callbacks.append(on_done)
+        if standalone:
+            try:
+                self.flush()
+            finally:
+                self._pending = None
+        else:
+            self._pending_texts += 1
+            if self._pending_texts >= self._batch_size:
+                self.flush()
+
+    @contextmanager
+    def batch(self, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Пакетный режим записи: соединение остается открытым, а строки batch_size текстов
+        записываются одной транзакцией через executemany.
+
+        Каждый текст внутри пакета оформляется блоком transaction. Оставшиеся строки
+        записываются при выходе из блока. Если блок завершается исключением, незаписанные строки
+        отбрасываются, а функции on_done их текстов получают это исключение.
+
+        :param batch_size: Количество текстов в одной транзакции.
+        """
+        self._pending = {}
+        self._batch_size = batch_size
+        self._pending_texts = 0
+        try:
+            yield self
+            self.flush()
+        except BaseException as e:
+            callbacks = self._pending_callbacks
+            self._pending_callbacks = []
+            for callback in callbacks:
+                callback(e)
+            raise
+        finally:
+            self._pending = None
+            self._batch_size = None
+            self._pending_texts = 0
+            self._pending_text_ids = []
+
     def get_comparable_dbs(self, db_list):
         dbs_to_compare = []
         for db in db_list:
@@ -70,6 +736,23 @@ class SaveToDatabase:
                 dbs_to_compare.append(self.db_name)
         return dbs_to_compare
 
+    def collect_comparison_results(self, dbs, group):
+        """
+        Собирает средние показатели группы индикаторов по нескольким корпусам без вывода в консоль.
+
+        :param dbs: Имена баз данных корпусов.
+        :param group: Группа индикаторов (ключ CORPUS_COMPARISON_GROUPS).
+        :return: Словарь {имя базы данных: {показатель: значение}}.
+        """
+        comparison_results = {}
+        for db in dbs:
+            if db != self.db_name or self.connection is None:
+                self.db_name = db
+                self.connect_db()
+            for method_name in CORPUS_COMPARISON_GROUPS[group][0]:
+                getattr(self, method_name)(comparison=True, comparison_results=comparison_results)
+        return comparison_results
+
     def display_corpus_info(self, choice=None):
         """Отображает информацию о корпусе текстов"""
         # Извлечение количества текстов
@@ -92,70 +775,13 @@ class SaveToDatabase:
 
             option_choice = choose_universal()
 
-            if option_choice == '1':
-                comparison_results = {}
-                for db in dbs_to_compare:
-                    self.db_name = db
-                    self.connect_db()
-                    self.display_simplification_features_for_corpus(
-                        comparison=True,
-                        comparison_results=comparison_results
-                    )
-                self.print_simpl_comparison_table(comparison_results)
-
-            elif option_choice == '2':
-                comparison_results = {}
-                print(
-                    Fore.LIGHTRED_EX + Style.BRIGHT + "Пожалуйста, подождите.\n")
-                for db in dbs_to_compare:
-                    self.db_name = db
-                    self.connect_db()
-                    self.display_normalisation_features_for_corpus(
-                        comparison=True,
-                        comparison_results=comparison_results
-                    )
-                    # Затем добавляем расчет PMI
-                    self.calculate_pmi_for_corpus(
-                        comparison=True,
-                        comparison_results=comparison_results
-                    )
-
-                self.print_normalisation_comparison_table(comparison_results)
-
-            elif option_choice == '3':
-                comparison_results = {}
-                for db in dbs_to_compare:
-                    self.db_name = db
-                    self.connect_db()
-                    self.display_explicitation_features_for_corpus(
-                        comparison=True,
-                        comparison_results=comparison_results
-                    )
-                self.print_explicitation_comparison_table(comparison_results)
-
-            elif option_choice == '4':
-                comparison_results = {}
-                for db in dbs_to_compare:
-                    self.db_name = db
-                    self.connect_db()
-                    self.display_interference_features_for_corpus(
-                        comparison=True,
-                        comparison_results=comparison_results
-                    )
-                # print(comparison_results)
-                self.print_ngrams_comparison_table(comparison_results)
-
-            elif option_choice == '5':
-                comparison_results = {}
-                for db in dbs_to_compare:
-                    self.db_name = db
-                    self.connect_db()
-                    self.display_miscellaneous_features_for_corpus(
-                        comparison=True,
-                        comparison_results=comparison_results
-
-                    )
-                self.print_miscellaneous_comparison_table(comparison_results)
+            group = COMPARISON_OPTIONS.get(option_choice)
+            if group:
+                if group == 'normalisation':
+                    print(
+                        Fore.LIGHTRED_EX + Style.BRIGHT + "Пожалуйста, подождите.\n")
+                comparison_results = self.collect_comparison_results(dbs_to_compare, group)
+                getattr(self, CORPUS_COMPARISON_GROUPS[group][1])(comparison_results)
         else:
             corpus_name = ''
             if self.db_name == NON_TRANSLATED_DB_NAME:
@@ -206,6 +832,17 @@ class SaveToDatabase:
                     Fore.LIGHTGREEN_EX + Style.BRIGHT + f"\n{corpus_name}" + Fore.GREEN + Style.BRIGHT + " НЕ СОДЕРЖИТ НИ ОДНОГО ТЕКСТА" + Fore.RESET)
                 wait_for_enter_to_choose_opt()
 
+    def corpus_pmi_table(self):
+        """
+        Строит таблицу PMI биграммов корпуса по суммам количеств лемм и биграммов, сохраненным при анализе
+        текстов (для текстов, сохраненных до появления этих сумм, они предварительно досчитываются).
+
+        :return: PMITable.
+        """
+        self.backfill_pmi_counts()
+        counts_totals, _ = self.fetch_corpus_feature_sums(PMI_FEATURE_FAMILIES)
+        return PMITable(counts_totals['pmi_lemmas'], counts_totals['pmi_bigrams'])
+
     def calculate_pmi_for_corpus(self, comparison=False, comparison_results=None):
         """Выполняет подсчет PMI для корпуса текстов"""
         if not comparison:
@@ -232,13 +869,9 @@ class SaveToDatabase:
             print(
                 Fore.LIGHTRED_EX + Style.BRIGHT + "Пожалуйста, подождите.\n")
 
-        # Собираем тексты для подсчета PMI
-        self.cursor.execute("SELECT text FROM Text_Passport")
-        texts = self.cursor.fetchall()
-        corpus_set = set(text[0] for text in texts)
-
-        pmi_values, total_above_zero, normalized_bigrams_above_zero = calculate_pmi(
-            corpus_set=corpus_set)
+        pmi_table = self.corpus_pmi_table()
+        total_above_zero = pmi_table.count_above(0)
+        normalized_bigrams_above_zero = total_above_zero / len(pmi_table) if len(pmi_table) > 0 else 0
 
         if comparison and comparison_results is not None:
             comparison_results[self.db_name]['normalized_bigrams_above_zero'] = normalized_bigrams_above_zero
@@ -260,7 +893,7 @@ class SaveToDatabase:
                     print(
                         Fore.LIGHTRED_EX + Style.BRIGHT + "\nВнимание! Вывод значений PMI для всех биграммов может занять"
                                                           " много места на экране. \nБиграммы будут представлены в лемматизированном виде.")
-                    display_pmi_table(pmi_values)
+                    display_pmi_table(pmi_table)
                     wait_for_enter_to_choose_opt()
                     break
                 elif show_bigrams_pmi.lower() == 'n':
@@ -410,9 +1043,9 @@ class SaveToDatabase:
             author_birth_year TEXT
             )""")
 
-            self.cursor.execute("""
+            self.cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS Simplification_features(
-            text_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {TEXT_ID_REFERENCE},
             
             lexical_density REAL NOT NULL,
             
@@ -440,18 +1073,18 @@ class SaveToDatabase:
             all_punct_tokens_count REAL NOT NULL
             )""")
 
-            self.cursor.execute('''
+            self.cursor.execute(f'''
             CREATE TABLE IF NOT EXISTS Normalisation_features(
-            text_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {TEXT_ID_REFERENCE},
             repetition REAL NOT NULL,
             repeated_content_words_count TEXT NOT NULL,
             repeated_content_words REAL NOT NULL,
             total_word_tokens REAL NOT NULL
             )''')
 
-            self.cursor.execute("""
+            self.cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS Explicitation_features (
-            text_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {TEXT_ID_REFERENCE},
             explicit_naming_ratio REAL,
             single_naming REAL,
             
@@ -546,9 +1179,9 @@ class SaveToDatabase:
             refer_to_background_knowledge_freq REAL
             ) """)
 
-            self.cursor.execute("""
+            self.cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS Interference_features(
-            text_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {TEXT_ID_REFERENCE},
             pos_unigrams_counts TEXT NOT NULL,
             pos_unigrams_freq TEXT NOT NULL,
             pos_bigrams_counts  TEXT NOT NULL,
@@ -572,9 +1205,9 @@ class SaveToDatabase:
             func_w_full_contexts TEXT NOT NULL
                    )""")
 
-            self.cursor.execute('''
+            self.cursor.execute(f'''
             CREATE TABLE IF NOT EXISTS Miscellaneous_features(
-            text_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {TEXT_ID_REFERENCE},
             func_words_freq TEXT NOT NULL,
             func_words_counts TEXT NOT NULL,
             
@@ -612,99 +1245,105 @@ class SaveToDatabase:
             readability_index REAL NOT NULL
             )''')
 
-            self.cursor.execute('''
+            self.cursor.execute(f'''
             CREATE TABLE IF NOT EXISTS Morphological_annotation (
-            text_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {TEXT_ID_REFERENCE},
             morph_annotation TEXT NOT NULL
             )''')
 
-            self.cursor.execute('''
+            self.cursor.execute(f'''
             CREATE TABLE IF NOT EXISTS Syntactic_annotation (
-            text_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {TEXT_ID_REFERENCE},
             syntactic_annotation TEXT NOT NULL
             )''')
 
-            self.connection.commit()
+            # Счетчики и частоты в длинном формате для агрегирования по корпусу средствами SQL (GROUP BY)
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS Feature_counts (
+            text_id INTEGER NOT NULL REFERENCES Text_Passport(text_id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+            feature_family TEXT NOT NULL,
+            key TEXT NOT NULL,
+            count INTEGER,
+            freq REAL
+            )''')
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_feature_counts_text ON Feature_counts (text_id)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_feature_counts_family "
+                                "ON Feature_counts (feature_family, key)")
 
-    def insert_morphological_annotation(self, morph_annotation):
+            # Накопленные суммы по корпусу (обновляются при записи и удалении текстов).
+            # Тип столбцов сумм не задан, чтобы суммы целых чисел оставались целыми, как у SUM
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS Corpus_indicator_totals (
+            indicator TEXT PRIMARY KEY,
+            weighted_sum,
+            weight_sum
+            )''')
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS Corpus_feature_totals (
+            feature_family TEXT NOT NULL,
+            key TEXT NOT NULL,
+            count_sum,
+            freq_sum,
+            texts_count INTEGER NOT NULL,
+            first_seen INTEGER NOT NULL,
+            PRIMARY KEY (feature_family, key)
+            )''')
+
+    def insert_morphological_annotation(self, text_id, morph_annotation):
         """Сохраняет морфологическую разметку в базу данных."""
-        self.cursor.execute("""
-            INSERT INTO Morphological_annotation (morph_annotation)
-            VALUES (?)
-        """, (morph_annotation,))
-        self.connection.commit()
+        self._insert("""
+            INSERT INTO Morphological_annotation (text_id, morph_annotation)
+            VALUES (?, ?)
+        """, (text_id, morph_annotation))
 
-    def insert_syntactic_annotation(self, syntactic_annotation):
+    def insert_syntactic_annotation(self, text_id, syntactic_annotation):
         """Сохраняет синтаксическую разметку в базу данных."""
-        self.cursor.execute("""
-            INSERT INTO Syntactic_annotation (syntactic_annotation)
-            VALUES (?)
-        """, (syntactic_annotation,))
-        self.connection.commit()
+        self._insert("""
+            INSERT INTO Syntactic_annotation (text_id, syntactic_annotation)
+            VALUES (?, ?)
+        """, (text_id, syntactic_annotation))
 
-    def insert_simplification_features(self, lexical_density, ttr_lex_variety,
+    def insert_simplification_features(self, text_id, lexical_density, ttr_lex_variety,
                                        log_ttr_lex_variety, modified_lex_variety, mean_word_length,
                                        syllable_ratio, total_syllables_count, tokens_mean_sent_length,
                                        chars_mean_sent_length, mean_word_rank_1, mean_word_rank_2, most_freq_words,
                                        types_counts, all_tokens_count, alpha_tokens_count, all_punct_tokens_count):
         """Вставка данных в таблицу Simplification_features"""
-        self.cursor.execute('''
-        INSERT INTO Simplification_features (lexical_density, ttr_lex_variety,
+        self._insert('''
+        INSERT INTO Simplification_features (text_id, lexical_density, ttr_lex_variety,
                                              log_ttr_lex_variety, modified_lex_variety, mean_word_length, 
                                              syllable_ratio, total_syllables_count, tokens_mean_sent_length, 
                                              chars_mean_sent_length,  mean_word_rank_1, mean_word_rank_2, most_freq_words,
                                              types_counts, all_tokens_count, alpha_tokens_count, all_punct_tokens_count)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (lexical_density, ttr_lex_variety, log_ttr_lex_variety,
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (text_id, lexical_density, ttr_lex_variety, log_ttr_lex_variety,
               modified_lex_variety, mean_word_length, syllable_ratio, total_syllables_count,
               tokens_mean_sent_length, chars_mean_sent_length, mean_word_rank_1, mean_word_rank_2, most_freq_words,
               types_counts, all_tokens_count, alpha_tokens_count, all_punct_tokens_count))
-        self.connection.commit()
+        self.insert_feature_counts(text_id, 'Simplification_features', {'types_counts': types_counts})
 
-    def insert_normalisation_features(self, repetition, repeated_content_words_count, repeated_content_words,
+    def insert_normalisation_features(self, text_id, repetition, repeated_content_words_count, repeated_content_words,
                                       total_word_tokens):
         """Вставка данных в таблицу Normalisation_features"""
-        self.cursor.execute('''
-        INSERT INTO Normalisation_features (repetition, repeated_content_words_count, 
+        self._insert('''
+        INSERT INTO Normalisation_features (text_id, repetition, repeated_content_words_count, 
         repeated_content_words, total_word_tokens)
-        VALUES (?, ?, ?, ?)
-        ''', (repetition, repeated_content_words_count, repeated_content_words, total_word_tokens))
-        self.connection.commit()
+        VALUES (?, ?, ?, ?, ?)
+        ''', (text_id, repetition, repeated_content_words_count, repeated_content_words, total_word_tokens))
 
-    def insert_explicitation_features(self, explicit_naming_ratio, single_naming, mean_multiple_naming, single_entities,
-                                      single_entities_count, multiple_entities, multiple_entities_count, named_entities,
-                                      named_entities_count, total_tokens_with_dms,
-                                      sci_markers_total_count, found_sci_dms, markers_counts,
-                                      topic_intro_dm_count, topic_intro_dm_in_ord, topic_intro_dm_freq,
-                                      info_sequence_count, info_sequence_in_ord, info_sequence_freq,
-                                      illustration_dm_count, illustration_dm_in_ord, illustration_dm_freq,
-                                      material_sequence_count, material_sequence_in_ord, material_sequence_freq,
-                                      conclusion_dm_count, conclusion_dm_in_ord, conclusion_dm_freq,
-                                      intro_new_addit_info_count, intro_new_addit_info_in_ord,
-                                      intro_new_addit_info_freq,
-                                      info_explanation_or_repetition_count, info_explanation_or_repetition_in_ord,
-                                      info_explanation_or_repetition_freq,
-                                      contrast_dm_count, contrast_dm_in_ord, contrast_dm_freq,
-                                      examples_introduction_dm_count, examples_introduction_dm_in_ord,
-                                      examples_introduction_dm_freq,
-                                      author_opinion_count, author_opinion_in_ord, author_opinion_freq,
-                                      author_attitude_count, author_attitude_in_ord, author_attitude_freq,
-                                      high_certainty_modal_words_count, high_certainty_modal_words_in_ord,
-                                      high_certainty_modal_words_freq,
-                                      moderate_certainty_modal_words_count, moderate_certainty_modal_words_in_ord,
-                                      moderate_certainty_modal_words_freq,
-                                      uncertainty_modal_words_count, uncertainty_modal_words_in_ord,
-                                      uncertainty_modal_words_freq,
-                                      call_to_action_dm_count, call_to_action_dm_in_ord, call_to_action_dm_freq,
-                                      joint_action_count, joint_action_in_ord, joint_action_freq,
-                                      putting_emphasis_dm_count, putting_emphasis_dm_in_ord, putting_emphasis_dm_freq,
-                                      refer_to_background_knowledge_count, refer_to_background_knowledge_in_ord,
-                                      refer_to_background_knowledge_freq):
-        """Вставка данных в таблицу Explicitation_features"""
-        self.cursor.execute('''
-        INSERT INTO Explicitation_features (explicit_naming_ratio, single_naming, mean_multiple_naming, single_entities,
-                                      single_entities_count, multiple_entities, multiple_entities_count, named_entities,
-                                      named_entities_count, total_tokens_with_dms,
+    def insert_explicitation_features(self, text_id, explicit_naming_ratio, single_naming, mean_multiple_naming,
+                                      single_entities, single_entities_count, multiple_entities,
+                                      multiple_entities_count, named_entities, named_entities_count, dm_result):
+        """
+        Вставка данных в таблицу Explicitation_features.
+
+        Результаты поиска дискурсивных маркеров передаются одним объектом DiscourseMarkersResult
+        и раскладываются по столбцам методом as_db_values.
+        """
+        self._insert('''
+        INSERT INTO Explicitation_features (text_id, explicit_naming_ratio, single_naming, mean_multiple_naming,
+                                      single_entities, single_entities_count, multiple_entities,
+                                      multiple_entities_count, named_entities, named_entities_count, total_tokens_with_dms,
                                       sci_markers_total_count, found_sci_dms, markers_counts,
                                       topic_intro_dm_count, topic_intro_dm_in_ord, topic_intro_dm_freq,
                                       info_sequence_count, info_sequence_in_ord, info_sequence_freq,
@@ -731,38 +1370,12 @@ class SaveToDatabase:
                                       refer_to_background_knowledge_freq
                                       
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (explicit_naming_ratio, single_naming, mean_multiple_naming, single_entities,
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (text_id, explicit_naming_ratio, single_naming, mean_multiple_naming, single_entities,
               single_entities_count, multiple_entities, multiple_entities_count, named_entities,
-              named_entities_count, total_tokens_with_dms,
-              sci_markers_total_count, found_sci_dms, markers_counts,
-              topic_intro_dm_count, topic_intro_dm_in_ord, topic_intro_dm_freq,
-              info_sequence_count, info_sequence_in_ord, info_sequence_freq,
-              illustration_dm_count, illustration_dm_in_ord, illustration_dm_freq,
-              material_sequence_count, material_sequence_in_ord, material_sequence_freq,
-              conclusion_dm_count, conclusion_dm_in_ord, conclusion_dm_freq,
-              intro_new_addit_info_count, intro_new_addit_info_in_ord, intro_new_addit_info_freq,
-              info_explanation_or_repetition_count, info_explanation_or_repetition_in_ord,
-              info_explanation_or_repetition_freq,
-              contrast_dm_count, contrast_dm_in_ord, contrast_dm_freq,
-              examples_introduction_dm_count, examples_introduction_dm_in_ord,
-              examples_introduction_dm_freq,
-              author_opinion_count, author_opinion_in_ord, author_opinion_freq,
-              author_attitude_count, author_attitude_in_ord, author_attitude_freq,
-              high_certainty_modal_words_count, high_certainty_modal_words_in_ord,
-              high_certainty_modal_words_freq,
-              moderate_certainty_modal_words_count, moderate_certainty_modal_words_in_ord,
-              moderate_certainty_modal_words_freq,
-              uncertainty_modal_words_count, uncertainty_modal_words_in_ord, uncertainty_modal_words_freq,
-              call_to_action_dm_count, call_to_action_dm_in_ord, call_to_action_dm_freq,
-              joint_action_count, joint_action_in_ord, joint_action_freq,
-              putting_emphasis_dm_count, putting_emphasis_dm_in_ord, putting_emphasis_dm_freq,
-              refer_to_background_knowledge_count, refer_to_background_knowledge_in_ord,
-              refer_to_background_knowledge_freq
-              ))
-        self.connection.commit()
+              named_entities_count) + dm_result.as_db_values())
 
-    def insert_interference_features(self, pos_unigrams_counts, pos_unigrams_freq, pos_bigrams_counts,
+    def insert_interference_features(self, text_id, pos_unigrams_counts, pos_unigrams_freq, pos_bigrams_counts,
                                      pos_bigrams_freq, pos_trigrams_counts, pos_trigrams_freq,
                                      char_unigram_counts, char_unigram_freq, char_bigram_counts,
                                      char_bigram_freq, char_trigram_counts, char_trigram_freq,
@@ -770,8 +1383,8 @@ class SaveToDatabase:
                                      token_positions_in_sent, func_w_trigrams_freqs, func_w_trigram_with_pos_counts,
                                      func_w_full_contexts):
         """Вставка данных в таблицу Interference_features"""
-        self.cursor.execute('''
-        INSERT INTO Interference_features (pos_unigrams_counts, pos_unigrams_freq, pos_bigrams_counts, 
+        self._insert('''
+        INSERT INTO Interference_features (text_id, pos_unigrams_counts, pos_unigrams_freq, pos_bigrams_counts, 
                                            pos_bigrams_freq, pos_trigrams_counts, pos_trigrams_freq, 
                                            char_unigram_counts, char_unigram_freq, char_bigram_counts, 
                                            char_bigram_freq, char_trigram_counts, char_trigram_freq, 
@@ -779,15 +1392,26 @@ class SaveToDatabase:
                                            token_positions_counts, token_positions_in_sent, func_w_trigrams_freqs, 
                                            func_w_trigram_with_pos_counts, 
                                            func_w_full_contexts)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (pos_unigrams_counts, pos_unigrams_freq, pos_bigrams_counts, pos_bigrams_freq,
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (text_id, pos_unigrams_counts, pos_unigrams_freq, pos_bigrams_counts, pos_bigrams_freq,
               pos_trigrams_counts, pos_trigrams_freq, char_unigram_counts, char_unigram_freq,
               char_bigram_counts, char_bigram_freq, char_trigram_counts, char_trigram_freq,
               token_positions_normalized_frequencies, token_positions_counts, token_positions_in_sent,
               func_w_trigrams_freqs, func_w_trigram_with_pos_counts, func_w_full_contexts))
-        self.connection.commit()
-
-    def insert_miscellaneous_features(self, func_words_freq, func_words_counts,
+        self.insert_feature_counts(text_id, 'Interference_features', {
+            'pos_unigrams_counts': pos_unigrams_counts, 'pos_unigrams_freq': pos_unigrams_freq,
+            'pos_bigrams_counts': pos_bigrams_counts, 'pos_bigrams_freq': pos_bigrams_freq,
+            'pos_trigrams_counts': pos_trigrams_counts, 'pos_trigrams_freq': pos_trigrams_freq,
+            'char_unigram_counts': char_unigram_counts, 'char_unigram_freq': char_unigram_freq,
+            'char_bigram_counts': char_bigram_counts, 'char_bigram_freq': char_bigram_freq,
+            'char_trigram_counts': char_trigram_counts, 'char_trigram_freq': char_trigram_freq,
+            'func_w_trigram_with_pos_counts': func_w_trigram_with_pos_counts,
+            'func_w_trigrams_freqs': func_w_trigrams_freqs,
+            'token_positions_counts': token_positions_counts,
+            'token_positions_normalized_frequencies': token_positions_normalized_frequencies,
+        })
+
+    def insert_miscellaneous_features(self, text_id, func_words_freq, func_words_counts,
                                       pers_possessive_pronouns_frequencies, pers_possessive_pronouns_counts,
                                       reflexive_pronoun_frequencies, reflexive_pronoun_counts,
                                       demonstrative_pronouns_frequencies, demonstrative_pronouns_counts,
@@ -800,8 +1424,8 @@ class SaveToDatabase:
                                       passive_verbs, passive_verbs_count, all_verbs, all_verbs_count,
                                       readability_index):
         """Вставка данных в таблицу Miscellaneous_features"""
-        self.cursor.execute('''
-        INSERT INTO Miscellaneous_features (func_words_freq, func_words_counts,
+        self._insert('''
+        INSERT INTO Miscellaneous_features (text_id, func_words_freq, func_words_counts,
         pers_possessive_pronouns_frequencies, pers_possessive_pronouns_counts,
         reflexive_pronoun_frequencies, reflexive_pronoun_counts,
         demonstrative_pronouns_frequencies, demonstrative_pronouns_counts,
@@ -811,8 +1435,8 @@ class SaveToDatabase:
         negative_pronouns_frequencies, negative_pronouns_counts,
         punct_marks_normalized_frequency, punct_marks_to_all_punct_frequency, punctuation_counts, passive_to_all_v_ratio,
         passive_verbs, passive_verbs_count, all_verbs, all_verbs_count, readability_index)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (func_words_freq, func_words_counts,
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (text_id, func_words_freq, func_words_counts,
               pers_possessive_pronouns_frequencies, pers_possessive_pronouns_counts,
               reflexive_pronoun_frequencies, reflexive_pronoun_counts,
               demonstrative_pronouns_frequencies, demonstrative_pronouns_counts,
@@ -823,18 +1447,61 @@ class SaveToDatabase:
               punct_marks_normalized_frequency, punct_marks_to_all_punct_frequency, punctuation_counts,
               passive_to_all_v_ratio, passive_verbs, passive_verbs_count, all_verbs, all_verbs_count,
               readability_index))
-        self.connection.commit()
+        self.insert_feature_counts(text_id, 'Miscellaneous_features', {
+            'func_words_counts': func_words_counts, 'func_words_freq': func_words_freq,
+            'pers_possessive_pronouns_counts': pers_possessive_pronouns_counts,
+            'pers_possessive_pronouns_frequencies': pers_possessive_pronouns_frequencies,
+            'reflexive_pronoun_counts': reflexive_pronoun_counts,
+            'reflexive_pronoun_frequencies': reflexive_pronoun_frequencies,
+            'demonstrative_pronouns_counts': demonstrative_pronouns_counts,
+            'demonstrative_pronouns_frequencies': demonstrative_pronouns_frequencies,
+            'defining_pronouns_counts': defining_pronouns_counts,
+            'defining_pronouns_frequencies': defining_pronouns_frequencies,
+            'relative_pronouns_counts': relative_pronouns_counts,
+            'relative_pronouns_frequencies': relative_pronouns_frequencies,
+            'indefinite_pronouns_counts': indefinite_pronouns_counts,
+            'indefinite_pronouns_frequencies': indefinite_pronouns_frequencies,
+            'negative_pronouns_counts': negative_pronouns_counts,
+            'negative_pronouns_frequencies': negative_pronouns_frequencies,
+            'punctuation_counts': punctuation_counts,
+            'punct_marks_normalized_frequency': punct_marks_normalized_frequency,
+            'punct_marks_to_all_punct_frequency': punct_marks_to_all_punct_frequency,
+        })
 
     def insert_text_passport(self, text, title, subject_area, keywords, publication_year, published_in,
                              authors, author_gender, author_birth_year):
-        """Вставка данных в таблицу Text_Passport"""
-        self.cursor.execute('''
-        INSERT INTO Text_Passport (text, title, subject_area, keywords, publication_year, published_in,
+        """
+        Вставка данных в таблицу Text_Passport.
+
+        :return: text_id, под которым текст сохранен; его принимают методы insert_* остальных таблиц.
+        """
+        query = '''
+        INSERT INTO Text_Passport (text_id, text, title, subject_area, keywords, publication_year, published_in,
          authors, author_gender, author_birth_year)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (text, title, subject_area, keywords, publication_year, published_in,
-              authors, author_gender, author_birth_year))
-        self.connection.commit()
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        # Вне транзакции id выдает AUTOINCREMENT, при отложенной записи он резервируется заранее
+        text_id = None if self._pending is None else self._reserve_text_id()
+        if text_id is not None:
+            self._pending_text_ids.append(text_id)
+        self._insert(query, (text_id, text, title, subject_area, keywords, publication_year, published_in,
+                             authors, author_gender, author_birth_year))
+        return self.cursor.lastrowid if text_id is None else text_id
+
+    def _reserve_text_id(self):
+        """
+        Резервирует следующий text_id для текста, строки которого будут записаны позже (flush).
+
+        Предполагается единственный писатель в базу данных; id, не записанные из-за отката, не переиспользуются
+        (как и при AUTOINCREMENT).
+        """
+        if self._next_text_id is None:
+            last_id = self.cursor.execute("SELECT MAX(text_id) FROM Text_Passport").fetchone()[0] or 0
+            sequence = self.cursor.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'Text_Passport'").fetchone()
+            self._next_text_id = max(last_id, sequence[0] if sequence else 0)
+        self._next_text_id += 1
+        return self._next_text_id
 
     def fetch_text_passport(self, text_id=None):
         """Извлечение данных паспорта текста из базы данных.
@@ -958,7 +1625,7 @@ class SaveToDatabase:
             SELECT explicit_naming_ratio, single_naming, mean_multiple_naming, single_entities,
                    single_entities_count, multiple_entities, multiple_entities_count, named_entities,
                    named_entities_count,
-                   sci_markers_total_count, markers_counts,
+                   total_tokens_with_dms, sci_markers_total_count, found_sci_dms, markers_counts,
                    topic_intro_dm_count, topic_intro_dm_in_ord, topic_intro_dm_freq,
                    info_sequence_count, info_sequence_in_ord, info_sequence_freq,
                    illustration_dm_count, illustration_dm_in_ord, illustration_dm_freq,
@@ -986,29 +1653,8 @@ class SaveToDatabase:
         if explicitation_data:
             (explicit_naming_ratio, single_naming, mean_multiple_naming, single_entities,
              single_entities_count, multiple_entities, multiple_entities_count, named_entities,
-             named_entities_count,
-             sci_markers_total_count, markers_counts,
-             topic_intro_dm_count, topic_intro_dm_in_ord, topic_intro_dm_freq,
-             info_sequence_count, info_sequence_in_ord, info_sequence_freq,
-             illustration_dm_count, illustration_dm_in_ord, illustration_dm_freq,
-             material_sequence_count, material_sequence_in_ord, material_sequence_freq,
-             conclusion_dm_count, conclusion_dm_in_ord, conclusion_dm_freq,
-             intro_new_addit_info_count, intro_new_addit_info_in_ord, intro_new_addit_info_freq,
-             info_explanation_or_repetition_count, info_explanation_or_repetition_in_ord,
-             info_explanation_or_repetition_freq,
-             contrast_dm_count, contrast_dm_in_ord, contrast_dm_freq,
-             examples_introduction_dm_count, examples_introduction_dm_in_ord, examples_introduction_dm_freq,
-             author_opinion_count, author_opinion_in_ord, author_opinion_freq,
-             author_attitude_count, author_attitude_in_ord, author_attitude_freq,
-             high_certainty_modal_words_count, high_certainty_modal_words_in_ord, high_certainty_modal_words_freq,
-             moderate_certainty_modal_words_count, moderate_certainty_modal_words_in_ord,
-             moderate_certainty_modal_words_freq,
-             uncertainty_modal_words_count, uncertainty_modal_words_in_ord, uncertainty_modal_words_freq,
-             call_to_action_dm_count, call_to_action_dm_in_ord, call_to_action_dm_freq,
-             joint_action_count, joint_action_in_ord, joint_action_freq,
-             putting_emphasis_dm_count, putting_emphasis_dm_in_ord, putting_emphasis_dm_freq,
-             refer_to_background_knowledge_count, refer_to_background_knowledge_in_ord,
-             refer_to_background_knowledge_freq) = explicitation_data
+             named_entities_count) = explicitation_data[:9]
+            dm_result = DiscourseMarkersResult.from_db_values(explicitation_data[9:])
 
             print("\n" + Fore.LIGHTWHITE_EX + "*" * 80)
             print(
@@ -1030,32 +1676,7 @@ class SaveToDatabase:
             wait_for_enter_to_analyze()
             display_entities(named_entities, named_entities_count)
             wait_for_enter_to_analyze()
-            print_dm_analysis_results(sci_markers_total_count, markers_counts,
-                                      topic_intro_dm_count, topic_intro_dm_in_ord, topic_intro_dm_freq,
-                                      info_sequence_count, info_sequence_in_ord, info_sequence_freq,
-                                      illustration_dm_count, illustration_dm_in_ord, illustration_dm_freq,
-                                      material_sequence_count, material_sequence_in_ord, material_sequence_freq,
-                                      conclusion_dm_count, conclusion_dm_in_ord, conclusion_dm_freq,
-                                      intro_new_addit_info_count, intro_new_addit_info_in_ord,
-                                      intro_new_addit_info_freq,
-                                      info_explanation_or_repetition_count, info_explanation_or_repetition_in_ord,
-                                      info_explanation_or_repetition_freq,
-                                      contrast_dm_count, contrast_dm_in_ord, contrast_dm_freq,
-                                      examples_introduction_dm_count, examples_introduction_dm_in_ord,
-                                      examples_introduction_dm_freq,
-                                      author_opinion_count, author_opinion_in_ord, author_opinion_freq,
-                                      author_attitude_count, author_attitude_in_ord, author_attitude_freq,
-                                      high_certainty_modal_words_count, high_certainty_modal_words_in_ord,
-                                      high_certainty_modal_words_freq,
-                                      moderate_certainty_modal_words_count, moderate_certainty_modal_words_in_ord,
-                                      moderate_certainty_modal_words_freq,
-                                      uncertainty_modal_words_count, uncertainty_modal_words_in_ord,
-                                      uncertainty_modal_words_freq,
-                                      call_to_action_dm_count, call_to_action_dm_in_ord, call_to_action_dm_freq,
-                                      joint_action_count, joint_action_in_ord, joint_action_freq,
-                                      putting_emphasis_dm_count, putting_emphasis_dm_in_ord, putting_emphasis_dm_freq,
-                                      refer_to_background_knowledge_count, refer_to_background_knowledge_in_ord,
-                                      refer_to_background_knowledge_freq)
+            print_dm_analysis_results(dm_result)
         else:
             print(
                 Fore.LIGHTRED_EX + Style.BRIGHT + "Результаты анализа экспликации для этого текста не найдены." +
@@ -1198,26 +1819,82 @@ class SaveToDatabase:
             sentences_info = json.loads(result[0])
             display_morphological_annotation(sentences_info)
 
+    def fetch_corpus_indicator_totals(self, indicators):
+        """
+        Возвращает накопленные суммы индикаторов по корпусу (таблица Corpus_indicator_totals).
+
+        :param indicators: Названия индикаторов (первые элементы CORPUS_INDICATORS).
+        :return: Словарь {индикатор: (SUM(вес * значение), SUM(вес))}; (None, None), если текстов нет.
+        """
+        self.ensure_corpus_totals()
+        self.cursor.execute(f"""
+            SELECT indicator, weighted_sum, weight_sum FROM Corpus_indicator_totals
+            WHERE indicator IN ({', '.join('?' * len(indicators))})
+        """, list(indicators))
+        totals = {indicator: (weighted_sum, weight_sum) for indicator, weighted_sum, weight_sum in self.cursor}
+        return {indicator: totals.get(indicator, (None, None)) for indicator in indicators}
+
+    def fetch_corpus_averages(self, table, columns):
+        """
+        Возвращает взвешенные средние значения индикаторов по корпусу из накопленных сумм.
+
+        :param table: Таблица индикаторов.
+        :param columns: Столбцы таблицы.
+        :return: Кортеж средних в порядке columns (None, если данных нет).
+        """
+        totals = self.fetch_corpus_indicator_totals([f"{table}.{column}" for column in columns])
+        return tuple(weighted_sum / weight_sum if weighted_sum is not None and weight_sum else None
+                     for weighted_sum, weight_sum in totals.values())
+
+    def fetch_corpus_feature_sums(self, families):
+        """
+        Возвращает накопленные суммы количеств и частот по корпусу (таблица Corpus_feature_totals).
+
+        Значения текстов умножены на вес семейства (FEATURE_FAMILY_WEIGHTS).
+
+        :param families: Семейства признаков. Семейство с двоеточием на конце (например, 'token_positions:')
+            обозначает все вложенные семейства с этим префиксом.
+        :return: Кортеж (количества, частоты) вида {семейство: {ключ: сумма}}, для вложенных семейств
+            {семейство: {категория: {ключ: сумма}}}. Ключи упорядочены по первому появлению в корпусе.
+        """
+        self.ensure_corpus_totals()
+        conditions = []
+        params = []
+        counts_totals = {}
+        freqs_totals = {}
+        for family in families:
+            if family.endswith(':'):
+                conditions.append("feature_family GLOB ?")
+                params.append(family + '*')
+                counts_totals[family[:-1]] = defaultdict(dict)
+                freqs_totals[family[:-1]] = defaultdict(dict)
+            else:
+                conditions.append("feature_family = ?")
+                params.append(family)
+                counts_totals[family] = {}
+                freqs_totals[family] = {}
+
+        self.cursor.execute(f'''
+            SELECT feature_family, key, count_sum, freq_sum
+            FROM Corpus_feature_totals
+            WHERE {' OR '.join(conditions)}
+            ORDER BY first_seen
+        ''', params)
+
+        for family, key, count_sum, freq_sum in self.cursor.fetchall():
+            family, _, group = family.partition(':')
+            counts = counts_totals[family][group] if group else counts_totals[family]
+            freqs = freqs_totals[family][group] if group else freqs_totals[family]
+            if count_sum is not None:
+                counts[key] = count_sum
+            if freq_sum is not None:
+                freqs[key] = freq_sum
+        return counts_totals, freqs_totals
+
     def display_simplification_features_for_corpus(self, comparison=False, comparison_results=None):
         """Отображает средние показатели индикаторов универсалии Simplification."""
-        # Выполняем запрос на извлечение взвешенных значений индикаторов
-        self.cursor.execute('''
-            SELECT 
-                SUM(alpha_tokens_count * lexical_density) / SUM(alpha_tokens_count),
-                SUM(alpha_tokens_count * ttr_lex_variety) / SUM(alpha_tokens_count),
-                SUM(alpha_tokens_count * log_ttr_lex_variety) / SUM(alpha_tokens_count),
-                SUM(alpha_tokens_count * modified_lex_variety) / SUM(alpha_tokens_count),
-                SUM(alpha_tokens_count * mean_word_length) / SUM(alpha_tokens_count),
-                SUM(alpha_tokens_count * syllable_ratio) / SUM(alpha_tokens_count),
-                SUM(alpha_tokens_count * total_syllables_count) / SUM(alpha_tokens_count),
-                SUM(alpha_tokens_count * tokens_mean_sent_length) / SUM(alpha_tokens_count),
-                SUM(all_tokens_count * chars_mean_sent_length) / SUM(all_tokens_count),
-                SUM(alpha_tokens_count * mean_word_rank_1) / SUM(alpha_tokens_count),
-                SUM(alpha_tokens_count * mean_word_rank_2) / SUM(alpha_tokens_count)
-            FROM Simplification_features
-        ''')
-
-        result = self.cursor.fetchone()
+        # Взвешенные средние значения индикаторов из накопленных сумм по корпусу
+        result = self.fetch_corpus_averages('Simplification_features', SIMPLIFICATION_CORPUS_COLUMNS)
 
         if result:
             (avg_lexical_density, avg_ttr_lex_variety, avg_log_ttr_lex_variety, avg_modified_lex_variety,
@@ -1265,26 +1942,17 @@ class SaveToDatabase:
                 print(Fore.LIGHTWHITE_EX + "*" * 80)
                 wait_for_enter_to_analyze()
 
-            # Извлекаем types_counts и alpha_tokens_count из базы данных
-            self.cursor.execute('SELECT types_counts, alpha_tokens_count FROM Simplification_features')
-            types_counts_results = self.cursor.fetchall()
-
-            # Считаем общую сумму токенов по всему корпусу
-            total_tokens = 0
-            combined_counts = defaultdict(int)
-
-            # Считаем частоты слов по всему корпусу
-            for row in types_counts_results:
-                types_counts = json.loads(row[0])  # Преобразуем JSON обратно в словарь
-                alpha_tokens_count = row[1]  # Получаем количество токенов для текущего текста
-                total_tokens += alpha_tokens_count  # Суммируем общее количество токенов
-
-                # Объединяем частоты слов
-                for word, count in types_counts.items():
-                    combined_counts[word] += count
+            # Общая сумма токенов по всему корпусу
+            total_tokens = self.fetch_corpus_indicator_totals([CORPUS_TEXTS_INDICATOR])[CORPUS_TEXTS_INDICATOR][0]
 
-            # Сортируем по частоте и берем 50 самых частотных слов
-            sorted_combined_counts = sorted(combined_counts.items(), key=lambda item: item[1], reverse=True)[:50]
+            # 50 самых частотных слов корпуса (при равной частоте - в порядке первого появления)
+            self.cursor.execute('''
+                SELECT key, count_sum FROM Corpus_feature_totals
+                WHERE feature_family = 'types'
+                ORDER BY count_sum DESC, first_seen
+                LIMIT 50
+            ''')
+            sorted_combined_counts = self.cursor.fetchall()
 
             if not comparison:
                 print(Fore.LIGHTWHITE_EX + "*" * 80)
@@ -1311,16 +1979,7 @@ class SaveToDatabase:
     def display_normalisation_features_for_corpus(self, comparison=False, comparison_results=None):
         """Отображение средних значений индикаторов универсалии Normalisation"""
 
-        self.cursor.execute('''
-            SELECT 
-                SUM(Simplification_features.alpha_tokens_count * Normalisation_features.repetition) / SUM(Simplification_features.alpha_tokens_count),
-                SUM(Simplification_features.alpha_tokens_count * Normalisation_features.repeated_content_words) / SUM(Simplification_features.alpha_tokens_count),
-                SUM(Simplification_features.alpha_tokens_count * Normalisation_features.total_word_tokens) / SUM(Simplification_features.alpha_tokens_count)
-            FROM Normalisation_features
-            JOIN Simplification_features ON Normalisation_features.text_id = Simplification_features.text_id
-        ''')
-
-        result = self.cursor.fetchone()
+        result = self.fetch_corpus_averages('Normalisation_features', NORMALISATION_CORPUS_COLUMNS)
 
         if result:
             avg_repetition, avg_repeated_content_words, avg_total_word_tokens = result
@@ -1350,73 +2009,7 @@ class SaveToDatabase:
 
     def display_explicitation_features_for_corpus(self, comparison=False, comparison_results=None):
         """Отображает средние показатели индикаторов универсалии Explicitation"""
-        self.cursor.execute('''
-            SELECT 
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.explicit_naming_ratio) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.single_naming) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.mean_multiple_naming) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.single_entities_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.multiple_entities_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.named_entities_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.sci_markers_total_count) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.topic_intro_dm_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.topic_intro_dm_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.info_sequence_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.info_sequence_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.illustration_dm_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.illustration_dm_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.material_sequence_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.material_sequence_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.conclusion_dm_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.conclusion_dm_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.intro_new_addit_info_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.intro_new_addit_info_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.info_explanation_or_repetition_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.info_explanation_or_repetition_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.contrast_dm_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.contrast_dm_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.examples_introduction_dm_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.examples_introduction_dm_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.author_opinion_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.author_opinion_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.author_attitude_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.author_attitude_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.high_certainty_modal_words_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.high_certainty_modal_words_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.moderate_certainty_modal_words_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.moderate_certainty_modal_words_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.uncertainty_modal_words_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.uncertainty_modal_words_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.call_to_action_dm_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.call_to_action_dm_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.joint_action_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.joint_action_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.putting_emphasis_dm_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.putting_emphasis_dm_freq) / SUM(Explicitation_features.total_tokens_with_dms),
-
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.refer_to_background_knowledge_count) / SUM(Explicitation_features.total_tokens_with_dms),
-                SUM(Explicitation_features.total_tokens_with_dms * Explicitation_features.refer_to_background_knowledge_freq) / SUM(Explicitation_features.total_tokens_with_dms)
-            FROM Explicitation_features
-        ''')
-
-        result = self.cursor.fetchone()
+        result = self.fetch_corpus_averages('Explicitation_features', EXPLICITATION_CORPUS_COLUMNS)
 
         if result:
             (
@@ -1541,16 +2134,8 @@ class SaveToDatabase:
     def display_miscellaneous_features_for_corpus(self, comparison=False, comparison_results=None):
         """Отображение взвешенных средних показателей индикаторов Miscellaneous_features."""
 
-        # Извлечение агрегированных данных для количественных показателей
-        self.cursor.execute('''
-            SELECT SUM(alpha_tokens_count * passive_to_all_v_ratio) / SUM(alpha_tokens_count),
-                   SUM(alpha_tokens_count * passive_verbs_count) / SUM(alpha_tokens_count),
-                   SUM(alpha_tokens_count * all_verbs_count) / SUM(alpha_tokens_count),
-                   SUM(alpha_tokens_count * readability_index) / SUM(alpha_tokens_count)
-            FROM Miscellaneous_features
-            JOIN Simplification_features ON Miscellaneous_features.text_id = Simplification_features.text_id
-        ''')
-        result_aggregated = self.cursor.fetchone()
+        # Взвешенные средние количественных показателей из накопленных сумм по корпусу
+        result_aggregated = self.fetch_corpus_averages('Miscellaneous_features', MISCELLANEOUS_CORPUS_COLUMNS)
 
         if result_aggregated:
             avg_passive_to_all_v_ratio, avg_passive_verbs_count, avg_all_verbs_count, avg_readability_index = result_aggregated
@@ -1582,219 +2167,65 @@ class SaveToDatabase:
                 console.print(table)
                 wait_for_enter_to_analyze()
 
-        self.cursor.execute('''
-            SELECT func_words_freq, 
-                   func_words_counts,
-                   punct_marks_normalized_frequency, 
-                   punct_marks_to_all_punct_frequency,
-                   punctuation_counts,
-                   pers_possessive_pronouns_frequencies,
-                   pers_possessive_pronouns_counts,
-                   reflexive_pronoun_frequencies, 
-                   reflexive_pronoun_counts,
-                   demonstrative_pronouns_frequencies, 
-                   demonstrative_pronouns_counts,
-                   defining_pronouns_frequencies, 
-                   defining_pronouns_counts,
-                   relative_pronouns_frequencies,
-                   relative_pronouns_counts,
-                   indefinite_pronouns_frequencies,
-                   indefinite_pronouns_counts,
-                   negative_pronouns_frequencies,
-                   negative_pronouns_counts,
-                   alpha_tokens_count,
-                   all_tokens_count
-            FROM Miscellaneous_features
-            JOIN Simplification_features ON Miscellaneous_features.text_id = Simplification_features.text_id
-        ''')
-        result_json = self.cursor.fetchall()
-
-        if result_json:
-            # Инициализация накопителей для взвешенных значений
-            func_words_freq_weighted = defaultdict(float)
-            func_words_counts_weighted = defaultdict(float)
-
-            punct_normalized_weighted = defaultdict(float)
-            punct_to_all_weighted = defaultdict(float)
-            punctuation_counts_weighted = defaultdict(float)
-
-            pronoun_freq_accum = {
-                'pers_possessive': defaultdict(float),
-                'reflexive': defaultdict(float),
-                'demonstrative': defaultdict(float),
-                'defining': defaultdict(float),
-                'relative': defaultdict(float),
-                'indefinite': defaultdict(float),
-                'negative': defaultdict(float)
-            }
-
-            pronoun_counts_accum = {
-                'pers_possessive': defaultdict(float),
-                'reflexive': defaultdict(float),
-                'demonstrative': defaultdict(float),
-                'defining': defaultdict(float),
-                'relative': defaultdict(float),
-                'indefinite': defaultdict(float),
-                'negative': defaultdict(float)
-            }
-
-            total_tokens_sum = 0
-            total_tokens_sum_with_punct = 0
-            # Проходим по каждому тексту
-            for row in result_json:
-                (func_words_freq_json, func_words_counts_json, punct_norm_json,
-                 punct_to_all_json, punctuation_counts_json,
-                 pers_possessive_pronouns_frequencies,
-                 pers_possessive_pronouns_counts,
-                 reflexive_pronoun_frequencies,
-                 reflexive_pronoun_counts,
-                 demonstrative_pronouns_frequencies,
-                 demonstrative_pronouns_counts,
-                 defining_pronouns_frequencies,
-                 defining_pronouns_counts,
-                 relative_pronouns_frequencies,
-                 relative_pronouns_counts,
-                 indefinite_pronouns_frequencies,
-                 indefinite_pronouns_counts,
-                 negative_pronouns_frequencies,
-                 negative_pronouns_counts,
-                 alpha_tokens_count,
-                 all_tokens_count) = row
-
-                total_tokens_sum += alpha_tokens_count  # Суммируем количество токенов
-                total_tokens_sum_with_punct += all_tokens_count
-
-                # Обрабатываем JSON-поля
-                func_words_freq = json.loads(func_words_freq_json)
-                func_words_counts = json.loads(func_words_counts_json)
-                punct_marks_normalized_frequency = json.loads(punct_norm_json)
-                punct_marks_to_all_punct_frequency = json.loads(punct_to_all_json)
-                punctuation_counts = json.loads(punctuation_counts_json)
-                pers_possessive_pronouns_frequencies = json.loads(pers_possessive_pronouns_frequencies)
-                pers_possessive_pronouns_counts = json.loads(pers_possessive_pronouns_counts)
-
-                reflexive_pronoun_frequencies = json.loads(reflexive_pronoun_frequencies)
-                reflexive_pronoun_counts = json.loads(reflexive_pronoun_counts)
-
-                demonstrative_pronouns_frequencies = json.loads(demonstrative_pronouns_frequencies)
-                demonstrative_pronouns_counts = json.loads(demonstrative_pronouns_counts)
-
-                defining_pronouns_frequencies = json.loads(defining_pronouns_frequencies)
-                defining_pronouns_counts = json.loads(defining_pronouns_counts)
-
-                relative_pronouns_frequencies = json.loads(relative_pronouns_frequencies)
-                relative_pronouns_counts = json.loads(relative_pronouns_counts)
-
-                indefinite_pronouns_frequencies = json.loads(indefinite_pronouns_frequencies)
-                indefinite_pronouns_counts = json.loads(indefinite_pronouns_counts)
-
-                negative_pronouns_frequencies = json.loads(negative_pronouns_frequencies)
-                negative_pronouns_counts = json.loads(negative_pronouns_counts)
-
-                # Акумулирование данных с учетом количества токенов
-                for word, freq in func_words_freq.items():
-                    func_words_freq_weighted[word] += freq * alpha_tokens_count
-
-                for word, count in func_words_counts.items():
-                    func_words_counts_weighted[word] += count * alpha_tokens_count
-
-                for punct, freq in punct_marks_normalized_frequency.items():
-                    punct_normalized_weighted[punct] += freq * all_tokens_count
-
-                for punct, freq in punct_marks_to_all_punct_frequency.items():
-                    punct_to_all_weighted[punct] += freq * all_tokens_count
-
-                for punct, count in punctuation_counts.items():
-                    punctuation_counts_weighted[punct] += count * all_tokens_count
-
-                for pronoun, freq in pers_possessive_pronouns_frequencies.items():
-                    pronoun_freq_accum['pers_possessive'][pronoun] += freq * alpha_tokens_count
-
-                for pronoun, count in pers_possessive_pronouns_counts.items():
-                    pronoun_counts_accum['pers_possessive'][pronoun] += count * alpha_tokens_count
-
-                for pronoun, freq in reflexive_pronoun_frequencies.items():
-                    pronoun_freq_accum['reflexive'][pronoun] += freq * alpha_tokens_count
-
-                for pronoun, count in reflexive_pronoun_counts.items():
-                    pronoun_counts_accum['reflexive'][pronoun] += count * alpha_tokens_count
-
-                for pronoun, freq in demonstrative_pronouns_frequencies.items():
-                    pronoun_freq_accum['demonstrative'][pronoun] += freq * alpha_tokens_count
-
-                for pronoun, count in demonstrative_pronouns_counts.items():
-                    pronoun_counts_accum['demonstrative'][pronoun] += count * alpha_tokens_count
-
-                for pronoun, freq in defining_pronouns_frequencies.items():
-                    pronoun_freq_accum['defining'][pronoun] += freq * alpha_tokens_count
-
-                for pronoun, count in defining_pronouns_counts.items():
-                    pronoun_counts_accum['defining'][pronoun] += count * alpha_tokens_count
-
-                for pronoun, freq in relative_pronouns_frequencies.items():
-                    pronoun_freq_accum['relative'][pronoun] += freq * alpha_tokens_count
-
-                for pronoun, count in relative_pronouns_counts.items():
-                    pronoun_counts_accum['relative'][pronoun] += count * alpha_tokens_count
-
-                for pronoun, freq in indefinite_pronouns_frequencies.items():
-                    pronoun_freq_accum['indefinite'][pronoun] += freq * alpha_tokens_count
-
-                for pronoun, count in indefinite_pronouns_counts.items():
-                    pronoun_counts_accum['indefinite'][pronoun] += count * alpha_tokens_count
-
-                for pronoun, freq in negative_pronouns_frequencies.items():
-                    pronoun_freq_accum['negative'][pronoun] += freq * alpha_tokens_count
-
-                for pronoun, count in negative_pronouns_counts.items():
-                    pronoun_counts_accum['negative'][pronoun] += count * alpha_tokens_count
-
-                # Вычисление взвешенных средних для всех частот и количеств
-            avg_func_words_freq = {word: freq / total_tokens_sum for word, freq in func_words_freq_weighted.items()}
+        tokens_totals = self.fetch_corpus_indicator_totals(
+            ['Miscellaneous_features.alpha_tokens_count', 'Miscellaneous_features.all_tokens_count'])
+        total_tokens_sum, texts_count = tokens_totals['Miscellaneous_features.alpha_tokens_count']
+        total_tokens_sum_with_punct = tokens_totals['Miscellaneous_features.all_tokens_count'][0]
+
+        if texts_count:
+            # Служебные слова и местоимения взвешиваются по количеству буквенных токенов текста,
+            # знаки препинания - по количеству всех токенов
+            words_counts, words_freqs = self.fetch_corpus_feature_sums(
+                ['func_words', 'pers_possessive_pronouns', 'reflexive_pronoun', 'demonstrative_pronouns',
+                 'defining_pronouns', 'relative_pronouns', 'indefinite_pronouns', 'negative_pronouns'])
+            punct_counts, punct_freqs = self.fetch_corpus_feature_sums(['punctuation', 'punct_to_all_punct'])
+
+            # Вычисление взвешенных средних для всех частот и количеств
+            avg_func_words_freq = {word: freq / total_tokens_sum for word, freq in words_freqs['func_words'].items()}
             avg_func_words_counts = {word: count / total_tokens_sum for word, count in
-                                     func_words_counts_weighted.items()}
+                                     words_counts['func_words'].items()}
 
             avg_punct_normalized_frequency = {punct: freq / total_tokens_sum_with_punct for punct, freq in
-                                              punct_normalized_weighted.items()}
+                                              punct_freqs['punctuation'].items()}
             avg_punct_to_all_punct_frequency = {punct: freq / total_tokens_sum_with_punct for punct, freq in
-                                                punct_to_all_weighted.items()}
+                                                punct_freqs['punct_to_all_punct'].items()}
             avg_punctuation_counts = {punct: count / total_tokens_sum_with_punct for punct, count in
-                                      punctuation_counts_weighted.items()}
+                                      punct_counts['punctuation'].items()}
 
             avg_pers_possessive_pronouns_frequencies = {pronoun: freq / total_tokens_sum for pronoun, freq in
-                                                        pronoun_freq_accum['pers_possessive'].items()}
+                                                        words_freqs['pers_possessive_pronouns'].items()}
             avg_pers_possessive_pronouns_counts = {pronoun: count / total_tokens_sum for pronoun, count in
-                                                   pronoun_counts_accum['pers_possessive'].items()}
+                                                   words_counts['pers_possessive_pronouns'].items()}
 
             avg_reflexive_pronoun_frequencies = {pronoun: freq / total_tokens_sum for pronoun, freq in
-                                                 pronoun_freq_accum['reflexive'].items()}
+                                                 words_freqs['reflexive_pronoun'].items()}
             avg_reflexive_pronoun_counts = {pronoun: count / total_tokens_sum for pronoun, count in
-                                            pronoun_counts_accum['reflexive'].items()}
+                                            words_counts['reflexive_pronoun'].items()}
 
             avg_demonstrative_pronouns_frequencies = {pronoun: freq / total_tokens_sum for pronoun, freq in
-                                                      pronoun_freq_accum['demonstrative'].items()}
+                                                      words_freqs['demonstrative_pronouns'].items()}
             avg_demonstrative_pronouns_counts = {pronoun: count / total_tokens_sum for pronoun, count in
-                                                 pronoun_counts_accum['demonstrative'].items()}
+                                                 words_counts['demonstrative_pronouns'].items()}
 
             avg_defining_pronouns_frequencies = {pronoun: freq / total_tokens_sum for pronoun, freq in
-                                                 pronoun_freq_accum['defining'].items()}
+                                                 words_freqs['defining_pronouns'].items()}
             avg_defining_pronouns_counts = {pronoun: count / total_tokens_sum for pronoun, count in
-                                            pronoun_counts_accum['defining'].items()}
+                                            words_counts['defining_pronouns'].items()}
 
             avg_relative_pronouns_frequencies = {pronoun: freq / total_tokens_sum for pronoun, freq in
-                                                 pronoun_freq_accum['relative'].items()}
+                                                 words_freqs['relative_pronouns'].items()}
             avg_relative_pronouns_counts = {pronoun: count / total_tokens_sum for pronoun, count in
-                                            pronoun_counts_accum['relative'].items()}
+                                            words_counts['relative_pronouns'].items()}
 
             avg_indefinite_pronouns_frequencies = {pronoun: freq / total_tokens_sum for pronoun, freq in
-                                                   pronoun_freq_accum['indefinite'].items()}
+                                                   words_freqs['indefinite_pronouns'].items()}
             avg_indefinite_pronouns_counts = {pronoun: count / total_tokens_sum for pronoun, count in
-                                              pronoun_counts_accum['indefinite'].items()}
+                                              words_counts['indefinite_pronouns'].items()}
 
             avg_negative_pronouns_frequencies = {pronoun: freq / total_tokens_sum for pronoun, freq in
-                                                 pronoun_freq_accum['negative'].items()}
+                                                 words_freqs['negative_pronouns'].items()}
             avg_negative_pronouns_counts = {pronoun: count / total_tokens_sum for pronoun, count in
-                                            pronoun_counts_accum['negative'].items()}
+                                            words_counts['negative_pronouns'].items()}
 
             if comparison:
                 comparison_results[self.db_name].update({
@@ -1909,158 +2340,41 @@ class SaveToDatabase:
 
     def display_interference_features_for_corpus(self, comparison=False, comparison_results=None):
         """Отображает средние показатели для индикаторов универсалии Interference."""
-        self.cursor.execute('''
-            SELECT 
-                Interference_features.pos_unigrams_counts, 
-                Interference_features.pos_unigrams_freq, 
-                Interference_features.pos_bigrams_counts, 
-                Interference_features.pos_bigrams_freq, 
-                Interference_features.pos_trigrams_counts, 
-                Interference_features.pos_trigrams_freq, 
-                Interference_features.char_unigram_counts, 
-                Interference_features.char_unigram_freq, 
-                Interference_features.char_bigram_counts, 
-                Interference_features.char_bigram_freq, 
-                Interference_features.char_trigram_counts, 
-                Interference_features.char_trigram_freq, 
-                Interference_features.func_w_trigrams_freqs, 
-                Interference_features.func_w_trigram_with_pos_counts, 
-                Interference_features.token_positions_normalized_frequencies, 
-                Interference_features.token_positions_counts, 
-                Simplification_features.all_tokens_count
-            FROM Interference_features
-            JOIN Simplification_features ON Interference_features.text_id = Simplification_features.text_id
-        ''')
-        rows = self.cursor.fetchall()
+        # Количество текстов и общая сумма токенов для вычисления взвешенных средних
+        total_tokens_sum, texts_count = self.fetch_corpus_indicator_totals(
+            ['Interference_features.all_tokens_count'])['Interference_features.all_tokens_count']
 
-        if not rows:
+        if not texts_count:
             print(Fore.LIGHTGREEN_EX + Style.BRIGHT + "Нет данных для отображения." + Fore.RESET)
             return
 
-        # Инициализация аккумуляторов для всех данных
-        counts_totals = {
-            'pos_unigrams': defaultdict(int),
-            'pos_bigrams': defaultdict(int),
-            'pos_trigrams': defaultdict(int),
-            'char_unigrams': defaultdict(int),
-            'char_bigrams': defaultdict(int),
-            'char_trigrams': defaultdict(int),
-            'func_w_trigrams': defaultdict(lambda: defaultdict(int)),
-            'token_positions': defaultdict(lambda: defaultdict(int)),
-        }
-
-        freqs_totals = {
-            'pos_unigrams': defaultdict(float),
-            'pos_bigrams': defaultdict(float),
-            'pos_trigrams': defaultdict(float),
-            'char_unigrams': defaultdict(float),
-            'char_bigrams': defaultdict(float),
-            'char_trigrams': defaultdict(float),
-            'func_w_trigrams': defaultdict(lambda: defaultdict(float)),
-            'token_positions': defaultdict(lambda: defaultdict(float)),
-        }
-        total_tokens_sum = 0  # Общая сумма токенов для вычисления взвешенных средних
-
-        # Проходим по каждому ряду (тексту)
-        for row in rows:
-            total_tokens = row[16]  # Общее количество токенов в тексте из Simplification_features!!!
-            total_tokens_sum += total_tokens  # Акумулируем общее количество токенов для всех текстов
-
-            # Десериализация POS n-граммов
-            pos_unigrams_counts = json.loads(row[0])
-            pos_unigrams_freq = json.loads(row[1])
-            pos_bigrams_counts = json.loads(row[2])
-            pos_bigrams_freq = json.loads(row[3])
-            pos_trigrams_counts = json.loads(row[4])
-            pos_trigrams_freq = json.loads(row[5])
-
-            # Десериализация char n-граммов
-            char_unigrams_counts = json.loads(row[6])
-            char_unigrams_freq = json.loads(row[7])
-            char_bigrams_counts = json.loads(row[8])
-            char_bigrams_freq = json.loads(row[9])
-            char_trigrams_counts = json.loads(row[10])
-            char_trigrams_freq = json.loads(row[11])
-
-            # Десериализация функциональных триграмм
-            func_w_trigrams_freqs = json.loads(row[12])
-            func_w_trigram_with_pos_counts = json.loads(row[13])
-
-            # Десериализация позиционных данных
-            token_positions_normalized_frequencies = json.loads(row[14])
-            token_positions_counts = json.loads(row[15])
-
-            # Акумулирование данных для POS n-граммов (взвешенные средние)
-            for key, count in pos_unigrams_counts.items():
-                counts_totals['pos_unigrams'][key] += count * total_tokens
-            for key, freq in pos_unigrams_freq.items():
-                freqs_totals['pos_unigrams'][key] += (freq * total_tokens)
-
-            for key, count in pos_bigrams_counts.items():
-                counts_totals['pos_bigrams'][key] += count * total_tokens
-            for key, freq in pos_bigrams_freq.items():
-                freqs_totals['pos_bigrams'][key] += freq * total_tokens
-
-            for key, count in pos_trigrams_counts.items():
-                counts_totals['pos_trigrams'][key] += count * total_tokens
-            for key, freq in pos_trigrams_freq.items():
-                freqs_totals['pos_trigrams'][key] += freq * total_tokens
-
-            # Акумулирование данных для char n-граммов
-            for key, count in char_unigrams_counts.items():
-                counts_totals['char_unigrams'][key] += count * total_tokens
-            for key, freq in char_unigrams_freq.items():
-                freqs_totals['char_unigrams'][key] += freq * total_tokens
-
-            for key, count in char_bigrams_counts.items():
-                counts_totals['char_bigrams'][key] += count * total_tokens
-            for key, freq in char_bigrams_freq.items():
-                freqs_totals['char_bigrams'][key] += freq * total_tokens
-
-            for key, count in char_trigrams_counts.items():
-                counts_totals['char_trigrams'][key] += count * total_tokens
-            for key, freq in char_trigrams_freq.items():
-                freqs_totals['char_trigrams'][key] += freq * total_tokens
-
-            # Акумулирование данных для функциональных триграмм
-            for category, trigrams in func_w_trigrams_freqs.items():
-                for trigram, freq in trigrams.items():
-                    freqs_totals['func_w_trigrams'][category][trigram] += freq * total_tokens
-
-            for category, trigrams in func_w_trigram_with_pos_counts.items():
-                for trigram, count in trigrams.items():
-                    counts_totals['func_w_trigrams'][category][trigram] += count * total_tokens
-
-            # Акумулирование данных для позиционных токенов
-            for position, tokens in token_positions_normalized_frequencies.items():
-                for token, freq in tokens.items():
-                    freqs_totals['token_positions'][position][token] += freq * total_tokens
-
-            for position, tokens in token_positions_counts.items():
-                for token, count in tokens.items():
-                    counts_totals['token_positions'][position][token] += count * total_tokens
-            # Добавляем данные в comparison_results для текущего корпуса
-            if comparison:
-                comparison_results[self.db_name] = {
-                    'pos_unigrams_freq': {key: freq / total_tokens_sum for key, freq in
-                                          freqs_totals['pos_unigrams'].items()},
-                    'pos_bigrams_freq': {key: freq / total_tokens_sum for key, freq in
-                                         freqs_totals['pos_bigrams'].items()},
-                    'pos_trigrams_freq': {key: freq / total_tokens_sum for key, freq in
-                                          freqs_totals['pos_trigrams'].items()},
-                    'char_unigrams_freq': {key: freq / total_tokens_sum for key, freq in
-                                           freqs_totals['char_unigrams'].items()},
-                    'char_bigrams_freq': {key: freq / total_tokens_sum for key, freq in
-                                          freqs_totals['char_bigrams'].items()},
-                    'char_trigrams_freq': {key: freq / total_tokens_sum for key, freq in
-                                           freqs_totals['char_trigrams'].items()},
-                    'func_w_trigrams_freqs': {
-                        category: {trigram: freq / total_tokens_sum for trigram, freq in trigrams.items()} for
-                        category, trigrams in freqs_totals['func_w_trigrams'].items()},
-                    'token_positions_normalized_frequencies': {
-                        position: {token: freq / total_tokens_sum for token, freq in tokens.items()} for
-                        position, tokens in freqs_totals['token_positions'].items()},
-                }
+        # Взвешенные по количеству токенов текста суммы количеств и частот по всему корпусу
+        counts_totals, freqs_totals = self.fetch_corpus_feature_sums(
+            ['pos_unigrams', 'pos_bigrams', 'pos_trigrams', 'char_unigrams', 'char_bigrams', 'char_trigrams',
+             'func_w_trigrams:', 'token_positions:'])
+
+        # Добавляем данные в comparison_results для текущего корпуса
+        if comparison:
+            comparison_results[self.db_name] = {
+                'pos_unigrams_freq': {key: freq / total_tokens_sum for key, freq in
+                                      freqs_totals['pos_unigrams'].items()},
+                'pos_bigrams_freq': {key: freq / total_tokens_sum for key, freq in
+                                     freqs_totals['pos_bigrams'].items()},
+                'pos_trigrams_freq': {key: freq / total_tokens_sum for key, freq in
+                                      freqs_totals['pos_trigrams'].items()},
+                'char_unigrams_freq': {key: freq / total_tokens_sum for key, freq in
+                                       freqs_totals['char_unigrams'].items()},
+                'char_bigrams_freq': {key: freq / total_tokens_sum for key, freq in
+                                      freqs_totals['char_bigrams'].items()},
+                'char_trigrams_freq': {key: freq / total_tokens_sum for key, freq in
+                                       freqs_totals['char_trigrams'].items()},
+                'func_w_trigrams_freqs': {
+                    category: {trigram: freq / total_tokens_sum for trigram, freq in trigrams.items()} for
+                    category, trigrams in freqs_totals['func_w_trigrams'].items()},
+                'token_positions_normalized_frequencies': {
+                    position: {token: freq / total_tokens_sum for token, freq in tokens.items()} for
+                    position, tokens in freqs_totals['token_positions'].items()},
+            }
 
         # Функция для создания таблиц с результатами
         def create_table(counts_dict, freq_dict, total_tokens_sum, min_count):
@@ -2235,27 +2549,59 @@ class SaveToDatabase:
                 wait_for_enter_to_choose_opt()
 
     def delete_text_from_corpus(self, text_id):
-        """Удаляет записи о тексте по text_id из всех таблиц."""
-        self.cursor.execute("DELETE FROM Text_Passport WHERE text_id = ?", (text_id,))
-
-        self.cursor.execute("DELETE FROM Simplification_features WHERE text_id = ?", (text_id,))
-
-        self.cursor.execute("DELETE FROM Normalisation_features WHERE text_id = ?", (text_id,))
-
-        self.cursor.execute("DELETE FROM Explicitation_features WHERE text_id = ?", (text_id,))
-
-        self.cursor.execute("DELETE FROM Interference_features WHERE text_id = ?", (text_id,))
-
-        self.cursor.execute("DELETE FROM Miscellaneous_features WHERE text_id = ?", (text_id,))
+        """
+        Удаляет записи о тексте по text_id из всех таблиц (строки индикаторов и разметки удаляются каскадно)
+        и вычитает значения текста из накопленных сумм по корпусу в той же транзакции.
+        """
+        self.ensure_corpus_totals()
+        with self.connection:
+            self.update_corpus_totals([text_id], sign=-1)
+            self.cursor.execute("DELETE FROM Text_Passport WHERE text_id = ?", (text_id,))
 
-        self.cursor.execute("DELETE FROM Morphological_annotation WHERE text_id = ?", (text_id,))
+        print(
+            Fore.LIGHTGREEN_EX + Style.BRIGHT + f"Запись о тексте выбранном тексте и все связанные с ним данные были успешно удалены!\n" + Fore.RESET)
 
-        self.cursor.execute("DELETE FROM Syntactic_annotation WHERE text_id = ?", (text_id,))
+    def text_feature_columns(self):
+        """
+        Возвращает числовые столбцы таблиц индикаторов (REAL и INTEGER), которые выгружаются по текстам.
 
-        self.connection.commit()
+        :return: Список кортежей (таблица, столбец).
+        """
+        columns = []
+        for table in EXPORT_FEATURE_TABLES:
+            for _, column, column_type, *_ in self.cursor.execute(f"PRAGMA table_info({table})").fetchall():
+                if column != 'text_id' and column_type in ('REAL', 'INTEGER'):
+                    columns.append((table, column))
+        return columns
+
+    def export_text_features(self, path, chunk_size=1000):
+        """
+        Выгружает в CSV паспорта текстов (без самого текста) и числовые индикаторы, по строке на текст.
+        Строки читаются из базы данных порциями по chunk_size и сразу записываются в файл.
 
-        print(
-            Fore.LIGHTGREEN_EX + Style.BRIGHT + f"Запись о тексте выбранном тексте и все связанные с ним данные были успешно удалены!\n" + Fore.RESET)
+        :param path: Путь к CSV-файлу.
+        :param chunk_size: Количество строк, читаемых из базы данных за один раз.
+        :return: Количество выгруженных текстов.
+        """
+        feature_columns = self.text_feature_columns()
+        header = list(EXPORT_PASSPORT_COLUMNS) + [f"{table}.{column}" for table, column in feature_columns]
+        select = ', '.join([f"Text_Passport.{column}" for column in EXPORT_PASSPORT_COLUMNS] +
+                           [f"{table}.{column}" for table, column in feature_columns])
+        joins = ' '.join(f"LEFT JOIN {table} ON {table}.text_id = Text_Passport.text_id"
+                         for table in EXPORT_FEATURE_TABLES)
+        cursor = self.connection.execute(f"SELECT {select} FROM Text_Passport {joins} "
+                                         f"ORDER BY Text_Passport.text_id")
+        rows_count = 0
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                writer.writerows(rows)
+                rows_count += len(rows)
+        return rows_count
 
     def print_simpl_comparison_table(self, comparison_results):
         """Выводит сравнительную таблицу для разных баз данных"""
@@ -2280,204 +2626,67 @@ class SaveToDatabase:
         print(Fore.LIGHTWHITE_EX + "*" * 80)
         wait_for_enter_to_choose_opt()
 
-    def print_ngrams_comparison_table(self, comparison_results):
-        """Печатает таблицу сравнения частот n-граммов для разных корпусов"""
-        print("\n" + Fore.LIGHTWHITE_EX + "*" * 80)
-        print(
-            Fore.GREEN + Style.BRIGHT + '             СРАВНЕНИЕ ПОКАЗАТЕЛЕЙ ' + Fore.LIGHTGREEN_EX + Style.BRIGHT
-            + 'ЧАСТЕРЕЧНЫХ УНИГРАММ' + Fore.GREEN + Style.BRIGHT + ' ПО КОРПУСАМ' + Fore.LIGHTRED_EX + Style.BRIGHT)
-        print(Fore.LIGHTWHITE_EX + "*" * 80)
-        table = Table()
-        # Создание таблицы для POS Unigrams
-        table.add_column("Unigram", justify="left", style="bold")
-        for db in comparison_results.keys():
-            table.add_column(db, justify="center", style="bold")
-
-        all_pos = set()
-        for corpus_data in comparison_results.values():
-            all_pos.update(corpus_data.get('pos_unigrams_freq', {}).keys())
-
-        sorted_pos = sorted(all_pos, key=lambda x: comparison_results[list(comparison_results.keys())[0]].get(
-            'pos_unigrams_freq', {}).get(x, 0), reverse=True)
-
-        for pos in sorted_pos:
-            row = [pos]
-            for corpus_name, corpus_data in comparison_results.items():
-                freq = corpus_data.get('pos_unigrams_freq', {}).get(pos, 0)
-                row.append(f"{round(freq, 4)}")
-            table.add_row(*row)
-
-        console.print(table)
-        wait_for_enter_to_analyze()
-
-        print("\n" + Fore.LIGHTWHITE_EX + "*" * 80)
-        print(
-            Fore.GREEN + Style.BRIGHT + '             СРАВНЕНИЕ ПОКАЗАТЕЛЕЙ ' + Fore.LIGHTGREEN_EX + Style.BRIGHT
-            + 'ЧАСТЕРЕЧНЫХ БИГРАММ' + Fore.GREEN + Style.BRIGHT + ' ПО КОРПУСАМ' + Fore.LIGHTRED_EX + Style.BRIGHT)
-        print(Fore.LIGHTWHITE_EX + "*" * 80)
-        table = Table()
-        table.add_column("Bigrams", justify="left", style="bold")
-        for db in comparison_results.keys():
-            table.add_column(db, justify="center", style="bold")
-
-        all_bigrams = set()
-        for corpus_data in comparison_results.values():
-            all_bigrams.update(corpus_data.get('pos_bigrams_freq', {}).keys())
-
-        sorted_bigrams = sorted(all_bigrams, key=lambda x: comparison_results[list(comparison_results.keys())[0]].get(
-            'pos_bigrams_freq', {}).get(x, 0), reverse=True)
-
-        for bigram in sorted_bigrams:
-            row = [bigram]
-            for corpus_name, corpus_data in comparison_results.items():
-                freq = corpus_data.get('pos_bigrams_freq', {}).get(bigram, 0)
-                row.append(f"{round(freq, 4)}")
-            table.add_row(*row)
-
-        console.print(table)
-        wait_for_enter_to_analyze()
-
-        print("\n" + Fore.LIGHTWHITE_EX + "*" * 80)
-        print(
-            Fore.GREEN + Style.BRIGHT + '             СРАВНЕНИЕ ПОКАЗАТЕЛЕЙ ' + Fore.LIGHTGREEN_EX + Style.BRIGHT
-            + 'ЧАСТЕРЕЧНЫХ ТРИГРАММ' + Fore.GREEN + Style.BRIGHT + ' ПО КОРПУСАМ' + Fore.LIGHTRED_EX + Style.BRIGHT)
-        print(Fore.LIGHTWHITE_EX + "*" * 80)
-        table = Table()
-        table.add_column("Trigrams", justify="left", style="bold")
-        for db in comparison_results.keys():
-            table.add_column(db, justify="center", style="bold")
-
-        all_trigrams = set()
-        for corpus_data in comparison_results.values():
-            all_trigrams.update(corpus_data.get('pos_trigrams_freq', {}).keys())
-
-        sorted_trigrams = sorted(all_trigrams, key=lambda x: comparison_results[list(comparison_results.keys())[0]].get(
-            'pos_trigrams_freq', {}).get(x, 0), reverse=True)
-
-        for trigram in sorted_trigrams:
-            row = [trigram]
-            for corpus_name, corpus_data in comparison_results.items():
-                freq = corpus_data.get('pos_trigrams_freq', {}).get(trigram, 0)
-                row.append(f"{round(freq, 4)}")
-            table.add_row(*row)
-
-        console.print(table)
-        wait_for_enter_to_analyze()
-
-        print(
-            Fore.GREEN + Style.BRIGHT + '             СРАВНЕНИЕ ПОКАЗАТЕЛЕЙ ' + Fore.LIGHTGREEN_EX + Style.BRIGHT
-            + 'СИМВОЛЬНЫХ УНИГРАММ' + Fore.GREEN + Style.BRIGHT + ' ПО КОРПУСАМ' + Fore.LIGHTRED_EX + Style.BRIGHT)
-        print(Fore.LIGHTWHITE_EX + "*" * 80)
-        table = Table()
-        table.add_column("Char Unigrams", justify="left", style="bold")
-        for db in comparison_results.keys():
-            table.add_column(db, justify="center", style="bold")
-
-        all_char_unigrams = set()
-        for corpus_data in comparison_results.values():
-            all_char_unigrams.update(corpus_data.get('char_unigrams_freq', {}).keys())
-
-        sorted_char_unigrams = sorted(all_char_unigrams,
-                                      key=lambda x: comparison_results[list(comparison_results.keys())[0]].get(
-                                          'char_unigrams_freq', {}).get(x, 0), reverse=True)
-
-        for char_unigram in sorted_char_unigrams:
-            row = [char_unigram]
-            for corpus_name, corpus_data in comparison_results.items():
-                freq = corpus_data.get('char_unigrams_freq', {}).get(char_unigram, 0)
-                row.append(f"{round(freq, 4)}")
-            table.add_row(*row)
-
-        console.print(table)
-        wait_for_enter_to_analyze()
-
-        print(
-            Fore.GREEN + Style.BRIGHT + '             СРАВНЕНИЕ ПОКАЗАТЕЛЕЙ ' + Fore.LIGHTGREEN_EX + Style.BRIGHT
-            + 'СИМВОЛЬНЫХ БИГРАММ' + Fore.GREEN + Style.BRIGHT + ' ПО КОРПУСАМ' + Fore.LIGHTRED_EX + Style.BRIGHT)
-        print(Fore.LIGHTWHITE_EX + "*" * 80)
-        table = Table()
-        table.add_column("Char Bigrams", justify="left", style="bold")
-        for db in comparison_results.keys():
-            table.add_column(db, justify="center", style="bold")
-
-        all_char_bigrams = set()
-        for corpus_data in comparison_results.values():
-            all_char_bigrams.update(corpus_data.get('char_bigrams_freq', {}).keys())
-
-        sorted_char_bigrams = sorted(all_char_bigrams,
-                                     key=lambda x: comparison_results[list(comparison_results.keys())[0]].get(
-                                         'char_bigrams_freq', {}).get(x, 0), reverse=True)
-
-        for char_bigram in sorted_char_bigrams:
-            row = [char_bigram]
-            for corpus_name, corpus_data in comparison_results.items():
-                freq = corpus_data.get('char_bigrams_freq', {}).get(char_bigram, 0)
-                row.append(f"{round(freq, 4)}")
-            table.add_row(*row)
-
-        console.print(table)
-        wait_for_enter_to_analyze()
+    @staticmethod
+    def _print_freqs_comparison(freqs_by_corpus, sort_freqs, title, column_title, separator=True):
+        """
+        Печатает таблицу сравнения частот одного семейства признаков по корпусам.
 
+        :param freqs_by_corpus: Словарь {корпус: {ключ: частота}}, подготовленный один раз для всей таблицы.
+        :param sort_freqs: Частоты, по которым строки упорядочиваются по убыванию (частоты первого корпуса).
+        :param title: Название семейства в заголовке.
+        :param column_title: Заголовок первого столбца.
+        :param separator: Печатать ли строку-разделитель перед заголовком.
+        """
+        if separator:
+            print("\n" + Fore.LIGHTWHITE_EX + "*" * 80)
         print(
             Fore.GREEN + Style.BRIGHT + '             СРАВНЕНИЕ ПОКАЗАТЕЛЕЙ ' + Fore.LIGHTGREEN_EX + Style.BRIGHT
-            + 'СИМВОЛЬНЫХ ТРИГРАММ' + Fore.GREEN + Style.BRIGHT + ' ПО КОРПУСАМ' + Fore.LIGHTRED_EX + Style.BRIGHT)
+            + title + Fore.GREEN + Style.BRIGHT + ' ПО КОРПУСАМ' + Fore.LIGHTRED_EX + Style.BRIGHT)
         print(Fore.LIGHTWHITE_EX + "*" * 80)
         table = Table()
-        table.add_column("Char Trigrams", justify="left", style="bold")
-        for db in comparison_results.keys():
+        table.add_column(column_title, justify="left", style="bold")
+        for db in freqs_by_corpus.keys():
             table.add_column(db, justify="center", style="bold")
 
-        all_char_trigrams = set()
-        for corpus_data in comparison_results.values():
-            all_char_trigrams.update(corpus_data.get('char_trigrams_freq', {}).keys())
-
-        sorted_char_trigrams = sorted(all_char_trigrams,
-                                      key=lambda x: comparison_results[list(comparison_results.keys())[0]].get(
-                                          'char_trigrams_freq', {}).get(x, 0), reverse=True)
+        all_keys = set()
+        for freqs in freqs_by_corpus.values():
+            all_keys.update(freqs.keys())
 
-        for char_trigram in sorted_char_trigrams:
-            row = [char_trigram]
-            for corpus_name, corpus_data in comparison_results.items():
-                freq = corpus_data.get('char_trigrams_freq', {}).get(char_trigram, 0)
-                row.append(f"{round(freq, 4)}")
-            table.add_row(*row)
+        for key in sorted(all_keys, key=lambda x: sort_freqs.get(x, 0), reverse=True):
+            table.add_row(str(key), *(f"{round(freqs.get(key, 0), 4)}" for freqs in freqs_by_corpus.values()))
 
         console.print(table)
         wait_for_enter_to_analyze()
 
-        print(
-            Fore.GREEN + Style.BRIGHT + '             СРАВНЕНИЕ ПОКАЗАТЕЛЕЙ ' + Fore.LIGHTGREEN_EX + Style.BRIGHT
-            + 'ТРИГРАММ С ФУНКЦИОНАЛЬНЫМИ СЛОВАМИ' + Fore.GREEN + Style.BRIGHT + ' ПО КОРПУСАМ' + Fore.LIGHTRED_EX + Style.BRIGHT)
-        print(Fore.LIGHTWHITE_EX + "*" * 80)
-        table = Table()
-        table.add_column("Functional Trigrams", justify="left", style="bold")
-        for db in comparison_results.keys():
-            table.add_column(db, justify="center", style="bold")
-
-        all_func_w_trigrams = set()
-        for corpus_data in comparison_results.values():
-            for category, trigrams in corpus_data.get('func_w_trigrams_freqs', {}).items():
-                all_func_w_trigrams.update(trigrams.keys())
-
-        sorted_func_w_trigrams = sorted(all_func_w_trigrams, key=lambda x: next(iter(comparison_results.values())).get(
-            'func_w_trigrams_freqs', {}).get(
-            next(iter(next(iter(comparison_results.values())).get('func_w_trigrams_freqs', {})), {}), {}).get(x, 0),
-                                        reverse=True)
-
-        for func_w_trigram in sorted_func_w_trigrams:
-            row = [str(func_w_trigram)]
-            for corpus_name, corpus_data in comparison_results.items():
-                freq = 0
-                func_trigrams = corpus_data.get('func_w_trigrams_freqs', {})
-                for category, trigrams in func_trigrams.items():
-                    if func_w_trigram in trigrams:
-                        freq = trigrams[func_w_trigram]
-                        break
-                row.append(f"{round(freq, 4)}")
-            table.add_row(*row)
-
-        console.print(table)
-        wait_for_enter_to_analyze()
+    def print_ngrams_comparison_table(self, comparison_results):
+        """Печатает таблицу сравнения частот n-граммов для разных корпусов"""
+        if not comparison_results:
+            return
+        first_corpus = next(iter(comparison_results.values()))
+
+        for freq_key, title, column_title, separator in (
+                ('pos_unigrams_freq', 'ЧАСТЕРЕЧНЫХ УНИГРАММ', "Unigram", True),
+                ('pos_bigrams_freq', 'ЧАСТЕРЕЧНЫХ БИГРАММ', "Bigrams", True),
+                ('pos_trigrams_freq', 'ЧАСТЕРЕЧНЫХ ТРИГРАММ', "Trigrams", True),
+                ('char_unigrams_freq', 'СИМВОЛЬНЫХ УНИГРАММ', "Char Unigrams", False),
+                ('char_bigrams_freq', 'СИМВОЛЬНЫХ БИГРАММ', "Char Bigrams", False),
+                ('char_trigrams_freq', 'СИМВОЛЬНЫХ ТРИГРАММ', "Char Trigrams", False)):
+            freqs_by_corpus = {db: corpus_data.get(freq_key, {}) for db, corpus_data in comparison_results.items()}
+            self._print_freqs_comparison(freqs_by_corpus, first_corpus.get(freq_key, {}), title, column_title,
+                                         separator)
+
+        # Триграммы всех категорий сводятся в один словарь на корпус (частота берется из первой категории,
+        # в которой встречается триграмма); строки упорядочиваются по частотам первой категории первого корпуса
+        freqs_by_corpus = {}
+        for db, corpus_data in comparison_results.items():
+            merged = {}
+            for trigrams in corpus_data.get('func_w_trigrams_freqs', {}).values():
+                for trigram, freq in trigrams.items():
+                    merged.setdefault(trigram, freq)
+            freqs_by_corpus[db] = merged
+        first_category = next(iter(first_corpus.get('func_w_trigrams_freqs', {}).values()), {})
+        self._print_freqs_comparison(freqs_by_corpus, first_category,
+                                     'ТРИГРАММ С ФУНКЦИОНАЛЬНЫМИ СЛОВАМИ', "Functional Trigrams", False)
 
     def print_normalisation_comparison_table(self, comparison_results):
         """Выводит сравнительную таблицу нормализации для разных баз данных"""